@@ -1,9 +1,13 @@
 import json
+import os
 import pathlib
 from datetime import datetime, timezone
 from typing import Optional
 
-OUT_DIR = pathlib.Path(r"C:\\Users\\Lamine\\Desktop\\Projet final\\Application\\downloads")
+# FLOWGRAB_OUT_DIR permet de lancer le moteur (CLI, serveur sans interface) ailleurs
+OUT_DIR = pathlib.Path(
+    os.environ.get("FLOWGRAB_OUT_DIR") or r"C:\\Users\\Lamine\\Desktop\\Projet final\\Application\\downloads"
+)
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 CONFIG_PATH = OUT_DIR / "flowgrab_config.json"
@@ -14,14 +18,63 @@ DEFAULT_CONFIG = {
     "webhook_full": "",
     "last_updated": "",
     "telegram_token": "",
+    # "polling" ou "webhook" ; le webhook écoute sur telegram_port, joint via l'URL publique HTTPS
     "telegram_mode": "polling",
     "telegram_port": 8081,
+    "telegram_webhook_url": "",
+    # Bot API auto-hébergée ou banc de test local (vide = api.telegram.org)
+    "telegram_api_base": "",
+    # Inspections de liens simultanées côté bot (extraction yt-dlp)
+    "telegram_inspect_workers": 2,
+    # Mises à jour traitées en parallèle (ordre conservé par chat) et plafond avant contre-pression
+    "telegram_concurrent_updates": 4,
+    "telegram_max_pending_updates": 64,
+    # Secondes minimum entre deux modifications du message de progression d'un chat
+    "telegram_progress_interval": 3,
+    # Claviers en attente d'un clic (formats, transcription) : durée de vie, plafond, reprise au redémarrage
+    "telegram_pending_ttl_hours": 24,
+    "telegram_pending_max": 200,
+    "telegram_pending_persist": True,
     "cookies_path": "",
     "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "browser_cookies": "auto",
+    "max_parallel_downloads": 3,
+    "max_parallel_youtube": 2,
+    "max_parallel_tiktok": 2,
+    # Fragments HLS/DASH : plafond par téléchargement et budget global de sockets
+    "max_fragment_concurrency": 8,
+    "max_fragment_sockets": 12,
+    # Formats progressifs (HTTP direct) : connexions Range parallèles par fichier
+    "range_connections": 4,
+    # Post-traitement (rangement, extraction audio) en parallèle du téléchargement suivant
+    "max_postprocess_workers": 2,
+    # Transcription : sous-titres publiés (manuels, puis automatiques) avant tout envoi d'audio
+    "caption_fast_path": False,
+    "caption_languages": "fr,en",
+    # Bande passante en Ko/s (0 = illimité) ; planning "HH:MM-HH:MM=Ko/s; ..."
+    "bandwidth_total_kib": 0,
+    "bandwidth_youtube_kib": 0,
+    "bandwidth_tiktok_kib": 0,
+    "bandwidth_schedule": "",
 }
 
 
+def _positive_int(value, default: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    return number if number >= 1 else default
+
+
+def _non_negative_int(value, default: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    return number if number >= 0 else default
+
+
 def _ensure_config_defaults(data: Optional[dict]) -> dict:
     cfg = dict(DEFAULT_CONFIG)
     if isinstance(data, dict):
@@ -44,6 +97,34 @@ def _ensure_config_defaults(data: Optional[dict]) -> dict:
     }
     cfg["browser_cookies"] = bc if bc in allowed else "auto"
 
+    for key in (
+        "max_parallel_downloads",
+        "max_parallel_youtube",
+        "max_parallel_tiktok",
+        "max_fragment_concurrency",
+        "max_fragment_sockets",
+        "range_connections",
+        "max_postprocess_workers",
+        "telegram_port",
+        "telegram_inspect_workers",
+        "telegram_concurrent_updates",
+        "telegram_max_pending_updates",
+        "telegram_progress_interval",
+        "telegram_pending_ttl_hours",
+        "telegram_pending_max",
+    ):
+        cfg[key] = _positive_int(cfg.get(key), DEFAULT_CONFIG[key])
+    for key in ("bandwidth_total_kib", "bandwidth_youtube_kib", "bandwidth_tiktok_kib"):
+        cfg[key] = _non_negative_int(cfg.get(key), DEFAULT_CONFIG[key])
+    cfg["bandwidth_schedule"] = str(cfg.get("bandwidth_schedule") or "")
+    cfg["caption_fast_path"] = bool(cfg.get("caption_fast_path"))
+    cfg["telegram_pending_persist"] = bool(cfg.get("telegram_pending_persist"))
+    mode = str(cfg.get("telegram_mode") or "").strip().lower()
+    cfg["telegram_mode"] = mode if mode in ("polling", "webhook") else "polling"
+    cfg["telegram_webhook_url"] = str(cfg.get("telegram_webhook_url") or "").strip()
+    cfg["telegram_api_base"] = str(cfg.get("telegram_api_base") or "").strip()
+    cfg["caption_languages"] = str(cfg.get("caption_languages") or DEFAULT_CONFIG["caption_languages"])
+
     return cfg
 
 
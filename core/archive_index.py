@@ -0,0 +1,93 @@
+"""Index mémoire des fichiers d'archive yt-dlp (``archive.txt`` / ``archive_tiktok.txt``)."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+from core.video_ids import extract_video_key
+from paths import DOWNLOAD_ARCHIVE, DOWNLOAD_ARCHIVE_TT
+
+
+class ArchiveIndex:
+    """Ensemble ``(extracteur, id)`` chargé une fois, puis complété au fil des ajouts.
+
+    yt-dlp ajoute lui-même ses lignes à la fin des fichiers : seul le segment ajouté
+    depuis la dernière lecture est relu (un ``stat`` par consultation). Un fichier
+    raccourci ou réécrit est rechargé entièrement.
+    """
+
+    def __init__(self, files: Dict[str, pathlib.Path]):
+        self.files = {key: pathlib.Path(path) for key, path in files.items()}
+        self._lock = threading.Lock()
+        self._ids: Set[Tuple[str, str]] = set()
+        self._offsets: Dict[str, int] = {}
+
+    def _read_from(self, path: pathlib.Path, offset: int) -> int:
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            data = handle.read()
+        # Une ligne incomplète (écriture en cours) sera relue au prochain passage
+        end = data.rfind(b"\n") + 1
+        for raw in data[:end].decode("utf-8", errors="replace").splitlines():
+            parts = raw.strip().split(None, 1)
+            if len(parts) == 2:
+                self._ids.add((parts[0].lower(), parts[1].strip()))
+        return offset + end
+
+    def _sync(self) -> None:
+        reload = False
+        sizes: Dict[str, int] = {}
+        for key, path in self.files.items():
+            try:
+                sizes[key] = os.stat(path).st_size
+            except OSError:
+                sizes[key] = 0
+            if sizes[key] < self._offsets.get(key, 0):
+                reload = True
+        if reload:
+            self._ids.clear()
+            self._offsets.clear()
+        for key, path in self.files.items():
+            offset = self._offsets.get(key, 0)
+            if sizes[key] <= offset:
+                continue
+            try:
+                self._offsets[key] = self._read_from(path, offset)
+            except OSError:
+                pass
+
+    def contains(self, platform: str, video_id: str) -> bool:
+        if not platform or not video_id:
+            return False
+        with self._lock:
+            self._sync()
+            return (platform.lower(), video_id) in self._ids
+
+    def contains_url(self, url: str) -> bool:
+        key = extract_video_key(url)
+        return bool(key) and self.contains(*key)
+
+    def add(self, platform: str, video_id: str) -> None:
+        if platform and video_id:
+            with self._lock:
+                self._ids.add((platform.lower(), video_id))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._ids)
+
+
+_archive_index: Optional[ArchiveIndex] = None
+_archive_index_lock = threading.Lock()
+
+
+def get_archive_index() -> ArchiveIndex:
+    global _archive_index
+    with _archive_index_lock:
+        if _archive_index is None:
+            _archive_index = ArchiveIndex({"youtube": DOWNLOAD_ARCHIVE, "tiktok": DOWNLOAD_ARCHIVE_TT})
+        return _archive_index
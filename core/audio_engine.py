@@ -0,0 +1,191 @@
+"""Extraction audio tenant compte du codec source : copie du flux si possible, réencodage sinon.
+
+Le webhook de transcription accepte MP3, M4A (AAC), OGG (Opus/Vorbis) et FLAC : une piste
+déjà dans l'un de ces codecs est simplement remuxée (quasi instantané) au lieu d'être
+réencodée en MP3 en temps réel. Le chemin retenu est renvoyé dans ``AudioResult.method``.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+METHOD_COPY = "copy"
+METHOD_ENCODE = "encode"
+
+DEFAULT_BITRATE = "192k"
+
+# Codec source → extension du conteneur de sortie, pour une copie sans réencodage
+TRANSCRIPTION_COPY_CODECS: Dict[str, str] = {
+    "mp3": ".mp3",
+    "aac": ".m4a",
+    "opus": ".ogg",
+    "vorbis": ".ogg",
+    "flac": ".flac",
+}
+MP3_COPY_CODECS: Dict[str, str] = {"mp3": ".mp3"}
+
+
+class AudioEngineError(RuntimeError):
+    """Échec de ffmpeg lors de l'extraction audio."""
+
+
+@dataclass
+class AudioStreamInfo:
+    codec: str
+    channels: Optional[int] = None
+    sample_rate: Optional[int] = None
+    bit_rate: Optional[int] = None
+    duration: Optional[float] = None
+
+
+@dataclass
+class AudioResult:
+    path: pathlib.Path
+    method: str
+    codec: Optional[str]
+    elapsed: float
+
+    def describe(self) -> str:
+        codec = self.codec or "inconnu"
+        if self.method == METHOD_COPY:
+            return f"flux {codec} copié sans réencodage"
+        return f"réencodé en MP3 depuis {codec}"
+
+
+def _ffprobe_for(ffmpeg_bin: str) -> str:
+    """``ffprobe`` voisin du binaire ffmpeg fourni (ou celui du PATH)."""
+
+    path = pathlib.Path(ffmpeg_bin)
+    if path.parent != pathlib.Path("."):
+        candidate = path.with_name(path.name.replace("ffmpeg", "ffprobe"))
+        if candidate.exists():
+            return str(candidate)
+    return "ffprobe"
+
+
+def _int_or_none(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_audio(path: pathlib.Path, *, ffprobe_bin: str = "ffprobe") -> Optional[AudioStreamInfo]:
+    """Première piste audio de ``path`` (``None`` si ffprobe est absent ou sans piste audio)."""
+
+    cmd = [
+        ffprobe_bin,
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "stream=codec_name,channels,sample_rate,bit_rate:format=duration",
+        "-of",
+        "json",
+        str(path),
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if proc.returncode != 0:
+        return None
+    try:
+        data = json.loads(proc.stdout or "{}")
+    except ValueError:
+        return None
+    streams = data.get("streams") or []
+    if not streams or not streams[0].get("codec_name"):
+        return None
+    stream = streams[0]
+    duration = (data.get("format") or {}).get("duration")
+    try:
+        duration = float(duration) if duration is not None else None
+    except (TypeError, ValueError):
+        duration = None
+    return AudioStreamInfo(
+        codec=str(stream["codec_name"]).lower(),
+        channels=_int_or_none(stream.get("channels")),
+        sample_rate=_int_or_none(stream.get("sample_rate")),
+        bit_rate=_int_or_none(stream.get("bit_rate")),
+        duration=duration,
+    )
+
+
+def _run_ffmpeg(cmd, dst: pathlib.Path) -> subprocess.CompletedProcess:
+    existed = dst.exists()
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    # Ne supprime qu'une sortie partielle, jamais un fichier présent avant l'appel (-n)
+    if proc.returncode != 0 and not existed and dst.exists():
+        try:
+            dst.unlink()
+        except OSError:
+            pass
+    return proc
+
+
+def extract_audio(
+    src: pathlib.Path,
+    output_dir: pathlib.Path,
+    stem: str,
+    *,
+    copy_codecs: Optional[Dict[str, str]] = None,
+    bitrate: str = DEFAULT_BITRATE,
+    ffmpeg_bin: str = "ffmpeg",
+    overwrite: bool = True,
+    choose_path: Callable[[pathlib.Path], pathlib.Path] = lambda p: p,
+) -> AudioResult:
+    """Écrit la piste audio de ``src`` dans ``output_dir/stem.<ext>``.
+
+    Copie le flux quand son codec figure dans ``copy_codecs`` (par défaut : codecs acceptés
+    par la transcription), sinon ou en cas d'échec du remux, réencode en MP3.
+
+    :raises AudioEngineError: si ffmpeg échoue.
+    """
+
+    src = pathlib.Path(src)
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    targets = TRANSCRIPTION_COPY_CODECS if copy_codecs is None else copy_codecs
+    started = time.monotonic()
+    stream = probe_audio(src, ffprobe_bin=_ffprobe_for(ffmpeg_bin))
+    codec = stream.codec if stream else None
+    overwrite_flag = "-y" if overwrite else "-n"
+
+    ext = targets.get(codec or "")
+    if ext:
+        dst = choose_path(output_dir / f"{stem}{ext}")
+        cmd = [ffmpeg_bin, overwrite_flag, "-i", str(src), "-map", "0:a:0", "-vn", "-sn", "-dn", "-c:a", "copy"]
+        if ext == ".m4a":
+            cmd += ["-movflags", "+faststart"]
+        proc = _run_ffmpeg(cmd + [str(dst)], dst)
+        if proc.returncode == 0 and dst.exists():
+            return AudioResult(dst, METHOD_COPY, codec, time.monotonic() - started)
+        # Remux refusé (conteneur exotique, horodatages) : on retombe sur le réencodage
+
+    dst = choose_path(output_dir / f"{stem}.mp3")
+    cmd = [
+        ffmpeg_bin,
+        overwrite_flag,
+        "-i",
+        str(src),
+        "-map",
+        "0:a:0",
+        "-vn",
+        "-acodec",
+        "libmp3lame",
+        "-b:a",
+        bitrate,
+        str(dst),
+    ]
+    proc = _run_ffmpeg(cmd, dst)
+    if proc.returncode != 0 or not dst.exists():
+        raise AudioEngineError(f"Échec ffmpeg.\n\n--- STDERR ---\n{proc.stderr}")
+    return AudioResult(dst, METHOD_ENCODE, codec, time.monotonic() - started)
+
@@ -0,0 +1,214 @@
+"""Gouverneur de bande passante : budget global partagé entre téléchargements actifs.
+
+Chaque téléchargement prend un ``BandwidthLease``. Sa part (budget global ÷ téléchargements
+actifs, bornée par le plafond de sa plateforme) est réévaluée en continu :
+- téléchargement HTTP direct : ``ydl.params['ratelimit']`` est modifié à chaud (le
+  ``FileDownloader`` lit ce dict partagé à chaque bloc) ;
+- téléchargement par fragments : les paramètres sont copiés au démarrage du format, le
+  rythme est donc imposé depuis le hook de progression (seau à jetons par lease).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import load_config
+
+KIB = 1024
+_REFRESH_INTERVAL = 0.5
+_MAX_PACE_SLEEP = 2.0
+_SCHEDULE_ITEM = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(\d+)\s*$")
+
+# (début en minutes, fin en minutes, limite Ko/s ; 0 = illimité)
+ScheduleWindow = Tuple[int, int, int]
+
+
+def parse_schedule(text: str) -> List[ScheduleWindow]:
+    """``"08:00-18:00=2000; 22:00-07:00=0"`` → fenêtres horaires (les entrées invalides sont ignorées)."""
+
+    windows: List[ScheduleWindow] = []
+    for chunk in re.split(r"[;,\n]", text or ""):
+        m = _SCHEDULE_ITEM.match(chunk)
+        if not m:
+            continue
+        h1, m1, h2, m2, limit = (int(g) for g in m.groups())
+        if h1 > 23 or h2 > 23 or m1 > 59 or m2 > 59:
+            continue
+        windows.append((h1 * 60 + m1, h2 * 60 + m2, limit))
+    return windows
+
+
+def _in_window(minute: int, start: int, end: int) -> bool:
+    if start == end:
+        return True
+    if start < end:
+        return start <= minute < end
+    # Fenêtre à cheval sur minuit
+    return minute >= start or minute < end
+
+
+class BandwidthGovernor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total_kib = 0
+        self._platform_kib: Dict[str, int] = {}
+        self._schedule: List[ScheduleWindow] = []
+        self._leases: List["BandwidthLease"] = []
+
+    def configure(
+        self,
+        total_kib: int,
+        per_platform_kib: Dict[str, int],
+        schedule: Optional[List[ScheduleWindow]] = None,
+    ) -> None:
+        with self._lock:
+            self._total_kib = max(0, int(total_kib or 0))
+            self._platform_kib = {
+                (key or "").strip().lower(): max(0, int(value or 0)) for key, value in per_platform_kib.items()
+            }
+            self._schedule = list(schedule or [])
+
+    def configure_from(self, cfg: dict) -> None:
+        self.configure(
+            cfg.get("bandwidth_total_kib") or 0,
+            {
+                "youtube": cfg.get("bandwidth_youtube_kib") or 0,
+                "tiktok": cfg.get("bandwidth_tiktok_kib") or 0,
+            },
+            parse_schedule(cfg.get("bandwidth_schedule") or ""),
+        )
+
+    def _total_now(self) -> int:
+        now = datetime.now()
+        minute = now.hour * 60 + now.minute
+        for start, end, limit in self._schedule:
+            if _in_window(minute, start, end):
+                return limit
+        return self._total_kib
+
+    def register(self, platform: str) -> "BandwidthLease":
+        lease = BandwidthLease(self, (platform or "").strip().lower())
+        with self._lock:
+            self._leases.append(lease)
+        return lease
+
+    def unregister(self, lease: "BandwidthLease") -> None:
+        with self._lock:
+            try:
+                self._leases.remove(lease)
+            except ValueError:
+                pass
+
+    def allocation(self, lease: "BandwidthLease") -> Optional[int]:
+        """Part courante de ``lease`` en octets/s (``None`` = illimité)."""
+
+        with self._lock:
+            limits: List[float] = []
+            total = self._total_now()
+            active = max(1, len(self._leases))
+            if total > 0:
+                limits.append(total * KIB / active)
+            cap = self._platform_kib.get(lease.platform, 0)
+            if cap > 0:
+                same = max(1, sum(1 for other in self._leases if other.platform == lease.platform))
+                limits.append(cap * KIB / same)
+        if not limits:
+            return None
+        return max(KIB, int(min(limits)))
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            total = self._total_now()
+            leases = list(self._leases)
+        return {
+            "total_kib": total,
+            "active": len(leases),
+            "per_platform": {key: value for key, value in self._platform_kib.items() if value},
+        }
+
+
+class BandwidthLease:
+    def __init__(self, governor: BandwidthGovernor, platform: str):
+        self.governor = governor
+        self.platform = platform
+        self._lock = threading.Lock()
+        self._ydl = None
+        self._rate: Optional[int] = None
+        self._refreshed = 0.0
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self._last_bytes: Dict[str, int] = {}
+
+    def initial_ratelimit(self) -> Optional[int]:
+        self._rate = self.governor.allocation(self)
+        self._refreshed = time.monotonic()
+        return self._rate
+
+    def attach(self, ydl) -> None:
+        with self._lock:
+            self._ydl = ydl
+        self.refresh(force=True)
+
+    def refresh(self, *, force: bool = False) -> Optional[int]:
+        now = time.monotonic()
+        if not force and now - self._refreshed < _REFRESH_INTERVAL:
+            return self._rate
+        rate = self.governor.allocation(self)
+        with self._lock:
+            self._refreshed = now
+            if rate != self._rate:
+                self._rate = rate
+                self._tokens = min(self._tokens, float(rate or 0))
+            ydl = self._ydl
+        if ydl is not None:
+            try:
+                ydl.params["ratelimit"] = rate
+            except Exception:
+                pass
+        return rate
+
+    def on_progress(self, d: dict) -> None:
+        """À appeler depuis le hook yt-dlp : met à jour la part et cadence les fragments."""
+
+        rate = self.refresh()
+        if d.get("status") != "downloading":
+            return
+        filename = str(d.get("filename") or "")
+        downloaded = int(d.get("downloaded_bytes") or 0)
+        with self._lock:
+            previous = self._last_bytes.get(filename, 0)
+            self._last_bytes[filename] = downloaded
+            delta = max(0, downloaded - previous)
+            if rate is None or d.get("fragment_index") is None:
+                # HTTP direct : ydl.params['ratelimit'] s'en charge
+                return
+            now = time.monotonic()
+            self._tokens = min(float(rate), self._tokens + (now - self._stamp) * rate)
+            self._stamp = now
+            self._tokens -= delta
+            sleep_for = -self._tokens / rate if self._tokens < 0 else 0.0
+        if sleep_for > 0:
+            time.sleep(min(sleep_for, _MAX_PACE_SLEEP))
+
+    def release(self) -> None:
+        with self._lock:
+            self._ydl = None
+        self.governor.unregister(self)
+
+
+_governor: Optional[BandwidthGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_bandwidth_governor() -> BandwidthGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            governor = BandwidthGovernor()
+            governor.configure_from(load_config())
+            _governor = governor
+        return _governor
@@ -0,0 +1,255 @@
+"""Transcription directe depuis les sous-titres publiés, sans télécharger ni envoyer l'audio.
+
+Beaucoup de vidéos exposent déjà ``subtitles`` (manuels) ou ``automatic_captions`` dans l'info
+dict. ``fetch_captions`` retient la meilleure piste (manuelle d'abord, puis automatique dans la
+langue d'origine), la convertit en texte brut et en SRT dans ``TRANSCRIPTION_DIR`` et renvoie
+``None`` quand aucune piste n'est exploitable : l'appelant repart alors sur l'audio.
+"""
+
+from __future__ import annotations
+
+import html
+import pathlib
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from yt_dlp import YoutubeDL
+
+from config import DEFAULT_CONFIG, load_config
+from core.download_core import YtdlpLogger, cookie_strategy_key, sanitize_filename
+from core.rate_limit import call_limited
+from paths import TRANSCRIPTION_DIR
+
+KIND_MANUAL = "manual"
+KIND_AUTO = "auto"
+
+TRANSCRIPT_EXTS = (".txt", ".srt")
+# Pistes publiées comme « sous-titres » qui n'en sont pas
+_IGNORED_LANGS = {"live_chat", "rechat"}
+# En dessous, la piste est vide ou se limite à « [Musique] »
+MIN_TRANSCRIPT_CHARS = 40
+
+_TIMESTAMP = r"(?:\d+:)?\d{1,2}:\d{2}[.,]\d{3}"
+_CUE_TIMING = re.compile(rf"^\s*({_TIMESTAMP})\s*-->\s*({_TIMESTAMP})")
+_TAG = re.compile(r"<[^>]*>")
+
+
+@dataclass
+class CaptionTrack:
+    lang: str
+    kind: str
+    url: str
+    name: str = ""
+
+
+@dataclass
+class Cue:
+    start: float
+    end: float
+    text: str
+
+
+@dataclass
+class CaptionResult:
+    text_path: pathlib.Path
+    srt_path: pathlib.Path
+    lang: str
+    kind: str
+
+    def describe(self) -> str:
+        origin = "sous-titres" if self.kind == KIND_MANUAL else "sous-titres automatiques"
+        return f"{origin} ({self.lang})"
+
+
+def is_transcript_file(path: Optional[str]) -> bool:
+    """Vrai pour un résultat déjà textuel (rien à envoyer au webhook de transcription)."""
+
+    return bool(path) and pathlib.Path(path).suffix.lower() in TRANSCRIPT_EXTS
+
+
+def caption_languages(cfg: Optional[dict] = None) -> List[str]:
+    raw = (cfg or load_config()).get("caption_languages") or DEFAULT_CONFIG["caption_languages"]
+    return [part.strip().lower() for part in str(raw).replace(";", ",").split(",") if part.strip()]
+
+
+# --- Choix de la piste -------------------------------------------------------------------
+
+
+def _vtt_url(entries: Iterable[dict]) -> Optional[str]:
+    for entry in entries or []:
+        if (entry.get("ext") or "").lower() == "vtt" and entry.get("url"):
+            return entry["url"]
+    return None
+
+
+def _lang_matches(lang: str, wanted: str) -> bool:
+    lang = lang.lower()
+    return lang == wanted or lang.split("-")[0] == wanted.split("-")[0]
+
+
+def _first_match(tracks: Dict[str, list], wanted: Iterable[str]) -> Optional[str]:
+    for target in wanted:
+        for lang in tracks:
+            if _lang_matches(lang, target) and _vtt_url(tracks[lang]):
+                return lang
+    return None
+
+
+def pick_caption_track(info: dict, languages: Optional[List[str]] = None) -> Optional[CaptionTrack]:
+    """Meilleure piste VTT : manuelle (langues préférées, puis langue d'origine, puis la seule
+    disponible), sinon automatique dans la langue parlée — jamais une traduction automatique."""
+
+    languages = caption_languages() if languages is None else languages
+    original = (info.get("language") or "").lower()
+
+    manual = {k: v for k, v in (info.get("subtitles") or {}).items() if k not in _IGNORED_LANGS}
+    wanted = list(languages) + ([original] if original else [])
+    lang = _first_match(manual, wanted)
+    if lang is None:
+        usable = [k for k, v in manual.items() if _vtt_url(v)]
+        lang = usable[0] if len(usable) == 1 else None
+    if lang is not None:
+        name = manual[lang][0].get("name") or ""
+        return CaptionTrack(lang, KIND_MANUAL, _vtt_url(manual[lang]) or "", name)
+
+    auto = info.get("automatic_captions") or {}
+    # YouTube suffixe « -orig » la piste reconnue dans la langue parlée ; les autres sont traduites
+    spoken = [k for k in auto if k.endswith("-orig") and _vtt_url(auto[k])]
+    if spoken:
+        lang = spoken[0]
+    elif original:
+        lang = _first_match(auto, [original])
+    else:
+        lang = _first_match(auto, languages)
+    if lang is None:
+        return None
+    name = auto[lang][0].get("name") or ""
+    return CaptionTrack(lang.removesuffix("-orig"), KIND_AUTO, _vtt_url(auto[lang]) or "", name)
+
+
+# --- Conversion ----------------------------------------------------------------------------
+
+
+def _seconds(stamp: str) -> float:
+    parts = stamp.replace(",", ".").split(":")
+    total = 0.0
+    for part in parts:
+        total = total * 60 + float(part)
+    return total
+
+
+def parse_vtt(text: str, kind: str = KIND_MANUAL) -> List[Cue]:
+    """Cues d'un WebVTT, balises retirées.
+
+    Les sous-titres automatiques de YouTube (``KIND_AUTO``) répètent la ligne précédente dans
+    chaque cue (affichage « roll-up ») : seules les lignes nouvelles sont conservées. Les
+    sous-titres manuels sont repris tels quels, répétitions comprises.
+    """
+
+    cues: List[Cue] = []
+    rolling = kind == KIND_AUTO
+    last_line = ""
+    timing = None
+    fresh: List[str] = []
+
+    def _close() -> None:
+        if timing is not None and fresh:
+            cues.append(Cue(_seconds(timing.group(1)), _seconds(timing.group(2)), "\n".join(fresh)))
+
+    # Lecture ligne à ligne : seule une ligne réellement vide clôt une cue. Les cues
+    # automatiques de YouTube contiennent une ligne faite d'un simple espace.
+    for raw in text.lstrip("\ufeff").splitlines():
+        if "-->" in raw:
+            _close()
+            timing, fresh = _CUE_TIMING.match(raw.strip()), []
+            continue
+        if not raw:
+            _close()
+            timing, fresh = None, []
+            continue
+        if timing is None:
+            continue
+        line = html.unescape(_TAG.sub("", raw)).strip()
+        if not line or (rolling and line == last_line):
+            continue
+        fresh.append(line)
+        last_line = line
+    _close()
+    return cues
+
+
+def _srt_stamp(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def cues_to_srt(cues: List[Cue]) -> str:
+    blocks = [
+        f"{idx}\n{_srt_stamp(cue.start)} --> {_srt_stamp(cue.end)}\n{cue.text}"
+        for idx, cue in enumerate(cues, start=1)
+    ]
+    return "\n\n".join(blocks) + "\n" if blocks else ""
+
+
+def cues_to_text(cues: List[Cue]) -> str:
+    return "\n".join(cue.text for cue in cues) + ("\n" if cues else "")
+
+
+# --- Récupération --------------------------------------------------------------------------
+
+
+def _download_track(url: str, page_url: str) -> str:
+    cfg = load_config()
+    user_agent = (cfg.get("user_agent") or DEFAULT_CONFIG["user_agent"]).strip()
+    opts = {
+        "quiet": True,
+        "no_warnings": True,
+        "socket_timeout": 15,
+        "logger": YtdlpLogger(lambda _: None),
+        "http_headers": {"User-Agent": user_agent},
+    }
+
+    def _fetch() -> str:
+        with YoutubeDL(opts) as ydl:
+            with ydl.urlopen(url) as response:
+                return response.read().decode("utf-8", "replace")
+
+    return call_limited(cookie_strategy_key(page_url), _fetch)
+
+
+def fetch_captions(
+    info: dict,
+    *,
+    languages: Optional[List[str]] = None,
+    output_dir: pathlib.Path = TRANSCRIPTION_DIR,
+) -> Optional[CaptionResult]:
+    """Écrit ``<titre> [id].<langue>.txt`` et ``.srt`` depuis la meilleure piste, ou renvoie ``None``."""
+
+    track = pick_caption_track(info, languages)
+    if track is None:
+        return None
+    page_url = info.get("webpage_url") or info.get("original_url") or track.url
+    try:
+        cues = parse_vtt(_download_track(track.url, page_url), track.kind)
+    except Exception:
+        return None
+    text = cues_to_text(cues)
+    if len(text.strip()) < MIN_TRANSCRIPT_CHARS:
+        return None
+
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    title = sanitize_filename(info.get("title") or "transcription")
+    # Le jeton [id] distingue deux vidéos de même titre, comme pour les autres sorties
+    stem = f"{title} [{sanitize_filename(str(info['id']))}]" if info.get("id") else title
+    # Même vidéo, même langue : on écrase, le contenu est identique
+    text_path = output_dir / f"{stem}.{track.lang}.txt"
+    srt_path = output_dir / f"{stem}.{track.lang}.srt"
+    text_path.write_text(text, encoding="utf-8")
+    srt_path.write_text(cues_to_srt(cues), encoding="utf-8")
+    return CaptionResult(text_path, srt_path, track.lang, track.kind)
+
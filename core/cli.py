@@ -0,0 +1,188 @@
+"""Téléchargements par lots sans interface : ``python -m core <url> [<url> ...]``."""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from config import load_config
+from core.download_core import (
+    JOB_TRANSCRIPTION,
+    JOB_VIDEO,
+    Task,
+    cookie_strategy_key,
+    human_eta,
+    human_rate,
+    normalize_url,
+)
+from core.engine import DownloadEngine, DownloadResult, finalize_download
+from core.playlist import expand_collection, ingest_summary, is_collection_url
+from core.sections import SectionError, parse_sections
+
+_PRINT_LOCK = threading.Lock()
+_PROGRESS_FPS = 1.0
+
+
+def _emit(prefix: str, text: str, *, stream=None) -> None:
+    with _PRINT_LOCK:
+        print(f"[{prefix}] {text}", file=stream or sys.stdout, flush=True)
+
+
+def platform_for_url(url: str) -> str:
+    return "tiktok" if cookie_strategy_key(url) == "tiktok" else "youtube"
+
+
+def build_options(task: Task, *, audio_only: bool = False, format_override: Optional[str] = None) -> Dict[str, object]:
+    if task.platform == "tiktok":
+        from modules.module_tiktok import build_download_options as build_tiktok_options
+
+        return build_tiktok_options(task, format_override=format_override or ("bestaudio/best" if audio_only else None))
+    from modules.module_youtube import build_download_options as build_youtube_options
+
+    return build_youtube_options(task, audio_only=audio_only, format_override=format_override)
+
+
+def _read_urls(args: argparse.Namespace) -> List[str]:
+    urls = list(args.urls or [])
+    if args.file:
+        text = pathlib.Path(args.file).read_text(encoding="utf-8", errors="ignore")
+        urls.extend(line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#"))
+    seen: set = set()
+    unique: List[str] = []
+    for url in urls:
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+def _expand(urls: List[str], args: argparse.Namespace) -> List[str]:
+    expanded: List[str] = []
+    for url in urls:
+        if args.no_playlist or not is_collection_url(url, include_mixed=args.playlist):
+            expanded.append(url)
+            continue
+        try:
+            listing = expand_collection(url, limit=args.limit, on_status=lambda text, u=url: _emit(u, text))
+        except Exception as exc:
+            _emit("ERREUR", f"{url} : {exc}", stream=sys.stderr)
+            continue
+        _emit(url, ingest_summary(listing, len(listing.entries)))
+        expanded.extend(entry.url for entry in listing.entries)
+    return expanded
+
+
+def run_one(
+    url: str,
+    *,
+    audio_only: bool = False,
+    format_override: Optional[str] = None,
+    quiet: bool = False,
+    job_type: str = JOB_VIDEO,
+    sections: Optional[str] = None,
+) -> DownloadResult:
+    task = Task(url=url, platform=platform_for_url(url), source="cli", job_type=job_type, sections=sections)
+    prefix = url
+
+    def on_progress(downloaded: int, total: int, speed: float, eta: int, _filename: str) -> None:
+        if quiet:
+            return
+        pct = int(downloaded * 100 / total) if total else 0
+        _emit(prefix, f"{pct:>3}% — {human_rate(speed)} — ETA {human_eta(eta)}")
+
+    def on_status(text: str) -> None:
+        if not quiet:
+            _emit(prefix, text)
+
+    try:
+        opts = build_options(task, audio_only=audio_only, format_override=format_override)
+    except Exception as exc:
+        return DownloadResult(False, str(exc), {})
+    engine = DownloadEngine(task, opts, on_progress=on_progress, on_status=on_status, progress_fps=_PROGRESS_FPS)
+    result = engine.run()
+    if result.ok:
+        audio_path = finalize_download(task, result.info, on_status)
+        wants_audio = audio_only or job_type == JOB_TRANSCRIPTION
+        final = (audio_path if wants_audio else None) or task.final_video_path or audio_path or result.message
+        result = DownloadResult(True, str(final), result.info)
+    return result
+
+
+def main_cli(argv: Sequence[str] | None = None) -> int:
+    """Point d'entrée CLI : ``python -m core <url> ...``."""
+
+    parser = argparse.ArgumentParser(prog="python -m core", description="Téléchargements YouTube/TikTok sans interface")
+    parser.add_argument("urls", nargs="*", help="URLs à télécharger")
+    parser.add_argument("-f", "--file", help="Fichier texte contenant une URL par ligne")
+    parser.add_argument("--audio", action="store_true", help="Audio uniquement")
+    parser.add_argument(
+        "--transcription",
+        action="store_true",
+        help="Plus petite piste audio exploitable, sans vidéo ni réencodage (pour transcription)",
+    )
+    parser.add_argument("--format", dest="format_override", help="Sélecteur de format yt-dlp")
+    parser.add_argument(
+        "--sections",
+        help="Extrait seulement : plages et/ou chapitres, ex. \"1:30-3:30, #2, Intro\"",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Téléchargements simultanés (par défaut: max_parallel_downloads)",
+    )
+    parser.add_argument(
+        "--playlist",
+        action="store_true",
+        help="Traiter aussi les URLs watch?v=…&list=… comme des playlists",
+    )
+    parser.add_argument("--no-playlist", action="store_true", help="Ne jamais développer les playlists/chaînes")
+    parser.add_argument("--limit", type=int, default=None, help="Nombre maximal d'éléments par playlist/chaîne")
+    parser.add_argument("-q", "--quiet", action="store_true", help="N'afficher que le résultat final")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    try:
+        urls = _read_urls(args)
+    except OSError as exc:
+        print(f"Erreur : {exc}", file=sys.stderr)
+        return 2
+    if args.sections:
+        try:
+            parse_sections(args.sections)
+        except SectionError as exc:
+            print(f"Erreur : {exc}", file=sys.stderr)
+            return 2
+    urls = _expand(urls, args)
+    if not urls:
+        parser.print_usage(sys.stderr)
+        return 2
+
+    jobs = args.jobs or int(load_config().get("max_parallel_downloads") or 1)
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(urls))), thread_name_prefix="dl") as pool:
+        futures = {
+            url: pool.submit(
+                run_one,
+                url,
+                audio_only=args.audio,
+                format_override=args.format_override,
+                quiet=args.quiet,
+                job_type=JOB_TRANSCRIPTION if args.transcription else JOB_VIDEO,
+                sections=args.sections,
+            )
+            for url in urls
+        }
+        for url, future in futures.items():
+            result = future.result()
+            if result.ok:
+                _emit("OK", f"{url} → {result.message}")
+            else:
+                failures += 1
+                _emit("ERREUR", f"{url} : {result.message}", stream=sys.stderr)
+    return 1 if failures else 0
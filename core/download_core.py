@@ -1,18 +1,24 @@
 import os
 import pathlib
-import random
 import re
 import shutil
-import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import Future
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
-from PySide6.QtCore import QThread, Signal
 from yt_dlp import YoutubeDL
 
 from config import DEFAULT_CONFIG, load_config
+from core.audio_engine import extract_audio
+from core.info_cache import get_info_cache
+from core.media_catalog import get_media_catalog
+from core.rate_limit import call_limited
+from core.sections import section_slug
+from core.video_ids import extract_video_key
 from paths import (
     AUDIOS_DIR,
     OUT_DIR,
@@ -24,14 +30,20 @@ from paths import (
 )
 
 BROWSER_TRY_ORDER = ("edge", "chrome", "brave", "vivaldi", "opera", "chromium", "firefox")
+COOKIE_STRATEGY_TTL = 30 * 60
 
 
 class YtdlpLogger:
-    def __init__(self, emit: Callable[[str], None]):
+    def __init__(self, emit: Callable[[str], None], on_debug: Optional[Callable[[str], None]] = None):
         self.emit = emit
+        self.on_debug = on_debug
 
-    def debug(self, _msg: str) -> None:  # pragma: no cover - silencieux par défaut
-        return
+    def debug(self, msg: str) -> None:  # pragma: no cover - silencieux par défaut
+        if self.on_debug:
+            try:
+                self.on_debug(msg)
+            except Exception:
+                pass
 
     def warning(self, msg: str) -> None:
         try:
@@ -94,11 +106,127 @@ def _browser_fallback_order(cfg: dict) -> List[str]:
     return []
 
 
-def _backoff_sleep(attempt: int, base: float = 1.5, jitter: bool = True) -> None:
-    delay = base ** attempt
-    if jitter:
-        delay += random.uniform(0, 0.5)
-    time.sleep(delay)
+class CookieStrategyMemo:
+    """Mémorise, par plateforme, la dernière stratégie de cookies qui a fonctionné.
+
+    Une stratégie est ``"browser:<nom>"``, ``"cookiefile"`` ou ``"none"``. L'entrée expire
+    après ``ttl`` secondes et disparaît dès que la stratégie mémorisée échoue.
+    """
+
+    def __init__(self, ttl: float = COOKIE_STRATEGY_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            strategy, stamp = entry
+            if time.monotonic() - stamp > self.ttl:
+                self._entries.pop(key, None)
+                return None
+            return strategy
+
+    def remember(self, key: str, strategy: str) -> None:
+        with self._lock:
+            self._entries[key] = (strategy, time.monotonic())
+
+    def forget(self, key: str, strategy: Optional[str] = None) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (strategy is None or entry[0] == strategy):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_COOKIE_MEMO = CookieStrategyMemo()
+
+
+class SingleFlight:
+    """Un seul appel en cours par clé : les appelants concurrents attendent et partagent son résultat."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        call.set_result(result)
+        return result
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Onglets, bot Telegram et CLI : une même URL n'est extraite qu'une fois à la fois
+_EXTRACTIONS = SingleFlight()
+
+
+def cookie_strategy_key(url: str) -> str:
+    low = (url or "").lower()
+    if "youtu" in low:
+        return "youtube"
+    if "tiktok.com" in low:
+        return "tiktok"
+    try:
+        return (urlparse(url).hostname or "").lower()
+    except Exception:
+        return ""
+
+
+def _cookie_strategies(cfg: dict) -> List[str]:
+    """Ordre de repli nominal (sans mémo) des stratégies de cookies."""
+
+    pref = (cfg.get("browser_cookies") or "auto").strip().lower()
+    cookies_path = (cfg.get("cookies_path") or "").strip()
+    if pref == "none":
+        return ["none"]
+    order: List[str] = []
+    if pref == "cookiefile" and cookies_path:
+        order.append("cookiefile")
+    order.extend(f"browser:{browser}" for browser in _browser_fallback_order(cfg))
+    if pref == "auto" and cookies_path:
+        order.append("cookiefile")
+    order.append("none")
+    return order
+
+
+def _prioritize_strategy(order: List[str], memo_key: str) -> Tuple[List[str], Optional[str]]:
+    remembered = _COOKIE_MEMO.get(memo_key)
+    if not remembered or remembered not in order or order[0] == remembered:
+        return order, None
+    return [remembered] + [s for s in order if s != remembered], remembered
+
+
+def _opts_for_strategy(base_opts: Dict[str, Any], strategy: str, cookies_path: str) -> Dict[str, Any]:
+    local_opts = dict(base_opts)
+    local_opts.pop("cookiefile", None)
+    local_opts.pop("cookiesfrombrowser", None)
+    if strategy == "cookiefile":
+        local_opts["cookiefile"] = cookies_path
+    elif strategy.startswith("browser:"):
+        local_opts["cookiesfrombrowser"] = (strategy.split(":", 1)[1], None, None, None)
+    return local_opts
 
 
 def normalize_yt(u: str) -> str:
@@ -139,8 +267,69 @@ def normalize_url(u: str) -> str:
     return u
 
 
-def extract_basic_info(url: str) -> dict:
+def extract_basic_info(url: str, *, use_cache: bool = True) -> dict:
+    """Infos yt-dlp (sans téléchargement) pour ``url``, via le cache disque si possible.
+
+    ``use_cache=False`` force une extraction fraîche (URLs de formats signées à jour) ;
+    le résultat rafraîchit alors l'entrée du cache.
+    """
+
+    u = normalize_url(url)
+    platform = cookie_strategy_key(u)
+    cache = get_info_cache()
+    key = info_cache_key(u)
+    if use_cache:
+        cached = cache.get(key, platform)
+        if cached:
+            return cached
+
+    def _extract_and_cache() -> dict:
+        info = _extract_basic_info_live(u)
+        if info:
+            sanitized = YoutubeDL.sanitize_info(info)
+            cache.put(key, sanitized, platform)
+            # Un lien court (vm.tiktok.com…) alimente aussi l'entrée indexée par identifiant
+            resolved_key = _info_key_from_info(info)
+            if resolved_key and resolved_key != key:
+                cache.put(resolved_key, sanitized, platform)
+        return info
+
+    # Le dict partagé entre appelants concurrents est à traiter en lecture seule
+    return _EXTRACTIONS.do(key, _extract_and_cache)
+
+
+def info_cache_key(url: str) -> str:
+    """Clé de cache : ``plateforme:id`` si l'URL le permet hors ligne, sinon l'URL normalisée."""
+
+    key = extract_video_key(url)
+    return f"{key[0]}:{key[1]}" if key else normalize_url(url)
+
+
+def _info_key_from_info(info: dict) -> str:
+    extractor = (info.get("extractor_key") or "").strip().lower()
+    video_id = info.get("id") or ""
+    if extractor in ("youtube", "tiktok") and video_id:
+        return f"{extractor}:{video_id}"
+    return ""
+
+
+def cached_basic_info(url: str) -> Optional[dict]:
+    """Infos déjà en cache pour ``url``, sans aucun accès réseau."""
+
     u = normalize_url(url)
+    return get_info_cache().get(info_cache_key(u), cookie_strategy_key(u))
+
+
+def extract_flat_info(url: str, *, limit: Optional[int] = None) -> dict:
+    """Liste une playlist/chaîne en une requête (``extract_flat``) : entrées non résolues."""
+
+    extra: Dict[str, Any] = {"extract_flat": "in_playlist", "noplaylist": False}
+    if limit:
+        extra["playlistend"] = int(limit)
+    return _extract_basic_info_live(normalize_url(url), extra_opts=extra, first_entry=False)
+
+
+def _extract_basic_info_live(u: str, *, extra_opts: Optional[Dict[str, Any]] = None, first_entry: bool = True) -> dict:
     cfg = load_config()
     user_agent = (cfg.get("user_agent") or DEFAULT_CONFIG["user_agent"]).strip()
     base_opts: Dict[str, Any] = {
@@ -152,58 +341,48 @@ def extract_basic_info(url: str) -> dict:
     }
     if user_agent:
         base_opts["http_headers"] = {"User-Agent": user_agent}
+    base_opts.update(extra_opts or {})
 
     cookies_path = (cfg.get("cookies_path") or "").strip()
     browser_pref = (cfg.get("browser_cookies") or "auto").strip().lower()
+    explicit_browser = browser_pref in BROWSER_TRY_ORDER
+    memo_key = cookie_strategy_key(u)
 
-    def _extract(local_opts: Dict[str, Any]) -> dict:
-        last_exc: Exception | None = None
-        for attempt in range(3):
-            try:
-                with YoutubeDL(local_opts) as ydl:
-                    info = ydl.extract_info(u, download=False)
-                if info and info.get("entries"):
-                    info = info["entries"][0]
-                return info or {}
-            except Exception as exc:
-                last_exc = exc
-                msg = (str(exc) or "").lower()
-                if "429" in msg or "too many requests" in msg:
-                    _backoff_sleep(attempt)
-                    continue
-                raise
-        if last_exc:
-            raise last_exc
-        return {}
-
-    if browser_pref == "cookiefile" and cookies_path:
-        legacy_opts = dict(base_opts)
-        legacy_opts["cookiefile"] = cookies_path
-        legacy_opts.pop("cookiesfrombrowser", None)
-        try:
-            return _extract(legacy_opts)
-        except Exception:
-            pass
+    def _extract_once(local_opts: Dict[str, Any]) -> dict:
+        with YoutubeDL(local_opts) as ydl:
+            info = ydl.extract_info(u, download=False)
+        if first_entry and info and info.get("entries"):
+            info = info["entries"][0]
+        return info or {}
 
-    if browser_pref == "none":
-        opts_no_cookies = dict(base_opts)
-        opts_no_cookies.pop("cookiefile", None)
-        opts_no_cookies.pop("cookiesfrombrowser", None)
-        return _extract(opts_no_cookies)
+    def _extract(local_opts: Dict[str, Any]) -> dict:
+        return call_limited(memo_key, lambda: _extract_once(local_opts))
 
+    strategies, promoted = _prioritize_strategy(_cookie_strategies(cfg), memo_key)
     last_error: Exception | None = None
 
-    browsers = _browser_fallback_order(cfg)
-    explicit_browser = browser_pref in BROWSER_TRY_ORDER
-    for browser in browsers:
-        local_opts = dict(base_opts)
-        local_opts["cookiesfrombrowser"] = (browser, None, None, None)
+    for strategy in strategies:
         try:
-            return _extract(local_opts)
+            info = _extract(_opts_for_strategy(base_opts, strategy, cookies_path))
         except Exception as exc:
-            last_error = exc
+            _COOKIE_MEMO.forget(memo_key, strategy)
+            if strategy == promoted:
+                # La stratégie mémorisée ne marche plus : on rejoue l'ordre nominal
+                continue
             msg = (str(exc) or "").lower()
-            if browser == "firefox" and ("pycryptodomex" in msg or "cryptodome" in msg):
+            if strategy == "cookiefile":
+                last_error = exc
+                continue
+            if strategy == "none":
+                if browser_pref == "none" or not (_is_dpapi_error(exc) or _is_chrome_copy_error(exc)):
+                    raise
+                if last_error and not (_is_dpapi_error(last_error) or _is_chrome_copy_error(last_error)):
+                    raise last_error
+                raise RuntimeError(
+                    "Impossible de récupérer les informations vidéo : les cookies navigateur sont indisponibles et la requête sans cookies a échoué."
+                )
+            last_error = exc
+            if strategy == "browser:firefox" and ("pycryptodomex" in msg or "cryptodome" in msg):
                 if explicit_browser:
                     raise RuntimeError(
                         "Lecture des cookies Firefox impossible : installez 'pycryptodomex' (pip install pycryptodomex)."
@@ -212,31 +391,32 @@ def extract_basic_info(url: str) -> dict:
             if _is_dpapi_error(exc) or _is_chrome_copy_error(exc):
                 continue
             raise
+        _COOKIE_MEMO.remember(memo_key, strategy)
+        return info
 
-    if browser_pref == "auto" and cookies_path:
-        legacy_opts = dict(base_opts)
-        legacy_opts["cookiefile"] = cookies_path
-        legacy_opts.pop("cookiesfrombrowser", None)
-        try:
-            return _extract(legacy_opts)
-        except Exception as exc:
-            last_error = exc
+    if last_error:
+        raise last_error
+    return {}
 
-    opts_no_cookies = dict(base_opts)
-    opts_no_cookies.pop("cookiefile", None)
-    opts_no_cookies.pop("cookiesfrombrowser", None)
-    try:
-        return _extract(opts_no_cookies)
-    except Exception as exc:
-        if not (_is_dpapi_error(exc) or _is_chrome_copy_error(exc)):
-            raise
-        if last_error and not (_is_dpapi_error(last_error) or _is_chrome_copy_error(last_error)):
-            raise last_error
-        raise RuntimeError(
-            "Impossible de récupérer les informations vidéo : les cookies navigateur sont indisponibles et la requête sans cookies a échoué."
-        )
 
-    return {}
+def download_from_info(ydl: YoutubeDL, info: dict) -> dict:
+    """Télécharge depuis un dict d'infos déjà résolu, sans nouvelle extraction.
+
+    Équivalent de ``--load-info-json`` : les clés privées sont retirées puis yt-dlp refait
+    la sélection de formats avec les options de ``ydl`` avant de télécharger.
+    Un élément déjà présent dans l'archive revient sans ``requested_downloads``.
+    """
+
+    cleaned = YoutubeDL.sanitize_info(info, remove_private_keys=True)
+    return ydl.process_ie_result(cleaned, download=True) or {}
+
+
+JOB_VIDEO = "video"
+# Audio seul pour transcription : pas de flux vidéo, pas de réencodage
+JOB_TRANSCRIPTION = "transcription"
+# Plus petite piste audio encore exploitable pour la reconnaissance vocale
+TRANSCRIPTION_FORMAT = "wa[abr>=48]/ba/best"
+TRANSCRIPTION_MIN_ABR = 48
 
 
 @dataclass
@@ -255,245 +435,25 @@ class Task:
     platform: str = "youtube"
     source: str = "ui"
     chat_id: Optional[int] = None
-
-
-class DownloadWorker(QThread):
-    sig_progress = Signal(object, object, float, int, str)
-    sig_status = Signal(str)
-    sig_done = Signal(bool, str, dict)
-
-    def __init__(self, task: Task, ydl_opts: dict, parent=None):
-        super().__init__(parent)
-        self.task = task
-        self.ydl_opts = ydl_opts
-        self._stop = False
-
-    def stop(self) -> None:
-        self._stop = True
-
-    def run(self) -> None:
-        captured = {"fn": ""}
-
-        def hook(d):
-            if self._stop:
-                raise Exception("Interrompu par l’utilisateur")
-            st = d.get("status")
-            if st == "downloading":
-                downloaded = int(d.get("downloaded_bytes") or 0)
-                total = int(d.get("total_bytes") or d.get("total_bytes_estimate") or 0)
-                speed = float(d.get("speed") or 0.0)
-                eta = int(d.get("eta") or 0)
-                fn = d.get("filename") or self.task.filename or ""
-                self.sig_progress.emit(downloaded, total, speed, eta, fn)
-            elif st == "finished":
-                captured["fn"] = d.get("filename") or captured["fn"]
-                self.sig_status.emit(f"Terminé : {captured['fn']}")
-
-        opts = dict(self.ydl_opts)
-        opts["progress_hooks"] = [hook]
-        opts["quiet"] = True
-        opts["no_warnings"] = True
-        opts["logger"] = YtdlpLogger(lambda msg: self.sig_status.emit(msg))
-
-        cfg = load_config()
-        user_agent = (cfg.get("user_agent") or "").strip()
-        headers: Dict[str, str] = {}
-        if user_agent:
-            headers = dict(opts.get("http_headers") or {})
-            headers["User-Agent"] = user_agent
-            opts["http_headers"] = headers
-
-        try:
-            url = normalize_url(self.task.url)
-            cookies_path = (cfg.get("cookies_path") or "").strip()
-            browser_pref = (cfg.get("browser_cookies") or "auto").strip().lower()
-
-            base_opts = dict(opts)
-            base_opts.pop("cookiefile", None)
-            base_opts.pop("cookiesfrombrowser", None)
-
-            def _download_with_opts(local_opts: Dict[str, Any]) -> Tuple[dict, int]:
-                last_exc: Exception | None = None
-                for attempt in range(3):
-                    try:
-                        with YoutubeDL(local_opts) as ydl:
-                            info_inner = ydl.extract_info(url, download=True)
-                            ret = getattr(ydl, "_download_retcode", 0) or 0
-                        return info_inner, ret
-                    except Exception as exc:
-                        last_exc = exc
-                        msg = (str(exc) or "").lower()
-                        if "429" in msg or "too many requests" in msg:
-                            self.sig_status.emit("yt-dlp : HTTP 429, nouvelle tentative…")
-                            _backoff_sleep(attempt)
-                            continue
-                        raise
-                if last_exc:
-                    raise last_exc
-                return {}, 0
-
-            info: dict[str, Any] = {}
-            retcode = 0
-            dpapi_or_copy_issue = False
-            last_error: Exception | None = None
-            used_no_cookies = False
-            success = False
-
-            pycryptodomex_hint = "Lecture cookies Firefox impossible : installez 'pycryptodomex' (pip install pycryptodomex)."
-
-            def try_cookiefile() -> bool:
-                nonlocal info, retcode, opts, last_error
-                if not cookies_path:
-                    return False
-                local_opts = dict(base_opts)
-                local_opts["cookiefile"] = cookies_path
-                local_opts.pop("cookiesfrombrowser", None)
-                try:
-                    info, retcode = _download_with_opts(local_opts)
-                    opts = local_opts
-                    return True
-                except Exception as exc:
-                    last_error = exc
-                    return False
-
-            def try_browser(browser: str, explicit: bool) -> bool:
-                nonlocal info, retcode, opts, last_error, dpapi_or_copy_issue
-                local_opts = dict(base_opts)
-                local_opts["cookiesfrombrowser"] = (browser, None, None, None)
-                try:
-                    info, retcode = _download_with_opts(local_opts)
-                    opts = local_opts
-                    return True
-                except Exception as exc:
-                    last_error = exc
-                    msg = (str(exc) or "").lower()
-                    if browser == "firefox" and ("pycryptodomex" in msg or "cryptodome" in msg):
-                        self.sig_status.emit(pycryptodomex_hint)
-                        if explicit:
-                            raise RuntimeError(pycryptodomex_hint)
-                        return False
-                    if _is_dpapi_error(exc) or _is_chrome_copy_error(exc):
-                        dpapi_or_copy_issue = True
-                        return False
-                    raise
-
-            def try_no_cookies() -> bool:
-                nonlocal info, retcode, opts, last_error
-                local_opts = dict(base_opts)
-                local_opts.pop("cookiefile", None)
-                local_opts.pop("cookiesfrombrowser", None)
-                try:
-                    info, retcode = _download_with_opts(local_opts)
-                    opts = local_opts
-                    return True
-                except Exception as exc:
-                    last_error = exc
-                    return False
-
-            if browser_pref == "cookiefile":
-                success = try_cookiefile()
-            elif browser_pref == "none":
-                success = try_no_cookies()
-                used_no_cookies = True
-            else:
-                browsers = _browser_fallback_order(cfg)
-                explicit = browser_pref in BROWSER_TRY_ORDER
-                for browser in browsers:
-                    if try_browser(browser, explicit):
-                        success = True
-                        break
-
-                if not success and browser_pref == "auto" and try_cookiefile():
-                    success = True
-
-            if not success and not used_no_cookies:
-                if dpapi_or_copy_issue:
-                    self.sig_status.emit(
-                        "Cookies navigateur indisponibles (DPAPI/DB verrouillée). Passage en mode sans cookies."
-                    )
-                success = try_no_cookies()
-                used_no_cookies = True
-
-            if not success:
-                if last_error is not None:
-                    raise last_error
-                raise RuntimeError("Téléchargement impossible : toutes les stratégies de cookies ont échoué.")
-
-            fn = captured["fn"]
-            if not fn and info:
-                try:
-                    rd = (info.get("requested_downloads") or [])
-                    if rd:
-                        fn = rd[0].get("filepath") or rd[0].get("filename") or ""
-                except Exception:
-                    pass
-
-            if not info:
-                reused_info = {}
-                if retcode == 0:
-                    try:
-                        reused_info = extract_basic_info(url)
-                    except Exception:
-                        reused_info = {}
-
-                if reused_info and retcode == 0:
-                    video_id = reused_info.get("id") or ""
-                    existing = find_existing_outputs(video_id, self.task.platform)
-                    if (not video_id) or (not existing.get("audio") and not existing.get("video")):
-                        raise RuntimeError(
-                            "Téléchargement déjà enregistré dans l’archive mais aucun fichier final n’a été retrouvé. "
-                            "Supprime l’entrée correspondante dans archive.txt pour forcer un nouveau téléchargement."
-                        )
-                    if existing.get("audio"):
-                        self.task.final_audio_path = existing["audio"]
-                    if existing.get("video"):
-                        self.task.final_video_path = existing["video"]
-                    reuse_msg = existing.get("audio") or existing.get("video") or "Déjà téléchargé (archive)"
-                    if video_id:
-                        self.task.video_id = video_id
-                    self.sig_status.emit("Déjà téléchargé (archive)")
-                    self.sig_done.emit(True, reuse_msg, reused_info or {})
-                    return
-
-                raise RuntimeError("yt-dlp n’a renvoyé aucune information (URL invalide, vidéo privée ou cookies requis).")
-
-            if fn:
-                self.task.filename = fn
-
-            self.sig_done.emit(True, fn or "Téléchargement terminé", info or {})
-        except Exception as e:
-            self.sig_done.emit(False, str(e), {})
-
-
-class CommandWorker(QThread):
-    sig_line = Signal(str)
-    sig_done = Signal(int)
-
-    def __init__(self, cmd: List[str], cwd: pathlib.Path | None = None, env: dict | None = None, parent=None):
-        super().__init__(parent)
-        self.cmd = cmd
-        self.cwd = str(cwd) if cwd else None
-        self.env = env
-
-    def run(self) -> None:
-        try:
-            proc = subprocess.Popen(
-                self.cmd,
-                cwd=self.cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                env=self.env,
-                shell=False,
-            )
-            assert proc.stdout is not None
-            for line in proc.stdout:
-                self.sig_line.emit(line.rstrip())
-            proc.wait()
-            self.sig_done.emit(proc.returncode or 0)
-        except Exception as e:
-            self.sig_line.emit(f"[ERREUR] {e}")
-            self.sig_done.emit(1)
+    job_id: Optional[int] = None
+    # Gabarit de sortie figé au premier lancement : une reprise retrouve ses fichiers .part
+    outtmpl: Optional[str] = None
+    # Extraction audio retenue par ensure_audio : "copy" (remux) ou "encode" (MP3)
+    audio_method: Optional[str] = None
+    job_type: str = "video"
+    # Transcription servie par les sous-titres (.txt) : aucun audio à télécharger ni envoyer
+    transcript_path: Optional[str] = None
+    # Téléchargement partiel : « 1:30-3:30, #2, Intro » (voir core.sections)
+    sections: Optional[str] = None
+
+    @property
+    def media_id(self) -> Optional[str]:
+        """Identifiant des fichiers produits : un extrait est distinct de la vidéo complète."""
+
+        slug = section_slug(self.sections) if self.sections else ""
+        if self.video_id and slug:
+            return f"{self.video_id}@{slug}"
+        return self.video_id
 
 
 _RESERVED = '<>:"/\\|?*'
@@ -525,41 +485,39 @@ def find_existing_outputs(video_id: str, platform: Optional[str] = None) -> dict
     found = {"audio": None, "video": None}
     if not video_id:
         return found
+    try:
+        found.update(get_media_catalog().lookup(video_id, platform))
+    except Exception:
+        pass
+    return found
 
-    token = f"[{video_id}]"
 
-    def _pick_latest(paths: List[pathlib.Path]) -> Optional[pathlib.Path]:
-        if not paths:
-            return None
-        try:
-            return max(paths, key=lambda p: p.stat().st_mtime)
-        except Exception:
-            return paths[0]
-
-    audio_exts = {".mp3", ".m4a", ".wav", ".ogg", ".flac"}
-    video_exts = {".mp4", ".mkv", ".webm", ".mov"}
+def _library_dirs(platform: str) -> List[pathlib.Path]:
+    return [get_video_dir(platform), get_audio_dir(platform), VIDEOS_DIR, AUDIOS_DIR]
 
-    audio_base = AUDIOS_DIR if not platform else get_audio_dir(platform)
-    video_base = VIDEOS_DIR if not platform else get_video_dir(platform)
 
-    try:
-        audio_candidates = [
-            p for p in audio_base.glob(f"*{token}*") if p.is_file() and p.suffix.lower() in audio_exts
-        ]
-        video_candidates = [
-            p for p in video_base.glob(f"*{token}*") if p.is_file() and p.suffix.lower() in video_exts
-        ]
+def _download_siblings(task: Task, exts: set) -> List[pathlib.Path]:
+    """Fichiers produits par le téléchargement de ``task`` dans son dossier source.
 
-        audio_path = _pick_latest(audio_candidates)
-        video_path = _pick_latest(video_candidates)
-        if audio_path:
-            found["audio"] = str(audio_path)
-        if video_path:
-            found["video"] = str(video_path)
-    except Exception:
-        pass
+    Dans un sous-dossier dédié (YouTube), on le parcourt ; dans un dossier de bibliothèque
+    (TikTok écrit directement dans ``Videos/Tiktok``), on ne teste que les noms dérivés du
+    fichier téléchargé pour ne pas parcourir toute la bibliothèque.
+    """
 
-    return found
+    src = pathlib.Path(task.filename)
+    src_dir = src.parent
+    platform = (task.platform or "").strip().lower() or "youtube"
+    token = f"[{task.media_id}]"
+    if src_dir in _library_dirs(platform):
+        stem = src.stem
+        if stem.lower().endswith(tuple(exts)):
+            stem = pathlib.Path(stem).stem
+        candidates = [src_dir / f"{stem}{ext}" for ext in sorted(exts)]
+        return [p for p in candidates if token in p.name and p.is_file()]
+    try:
+        return [p for p in src_dir.iterdir() if token in p.name and p.is_file()]
+    except OSError:
+        return []
 
 
 def move_final_outputs(task: Task) -> dict:
@@ -574,11 +532,9 @@ def move_final_outputs(task: Task) -> dict:
         audio_dir = get_audio_dir(platform or "youtube")
         video_dir = get_video_dir(platform or "youtube")
         src_dir = pathlib.Path(task.filename).parent
-        token = f"[{task.video_id}]"
+        catalog = get_media_catalog()
 
-        for p in list(src_dir.glob(f"*{token}*")):
-            if not p.is_file():
-                continue
+        for p in _download_siblings(task, {".mp4", ".mp3", ".mkv", ".webm", ".mov"}):
             ext = p.suffix.lower()
 
             if ext in {".m4a", ".aac", ".wav", ".ogg", ".flac"}:
@@ -612,13 +568,17 @@ def move_final_outputs(task: Task) -> dict:
             else:
                 safe_stem = safe_prefix
             safe_name = f"{safe_stem}{ext}"
-            dst = _unique_path(base_dir / safe_name)
+            target = base_dir / safe_name
+            # Déjà à sa place (TikTok écrit directement dans la bibliothèque)
+            dst = p if target == p else _unique_path(target)
 
-            try:
-                p.replace(dst)
-            except Exception:
-                shutil.move(str(p), str(dst))
+            if dst != p:
+                try:
+                    p.replace(dst)
+                except Exception:
+                    shutil.move(str(p), str(dst))
 
+            catalog.record(dst, task.media_id, platform or "youtube")
             if base_dir == video_dir:
                 moved["video"] = str(dst)
                 task.final_video_path = str(dst)
@@ -640,15 +600,19 @@ def move_final_outputs(task: Task) -> dict:
 def cleanup_orphans_in_outputs(task: Task) -> None:
     if not task.video_id:
         return
-    token = f"[{task.video_id}]"
     platform = (task.platform or "").strip().lower()
     audio_dir = get_audio_dir(platform or "youtube")
     try:
-        for p in audio_dir.glob(f"*{token}*"):
-            if not p.is_file():
-                continue
-            ext = p.suffix.lower()
-            if ext == ".m4a" or (ext == ".mp4" and ".f" in p.stem) or ext in {".aac", ".wav", ".ogg", ".flac"}:
+        known = get_media_catalog().paths_for(task.media_id, platform or "youtube")
+        finals = {str(row["path"]) for row in known}
+        stems = {pathlib.Path(str(row["path"])).stem for row in known}
+        if task.filename:
+            stems.add(pathlib.Path(task.filename).stem)
+        for stem in stems:
+            for ext in (".m4a", ".aac", ".wav", ".ogg", ".flac"):
+                p = audio_dir / f"{stem}{ext}"
+                if str(p) in finals or not p.is_file():
+                    continue
                 try:
                     p.unlink()
                 except Exception:
@@ -657,6 +621,44 @@ def cleanup_orphans_in_outputs(task: Task) -> None:
         pass
 
 
+def cleanup_download_residuals(task: Task) -> None:
+    """Supprime les fichiers intermédiaires (.part, flux séparés…) laissés à côté du téléchargement."""
+
+    if not task.video_id or not task.filename:
+        return
+    if not pathlib.Path(task.filename).parent.exists():
+        return
+    finals = {str(row["path"]) for row in get_media_catalog().paths_for(task.media_id)}
+    residual_exts = {".part", ".ytdl", ".temp", ".m4a", ".webm", ".webp", ".jpg", ".json", ".vtt"}
+    for p in _download_siblings(task, residual_exts | {".mp4", ".mp3", ".mkv", ".mov"}):
+        try:
+            if str(p) in finals:
+                continue
+            ext = p.suffix.lower()
+            if ext == ".mp4":
+                if ".f" in p.stem:
+                    p.unlink()
+                continue
+            if ext == ".mp3":
+                continue
+            p.unlink()
+        except Exception:
+            pass
+
+
+def _extract_task_audio(task: Task, src: pathlib.Path) -> Optional[str]:
+    platform = (task.platform or "").strip().lower()
+    audio_dir = get_audio_dir(platform or "youtube")
+    try:
+        result = extract_audio(src, audio_dir, sanitize_filename(src.stem), choose_path=_unique_path)
+    except Exception:
+        return None
+    task.final_audio_path = str(result.path)
+    task.audio_method = result.method
+    get_media_catalog().record(result.path, task.media_id, platform or "youtube")
+    return task.final_audio_path
+
+
 def ensure_audio(task: Task) -> Optional[str]:
     if task.final_audio_path and os.path.exists(task.final_audio_path):
         return task.final_audio_path
@@ -664,37 +666,33 @@ def ensure_audio(task: Task) -> Optional[str]:
         return None
     if not shutil.which("ffmpeg"):
         return None
+    return _extract_task_audio(task, pathlib.Path(task.final_video_path))
 
-    src = pathlib.Path(task.final_video_path)
-    base = src.stem
-    safe_base = sanitize_filename(base)
-    platform = (task.platform or "").strip().lower()
-    audio_dir = get_audio_dir(platform or "youtube")
-    dst = _unique_path(audio_dir / f"{safe_base}.mp3")
 
-    try:
-        proc = subprocess.run(
-            [
-                "ffmpeg",
-                "-y",
-                "-i",
-                str(src),
-                "-vn",
-                "-acodec",
-                "libmp3lame",
-                "-b:a",
-                "192k",
-                str(dst),
-            ],
-            capture_output=True,
-            text=True,
-        )
-        if proc.returncode == 0 and dst.exists():
-            task.final_audio_path = str(dst)
-            return task.final_audio_path
-    except Exception:
-        pass
-    return None
+def finalize_transcription_audio(task: Task) -> Optional[str]:
+    """Job audio seul : range la piste téléchargée dans le dossier audio et supprime la source."""
+
+    if task.final_audio_path and os.path.exists(task.final_audio_path):
+        return task.final_audio_path
+    src = pathlib.Path(task.filename) if task.filename else None
+    if src is None or not src.is_file():
+        # Réutilisation d'une vidéo déjà archivée
+        return ensure_audio(task)
+    if not shutil.which("ffmpeg"):
+        return None
+    audio_path = _extract_task_audio(task, src)
+    if audio_path:
+        try:
+            src.unlink()
+        except OSError:
+            pass
+        cleanup_download_residuals(task)
+        try:
+            if is_path_in_dir(src.parent, OUT_DIR) and src.parent not in _library_dirs(task.platform or "youtube"):
+                delete_dir_if_empty(src.parent)
+        except Exception:
+            pass
+    return audio_path
 
 
 def human_size(n: Optional[float]) -> str:
@@ -745,6 +743,16 @@ def pick_best_audio(formats: List[dict], mp4_friendly: bool) -> Optional[dict]:
     return None
 
 
+def pick_transcription_audio(formats: List[dict]) -> Optional[dict]:
+    """Équivalent local de ``TRANSCRIPTION_FORMAT`` pour afficher la taille estimée."""
+
+    audios = [f for f in formats if f.get("vcodec") in (None, "none") and f.get("acodec") not in (None, "none")]
+    adequate = [f for f in audios if (f.get("abr") or f.get("tbr") or 0) >= TRANSCRIPTION_MIN_ABR]
+    if adequate:
+        return sorted(adequate, key=lambda x: x.get("abr") or x.get("tbr") or 0)[0]
+    return pick_best_audio(formats, mp4_friendly=False)
+
+
 def list_video_formats(formats: List[dict], mp4_friendly: bool) -> List[dict]:
     vids = [f for f in formats if f.get("acodec") in (None, "none") and f.get("vcodec") not in (None, "none")]
     if mp4_friendly:
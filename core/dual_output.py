@@ -0,0 +1,99 @@
+"""Fusion vidéo + audio et extraction de l'audio en un seul passage ffmpeg.
+
+Sans cela, yt-dlp fusionne ``bv*+ba`` en MP4 puis ``ensure_audio`` relit tout le fichier pour
+produire l'audio. ``DualOutputMergerPP`` remplace ``FFmpegMergerPP`` : une seule invocation
+ffmpeg, deux sorties (le conteneur fusionné et la piste audio, copiée si son codec est accepté
+par la transcription, sinon encodée en MP3), l'audio étant écrit directement dans le dossier
+audio de la plateforme.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+from typing import List, Optional
+
+from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.postprocessor.ffmpeg import FFmpegMergerPP, FFmpegPostProcessorError
+from yt_dlp.utils import prepend_extension
+
+from core.audio_engine import (
+    DEFAULT_BITRATE,
+    METHOD_COPY,
+    METHOD_ENCODE,
+    TRANSCRIPTION_COPY_CODECS,
+    probe_audio,
+)
+from core.download_core import _unique_path, sanitize_filename
+
+# Clés posées dans l'info dict du format téléchargé
+DUAL_AUDIO_PATH_KEY = "dual_audio_filepath"
+DUAL_AUDIO_METHOD_KEY = "dual_audio_method"
+
+
+def _codec_from_format(fmt: dict) -> Optional[str]:
+    acodec = (fmt.get("acodec") or "").lower()
+    if acodec.startswith("mp4a"):
+        return "aac"
+    return acodec.split(".")[0] or None
+
+
+class DualOutputMergerPP(FFmpegMergerPP):
+    def __init__(self, downloader, audio_dir: str, *, bitrate: str = DEFAULT_BITRATE):
+        super().__init__(downloader)
+        self.audio_dir = pathlib.Path(audio_dir)
+        self.bitrate = bitrate
+
+    def _audio_target(self, info: dict, fmt: dict) -> tuple:
+        stream = probe_audio(pathlib.Path(fmt["filepath"]), ffprobe_bin=self.probe_executable or "ffprobe")
+        codec = stream.codec if stream else _codec_from_format(fmt)
+        ext = TRANSCRIPTION_COPY_CODECS.get(codec or "")
+        stem = sanitize_filename(pathlib.Path(info["filepath"]).stem)
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        if ext:
+            return _unique_path(self.audio_dir / f"{stem}{ext}"), ["-c:a", "copy"], METHOD_COPY
+        encode = ["-c:a", "libmp3lame", "-b:a", self.bitrate]
+        return _unique_path(self.audio_dir / f"{stem}.mp3"), encode, METHOD_ENCODE
+
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        formats: List[dict] = info["requested_formats"]
+        audio_index = next((i for i, fmt in enumerate(formats) if fmt.get("acodec") != "none"), None)
+        if audio_index is None:
+            return super().run(info)
+
+        filename = info["filepath"]
+        temp_filename = prepend_extension(filename, "temp")
+        merge_args = ["-c", "copy"]
+        audio_streams = 0
+        for i, fmt in enumerate(formats):
+            if fmt.get("acodec") != "none":
+                merge_args.extend(["-map", f"{i}:a:0"])
+                if fmt["protocol"].startswith("m3u8") and self.get_audio_codec(fmt["filepath"]) == "aac":
+                    merge_args.extend([f"-bsf:a:{audio_streams}", "aac_adtstoasc"])
+                audio_streams += 1
+            if fmt.get("vcodec") != "none":
+                merge_args.extend(["-map", f"{i}:v:0"])
+
+        audio_path, audio_args, method = self._audio_target(info, formats[audio_index])
+        audio_args = ["-map", f"{audio_index}:a:0", "-vn", *audio_args]
+        if audio_path.suffix == ".m4a" and formats[audio_index]["protocol"].startswith("m3u8"):
+            audio_args.extend(["-bsf:a", "aac_adtstoasc"])
+
+        self.to_screen(f'Merging formats into "{filename}" and extracting audio to "{audio_path}"')
+        try:
+            self.real_run_ffmpeg(
+                [(path, []) for path in info["__files_to_merge"]],
+                [(temp_filename, merge_args), (str(audio_path), audio_args)],
+            )
+        except FFmpegPostProcessorError as exc:
+            # Double sortie refusée : fusion classique, l'audio sera extrait plus tard
+            self.report_warning(f"Sortie audio simultanée impossible ({exc}), fusion seule")
+            for leftover in (temp_filename, str(audio_path)):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            return super().run(info)
+        os.replace(temp_filename, filename)
+        info[DUAL_AUDIO_PATH_KEY] = str(audio_path)
+        info[DUAL_AUDIO_METHOD_KEY] = method
+        return info["__files_to_merge"], info
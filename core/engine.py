@@ -0,0 +1,401 @@
+"""Moteur de téléchargement sans Qt : extraction, stratégies cookies, reprise, finalisation.
+
+Les onglets Qt et la CLI (``python -m core``) ne sont que des adaptateurs autour de
+``DownloadEngine`` ; la progression remonte par de simples callbacks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import load_config
+from core.archive_index import get_archive_index
+from core.audio_engine import METHOD_COPY
+from core.bandwidth import BandwidthLease, get_bandwidth_governor
+from core.captions import fetch_captions
+from core.download_core import (
+    BROWSER_TRY_ORDER,
+    JOB_TRANSCRIPTION,
+    _COOKIE_MEMO,
+    Task,
+    YtdlpLogger,
+    _cookie_strategies,
+    _is_chrome_copy_error,
+    _is_dpapi_error,
+    _opts_for_strategy,
+    _prioritize_strategy,
+    cleanup_download_residuals,
+    cleanup_orphans_in_outputs,
+    cookie_strategy_key,
+    download_from_info,
+    ensure_audio,
+    extract_basic_info,
+    finalize_transcription_audio,
+    find_existing_outputs,
+    move_final_outputs,
+    normalize_url,
+)
+from core.dual_output import DUAL_AUDIO_METHOD_KEY, DUAL_AUDIO_PATH_KEY
+from core.fragment_tuner import FragmentLease, get_fragment_controller
+from core.media_catalog import get_media_catalog
+from core.progress import DEFAULT_FPS, ProgressThrottle
+from core.range_download import RangeYoutubeDL
+from core.rate_limit import ProbeTicket, call_limited
+from core.video_ids import extract_video_key
+from paths import get_audio_dir
+
+# (téléchargés, total, vitesse, eta, fichier)
+ProgressCallback = Callable[[int, int, float, int, str], None]
+StatusCallback = Callable[[str], None]
+
+
+class DownloadInterrupted(Exception):
+    pass
+
+
+@dataclass
+class DownloadResult:
+    ok: bool
+    message: str
+    info: Dict[str, Any] = field(default_factory=dict)
+
+
+class DownloadEngine:
+    """Exécute le téléchargement d'une ``Task`` dans le thread appelant."""
+
+    def __init__(
+        self,
+        task: Task,
+        ydl_opts: dict,
+        *,
+        info: Optional[dict] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        on_status: Optional[StatusCallback] = None,
+        progress_fps: float = DEFAULT_FPS,
+    ):
+        self.task = task
+        self.ydl_opts = ydl_opts
+        # Infos déjà extraites (inspection) : le téléchargement repart de ce dict
+        self.info = info if isinstance(info, dict) and info.get("id") else None
+        self._on_progress = on_progress
+        self._on_status = on_status
+        # Les hooks yt-dlp tombent à chaque bloc/fragment : on coalesce avant de relayer
+        self._throttle = ProgressThrottle(self._progress, fps=progress_fps)
+        self._lease: Optional[BandwidthLease] = None
+        self._fragments: Optional[FragmentLease] = None
+        self._stop = False
+
+    def stop(self) -> None:
+        self._stop = True
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop
+
+    def _status(self, text: str) -> None:
+        if self._on_status:
+            try:
+                self._on_status(text)
+            except Exception:
+                pass
+
+    def _progress(self, downloaded: int, total: int, speed: float, eta: int, filename: str) -> None:
+        if self._on_progress:
+            try:
+                self._on_progress(downloaded, total, speed, eta, filename)
+            except Exception:
+                pass
+
+    def _on_debug(self, msg: str) -> None:
+        # Les reprises de fragments ne passent que par le canal « debug » de yt-dlp
+        if self._fragments is not None and "Got error" in msg:
+            self._fragments.record_error()
+
+    def _reuse_archived(self, url: str) -> Optional[DownloadResult]:
+        """Court-circuite, sans réseau, un élément déjà archivé dont les fichiers existent."""
+
+        key = extract_video_key(url)
+        if not key or self.task.sections:
+            return None
+        # Un job de transcription se contente de l'audio (ou de la vidéo) déjà au catalogue
+        transcription = self.task.job_type == JOB_TRANSCRIPTION
+        if not transcription and not get_archive_index().contains(*key):
+            return None
+        video_id = key[1]
+        existing = find_existing_outputs(video_id, self.task.platform)
+        if not existing.get("audio") and not existing.get("video"):
+            return None
+        if existing.get("audio"):
+            self.task.final_audio_path = existing["audio"]
+        if existing.get("video"):
+            self.task.final_video_path = existing["video"]
+        self.task.video_id = video_id
+        self._status("Déjà téléchargé (archive)")
+        return DownloadResult(True, existing.get("audio") or existing.get("video"), self.info or {"id": video_id})
+
+    def _transcribe_from_captions(self, url: str) -> Optional[DownloadResult]:
+        """Transcription tirée des sous-titres publiés ; ``None`` pour repartir sur l'audio."""
+
+        try:
+            info = self.info or extract_basic_info(url)
+        except Exception:
+            info = None
+        result = fetch_captions(info) if info else None
+        if result is None:
+            self._status("Aucun sous-titre exploitable : repli sur l’audio")
+            return None
+        self.task.transcript_path = str(result.text_path)
+        self.task.video_id = info.get("id") or self.task.video_id
+        self._status(f"Transcription reprise des {result.describe()}")
+        return DownloadResult(True, str(result.text_path), info)
+
+    def _adopt_dual_audio(self, info: dict) -> None:
+        for download in info.get("requested_downloads") or []:
+            audio_path = download.get(DUAL_AUDIO_PATH_KEY)
+            if audio_path and os.path.exists(audio_path):
+                self.task.final_audio_path = audio_path
+                self.task.audio_method = download.get(DUAL_AUDIO_METHOD_KEY)
+                self.task.video_id = info.get("id") or self.task.video_id
+                get_media_catalog().record(audio_path, self.task.media_id, self.task.platform or "youtube")
+                return
+
+    def run(self) -> DownloadResult:
+        result = DownloadResult(False, "", {})
+        try:
+            result = self._run()
+            return result
+        except Exception as e:
+            return DownloadResult(False, str(e), {})
+        finally:
+            if self._fragments is not None:
+                self._fragments.release(success=result.ok)
+                self._fragments = None
+            if self._lease is not None:
+                self._lease.release()
+                self._lease = None
+            self._throttle.flush()
+
+    async def run_async(self) -> DownloadResult:
+        return await asyncio.to_thread(self.run)
+
+    def _run(self) -> DownloadResult:
+        captured = {"fn": ""}
+
+        def hook(d):
+            if self._stop:
+                raise DownloadInterrupted("Interrompu par l’utilisateur")
+            if self._lease is not None:
+                self._lease.on_progress(d)
+            if self._fragments is not None:
+                self._fragments.on_progress(d)
+            st = d.get("status")
+            if st == "downloading":
+                downloaded = int(d.get("downloaded_bytes") or 0)
+                total = int(d.get("total_bytes") or d.get("total_bytes_estimate") or 0)
+                speed = float(d.get("speed") or 0.0)
+                eta = int(d.get("eta") or 0)
+                fn = d.get("filename") or self.task.filename or ""
+                self._throttle.update(downloaded, total, speed, eta, fn)
+            elif st == "finished":
+                self._throttle.flush()
+                captured["fn"] = d.get("filename") or captured["fn"]
+                self._status(f"Terminé : {captured['fn']}")
+
+        opts = dict(self.ydl_opts)
+        opts["progress_hooks"] = [hook]
+        opts["quiet"] = True
+        opts["no_warnings"] = True
+        opts["logger"] = YtdlpLogger(self._status, on_debug=self._on_debug)
+
+        cfg = load_config()
+        user_agent = (cfg.get("user_agent") or "").strip()
+        headers: Dict[str, str] = {}
+        if user_agent:
+            headers = dict(opts.get("http_headers") or {})
+            headers["User-Agent"] = user_agent
+            opts["http_headers"] = headers
+
+        url = normalize_url(self.task.url)
+        # Les sous-titres et les fichiers déjà au catalogue couvrent la vidéo entière, pas un extrait
+        if self.task.job_type == JOB_TRANSCRIPTION and cfg.get("caption_fast_path") and not self.task.sections:
+            captioned = self._transcribe_from_captions(url)
+            if captioned:
+                return captioned
+        reused = self._reuse_archived(url)
+        if reused:
+            return reused
+        # Part de bande passante réévaluée à chaud pendant tout le téléchargement
+        self._lease = get_bandwidth_governor().register(self.task.platform)
+        opts["ratelimit"] = self._lease.initial_ratelimit()
+        # Fenêtre de fragments apprise par plateforme, bornée par le budget global de sockets
+        self._fragments = get_fragment_controller().register(self.task.platform)
+        opts["concurrent_fragment_downloads"] = self._fragments.granted
+        if self.task.job_type != JOB_TRANSCRIPTION:
+            # Fusion bv+ba : l'audio pour la transcription sort du même passage ffmpeg
+            opts["dual_audio_dir"] = str(get_audio_dir(self.task.platform or "youtube"))
+        cookies_path = (cfg.get("cookies_path") or "").strip()
+        browser_pref = (cfg.get("browser_cookies") or "auto").strip().lower()
+
+        base_opts = dict(opts)
+        base_opts.pop("cookiefile", None)
+        base_opts.pop("cookiesfrombrowser", None)
+        prefetched = self.info
+
+        memo_key = cookie_strategy_key(url)
+
+        def _download_once(local_opts: Dict[str, Any]) -> Tuple[dict, int]:
+            with RangeYoutubeDL(local_opts) as ydl:
+                if self._lease is not None:
+                    self._lease.attach(ydl)
+                if self._fragments is not None:
+                    self._fragments.attach(ydl)
+                if prefetched is not None:
+                    info_inner = download_from_info(ydl, prefetched)
+                    if not info_inner.get("requested_downloads"):
+                        # Déjà dans l'archive : même convention que extract_info
+                        info_inner = {}
+                else:
+                    info_inner = ydl.extract_info(url, download=True)
+                ret = getattr(ydl, "_download_retcode", 0) or 0
+            return info_inner, ret
+
+        def _download_with_opts(local_opts: Dict[str, Any]) -> Tuple[dict, int]:
+            # Seule la requête est limitée : la sonde est rendue au premier octet reçu
+            ticket = ProbeTicket()
+            local_opts = dict(local_opts, progress_hooks=[*(local_opts.get("progress_hooks") or []), ticket])
+            return call_limited(
+                memo_key,
+                lambda: _download_once(local_opts),
+                should_stop=lambda: self._stop,
+                on_wait=self._status,
+                ticket=ticket,
+            )
+
+        info: dict[str, Any] = {}
+        retcode = 0
+        dpapi_or_copy_issue = False
+        last_error: Exception | None = None
+        success = False
+
+        pycryptodomex_hint = "Lecture cookies Firefox impossible : installez 'pycryptodomex' (pip install pycryptodomex)."
+        explicit = browser_pref in BROWSER_TRY_ORDER
+        strategies, promoted = _prioritize_strategy(_cookie_strategies(cfg), memo_key)
+        if promoted:
+            self._status(f"Stratégie cookies mémorisée : {promoted}")
+
+        for strategy in strategies:
+            if strategy == "none" and dpapi_or_copy_issue:
+                self._status("Cookies navigateur indisponibles (DPAPI/DB verrouillée). Passage en mode sans cookies.")
+            local_opts = _opts_for_strategy(base_opts, strategy, cookies_path)
+            try:
+                try:
+                    info, retcode = _download_with_opts(local_opts)
+                except Exception:
+                    if prefetched is None or self._stop:
+                        raise
+                    # URLs signées expirées ou formats changés : une seule extraction fraîche
+                    prefetched = None
+                    self._status("Infos d’inspection périmées, nouvelle extraction…")
+                    info, retcode = _download_with_opts(local_opts)
+            except Exception as exc:
+                if self._stop:
+                    raise
+                _COOKIE_MEMO.forget(memo_key, strategy)
+                last_error = exc
+                if strategy == promoted or not strategy.startswith("browser:"):
+                    continue
+                msg = (str(exc) or "").lower()
+                if strategy == "browser:firefox" and ("pycryptodomex" in msg or "cryptodome" in msg):
+                    self._status(pycryptodomex_hint)
+                    if explicit:
+                        raise RuntimeError(pycryptodomex_hint)
+                    continue
+                if _is_dpapi_error(exc) or _is_chrome_copy_error(exc):
+                    dpapi_or_copy_issue = True
+                    continue
+                raise
+            _COOKIE_MEMO.remember(memo_key, strategy)
+            success = True
+            break
+
+        if not success:
+            if last_error is not None:
+                raise last_error
+            raise RuntimeError("Téléchargement impossible : toutes les stratégies de cookies ont échoué.")
+
+        fn = captured["fn"]
+        if not fn and info:
+            try:
+                rd = (info.get("requested_downloads") or [])
+                if rd:
+                    fn = rd[0].get("filepath") or rd[0].get("filename") or ""
+            except Exception:
+                pass
+
+        if not info:
+            reused_info = {}
+            if retcode == 0:
+                try:
+                    reused_info = self.info or extract_basic_info(url)
+                except Exception:
+                    reused_info = {}
+
+            if reused_info and retcode == 0:
+                video_id = reused_info.get("id") or ""
+                existing = find_existing_outputs(video_id, self.task.platform)
+                if (not video_id) or (not existing.get("audio") and not existing.get("video")):
+                    raise RuntimeError(
+                        "Téléchargement déjà enregistré dans l’archive mais aucun fichier final n’a été retrouvé. "
+                        "Supprime l’entrée correspondante dans archive.txt pour forcer un nouveau téléchargement."
+                    )
+                if existing.get("audio"):
+                    self.task.final_audio_path = existing["audio"]
+                if existing.get("video"):
+                    self.task.final_video_path = existing["video"]
+                reuse_msg = existing.get("audio") or existing.get("video") or "Déjà téléchargé (archive)"
+                if video_id:
+                    self.task.video_id = video_id
+                self._status("Déjà téléchargé (archive)")
+                return DownloadResult(True, reuse_msg, reused_info or {})
+
+            raise RuntimeError("yt-dlp n’a renvoyé aucune information (URL invalide, vidéo privée ou cookies requis).")
+
+        if fn:
+            self.task.filename = fn
+        self._adopt_dual_audio(info)
+
+        extractor = (info.get("extractor_key") or "").strip().lower()
+        # L'archive ne recense que les vidéos : un audio seul ne doit pas bloquer un futur téléchargement vidéo
+        if extractor and info.get("id") and self.task.job_type != JOB_TRANSCRIPTION and not self.task.sections:
+            get_archive_index().add(extractor, info["id"])
+
+        return DownloadResult(True, fn or "Téléchargement terminé", info or {})
+
+
+def finalize_download(task: Task, info: Optional[dict], on_status: Optional[StatusCallback] = None) -> Optional[str]:
+    """Range les fichiers finaux, nettoie les résidus et garantit un audio. Retourne l'audio
+    (ou, pour une transcription servie par les sous-titres, le fichier texte)."""
+
+    task.video_id = (info or {}).get("id") or task.video_id
+    if task.job_type == JOB_TRANSCRIPTION:
+        if task.transcript_path and os.path.exists(task.transcript_path):
+            return task.transcript_path
+        audio_path = finalize_transcription_audio(task)
+        cleanup_orphans_in_outputs(task)
+        if audio_path and on_status:
+            how = "copie du flux" if task.audio_method == METHOD_COPY else "réencodage MP3"
+            on_status(f"Audio prêt pour transcription ({how})")
+        return audio_path
+    moved = move_final_outputs(task)
+    cleanup_download_residuals(task)
+    cleanup_orphans_in_outputs(task)
+    audio_path = moved.get("audio") or task.final_audio_path
+    if not audio_path:
+        audio_path = ensure_audio(task)
+        if audio_path and on_status:
+            how = "copie du flux" if task.audio_method == METHOD_COPY else "réencodage MP3"
+            on_status(f"Audio généré depuis la vidéo pour transcription ({how})")
+    return audio_path
@@ -0,0 +1,192 @@
+"""Concurrence de fragments adaptative (démarrage lent puis AIMD) sous un budget global de sockets.
+
+yt-dlp lit ``concurrent_fragment_downloads`` au début de chaque format fragmenté (HLS/DASH) :
+la fenêtre d'un téléchargement est donc réévaluée à la fin de chaque format, à partir du
+débit mesuré et des erreurs de fragments, puis réécrite dans ``ydl.params`` pour le suivant.
+La dernière fenêtre stable d'une plateforme sert de point de départ au téléchargement suivant.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import DEFAULT_CONFIG, load_config
+
+INITIAL_WINDOW = 2
+INITIAL_SSTHRESH = 8
+# Gain de débit minimal pour justifier un socket de plus en régime AIMD
+GAIN_THRESHOLD = 1.05
+DROP_THRESHOLD = 0.8
+
+
+class _PlatformState:
+    def __init__(self):
+        self.window = INITIAL_WINDOW
+        self.ssthresh = INITIAL_SSTHRESH
+        self.throughput = 0.0
+
+
+class FragmentConcurrencyController:
+    def __init__(self, total_sockets: int, per_job_max: int):
+        self._lock = threading.Lock()
+        self._total = max(1, int(total_sockets))
+        self._per_job_max = max(1, int(per_job_max))
+        self._platforms: Dict[str, _PlatformState] = {}
+        self._leases: List["FragmentLease"] = []
+
+    def configure(self, total_sockets: int, per_job_max: int) -> None:
+        with self._lock:
+            self._total = max(1, int(total_sockets))
+            self._per_job_max = max(1, int(per_job_max))
+
+    def configure_from(self, cfg: dict) -> None:
+        self.configure(
+            cfg.get("max_fragment_sockets") or DEFAULT_CONFIG["max_fragment_sockets"],
+            cfg.get("max_fragment_concurrency") or DEFAULT_CONFIG["max_fragment_concurrency"],
+        )
+
+    def _state(self, platform: str) -> _PlatformState:
+        state = self._platforms.get(platform)
+        if state is None:
+            state = self._platforms[platform] = _PlatformState()
+        return state
+
+    def _grant(self, lease: "FragmentLease", wanted: int) -> int:
+        used = sum(other.granted for other in self._leases if other is not lease)
+        return max(1, min(wanted, self._per_job_max, self._total - used))
+
+    def register(self, platform: str) -> "FragmentLease":
+        key = (platform or "").strip().lower()
+        lease = FragmentLease(self, key)
+        with self._lock:
+            state = self._state(key)
+            lease.window = state.window
+            lease.ssthresh = state.ssthresh
+            lease.granted = self._grant(lease, lease.window)
+            self._leases.append(lease)
+        return lease
+
+    def adjust(self, lease: "FragmentLease", throughput: float, errors: int) -> int:
+        """Nouvelle fenêtre après un format : ÷2 sur erreur, ×2 en démarrage lent, +1 si le débit progresse."""
+
+        with self._lock:
+            state = self._state(lease.platform)
+            previous = lease.throughput or state.throughput
+            if errors:
+                lease.ssthresh = max(1, lease.window // 2)
+                lease.window = lease.ssthresh
+            elif lease.window < lease.ssthresh:
+                lease.window = min(self._per_job_max, lease.window * 2)
+            elif previous and throughput > previous * GAIN_THRESHOLD:
+                lease.window = min(self._per_job_max, lease.window + 1)
+            elif previous and throughput < previous * DROP_THRESHOLD:
+                lease.window = max(1, lease.window - 1)
+            lease.throughput = throughput
+            lease.granted = self._grant(lease, lease.window)
+            return lease.granted
+
+    def release(self, lease: "FragmentLease", *, learned: bool) -> None:
+        with self._lock:
+            try:
+                self._leases.remove(lease)
+            except ValueError:
+                pass
+            if learned:
+                state = self._state(lease.platform)
+                state.window = max(1, lease.window)
+                state.ssthresh = max(1, lease.ssthresh)
+                if lease.throughput:
+                    state.throughput = lease.throughput
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "total_sockets": self._total,
+                "in_use": sum(lease.granted for lease in self._leases),
+                "windows": {key: state.window for key, state in self._platforms.items()},
+            }
+
+
+class FragmentLease:
+    def __init__(self, controller: FragmentConcurrencyController, platform: str):
+        self.controller = controller
+        self.platform = platform
+        self.window = INITIAL_WINDOW
+        self.ssthresh = INITIAL_SSTHRESH
+        self.granted = 1
+        self.throughput = 0.0
+        self._lock = threading.Lock()
+        self._ydl = None
+        self._errors = 0
+        self._fragmented = False
+        self._started: Optional[float] = None
+        self._bytes = 0
+        self._adjusted = False
+
+    def attach(self, ydl) -> None:
+        self._ydl = ydl
+        self._apply()
+
+    def _apply(self) -> None:
+        ydl = self._ydl
+        if ydl is not None:
+            try:
+                ydl.params["concurrent_fragment_downloads"] = self.granted
+            except Exception:
+                pass
+
+    def record_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def on_progress(self, d: dict) -> None:
+        status = d.get("status")
+        with self._lock:
+            if status == "downloading":
+                if d.get("fragment_index") is None:
+                    return
+                if self._started is None:
+                    self._started = time.monotonic()
+                self._fragmented = True
+                self._bytes = int(d.get("downloaded_bytes") or 0)
+                return
+            if status != "finished" or not self._fragmented or self._started is None:
+                return
+            elapsed = max(0.001, time.monotonic() - self._started)
+            throughput = (int(d.get("downloaded_bytes") or d.get("total_bytes") or self._bytes)) / elapsed
+            errors, self._errors = self._errors, 0
+            self._fragmented = False
+            self._started = None
+            self._bytes = 0
+        self.controller.adjust(self, throughput, errors)
+        self._adjusted = True
+        self._apply()
+
+    def release(self, *, success: bool) -> None:
+        self._ydl = None
+        with self._lock:
+            errors, self._errors = self._errors, 0
+        if errors and self._fragmented:
+            # Échec en plein format : la plateforme retient quand même le recul multiplicatif
+            self.controller.adjust(self, self.throughput, errors)
+            self._adjusted = True
+            success = True
+        self.controller.release(self, learned=success and self._adjusted)
+
+
+_controller: Optional[FragmentConcurrencyController] = None
+_controller_lock = threading.Lock()
+
+
+def get_fragment_controller() -> FragmentConcurrencyController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            controller = FragmentConcurrencyController(
+                DEFAULT_CONFIG["max_fragment_sockets"], DEFAULT_CONFIG["max_fragment_concurrency"]
+            )
+            controller.configure_from(load_config())
+            _controller = controller
+        return _controller
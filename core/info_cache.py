@@ -0,0 +1,162 @@
+"""Cache disque (SQLite) des dictionnaires d'informations renvoyés par yt-dlp."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from paths import INFO_CACHE_PATH
+
+# Les URLs de formats signées expirent : on garde des durées courtes, plus encore pour TikTok.
+PLATFORM_TTLS: Dict[str, float] = {
+    "youtube": 3 * 3600,
+    "tiktok": 30 * 60,
+}
+DEFAULT_TTL = 3600
+MAX_ENTRIES = 500
+
+
+def _json_default(value):
+    return str(value)
+
+
+class InfoCache:
+    def __init__(
+        self,
+        path: pathlib.Path,
+        *,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.path = pathlib.Path(path)
+        self.ttls = dict(PLATFORM_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        if not self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS info ("
+                " key TEXT PRIMARY KEY,"
+                " platform TEXT NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS info_accessed ON info(accessed)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def ttl_for(self, platform: str) -> float:
+        return float(self.ttls.get((platform or "").strip().lower(), self.default_ttl))
+
+    def get(self, key: str, platform: str = "") -> Optional[dict]:
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                return None
+            try:
+                row = conn.execute("SELECT payload, created FROM info WHERE key = ?", (key,)).fetchone()
+                if not row:
+                    return None
+                payload, created = row
+                if now - float(created) > self.ttl_for(platform):
+                    conn.execute("DELETE FROM info WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+                conn.execute("UPDATE info SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+            except sqlite3.Error:
+                return None
+            finally:
+                conn.close()
+        try:
+            data = json.loads(zlib.decompress(payload).decode("utf-8"))
+        except Exception:
+            self.invalidate(key)
+            return None
+        return data if isinstance(data, dict) else None
+
+    def put(self, key: str, info: dict, platform: str = "") -> None:
+        if not key or not isinstance(info, dict) or not info:
+            return
+        try:
+            payload = zlib.compress(json.dumps(info, ensure_ascii=False, default=_json_default).encode("utf-8"))
+        except Exception:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO info(key, platform, payload, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, (platform or "").lower(), payload, now, now),
+                )
+                # Éviction LRU au-delà de la borne
+                conn.execute(
+                    "DELETE FROM info WHERE key IN ("
+                    " SELECT key FROM info ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                return
+            try:
+                conn.execute("DELETE FROM info WHERE key = ?", (key,))
+                conn.commit()
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                return
+            try:
+                conn.execute("DELETE FROM info")
+                conn.commit()
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+
+
+_info_cache: Optional[InfoCache] = None
+_info_cache_lock = threading.Lock()
+
+
+def get_info_cache() -> InfoCache:
+    global _info_cache
+    with _info_cache_lock:
+        if _info_cache is None:
+            _info_cache = InfoCache(INFO_CACHE_PATH)
+        return _info_cache
@@ -0,0 +1,243 @@
+"""File de téléchargement persistante (SQLite/WAL) : survit aux plantages et redémarrages."""
+
+from __future__ import annotations
+
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from core.download_core import JOB_VIDEO, Task
+from paths import JOB_STORE_PATH
+
+STATUS_PENDING = "En attente"
+STATUS_RUNNING = "En cours"
+STATUS_DONE = "Terminé"
+STATUS_ERROR = "Erreur"
+
+# Historique des tâches terminées conservé avant purge
+DONE_RETENTION = 7 * 24 * 3600
+
+_COLUMNS = (
+    "url",
+    "platform",
+    "source",
+    "chat_id",
+    "selected_fmt",
+    "status",
+    "filename",
+    "outtmpl",
+    "video_id",
+    "final_audio_path",
+    "final_video_path",
+    "job_type",
+    "sections",
+)
+
+
+class JobStore:
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " url TEXT NOT NULL,"
+                " platform TEXT NOT NULL,"
+                " source TEXT NOT NULL DEFAULT 'ui',"
+                " chat_id TEXT,"
+                " selected_fmt TEXT,"
+                " status TEXT NOT NULL,"
+                " filename TEXT,"
+                " outtmpl TEXT,"
+                " video_id TEXT,"
+                " final_audio_path TEXT,"
+                " final_video_path TEXT,"
+                " job_type TEXT NOT NULL DEFAULT 'video',"
+                " sections TEXT,"
+                " error TEXT,"
+                " created REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "job_type" not in existing:
+                # Base créée avant l'introduction des jobs de transcription
+                conn.execute("ALTER TABLE jobs ADD COLUMN job_type TEXT NOT NULL DEFAULT 'video'")
+            if "sections" not in existing:
+                conn.execute("ALTER TABLE jobs ADD COLUMN sections TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_platform_status ON jobs(platform, status)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _values(task: Task) -> tuple:
+        chat_id = None if task.chat_id is None else str(task.chat_id)
+        return (
+            task.url,
+            (task.platform or "").lower(),
+            task.source or "ui",
+            chat_id,
+            task.selected_fmt,
+            task.status,
+            task.filename or None,
+            task.outtmpl,
+            task.video_id,
+            task.final_audio_path,
+            task.final_video_path,
+            task.job_type or JOB_VIDEO,
+            task.sections or None,
+        )
+
+    def add(self, task: Task) -> Optional[int]:
+        now = time.time()
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock:
+            try:
+                cur = self._db().execute(
+                    f"INSERT INTO jobs({', '.join(_COLUMNS)}, created, updated) VALUES ({placeholders}, ?, ?)",
+                    (*self._values(task), now, now),
+                )
+            except sqlite3.Error:
+                return None
+        task.job_id = cur.lastrowid
+        return task.job_id
+
+    def save(self, task: Task) -> None:
+        """Réécrit l'état courant de ``task`` (ajoute la ligne si besoin)."""
+
+        if task.job_id is None:
+            self.add(task)
+            return
+        assignments = ", ".join(f"{col} = ?" for col in _COLUMNS)
+        with self._lock:
+            try:
+                self._db().execute(
+                    f"UPDATE jobs SET {assignments}, updated = ? WHERE id = ?",
+                    (*self._values(task), time.time(), task.job_id),
+                )
+            except sqlite3.Error:
+                pass
+
+    def transition(
+        self,
+        task: Task,
+        to_status: str,
+        *,
+        from_statuses: Optional[Iterable[str]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Change le statut dans une transaction ; refuse si l'état stocké n'est pas attendu."""
+
+        if task.job_id is None:
+            task.status = to_status
+            return True
+        allowed = list(from_statuses or [])
+        with self._lock:
+            try:
+                db = self._db()
+            except sqlite3.Error:
+                db = None
+            try:
+                if db is None:
+                    raise sqlite3.OperationalError("base indisponible")
+                db.execute("BEGIN IMMEDIATE")
+                row = db.execute("SELECT status FROM jobs WHERE id = ?", (task.job_id,)).fetchone()
+                if row is None or (allowed and row[0] not in allowed):
+                    db.execute("ROLLBACK")
+                    return False
+                task.status = to_status
+                assignments = ", ".join(f"{col} = ?" for col in _COLUMNS)
+                db.execute(
+                    f"UPDATE jobs SET {assignments}, error = ?, updated = ? WHERE id = ?",
+                    (*self._values(task), error, time.time(), task.job_id),
+                )
+                db.execute("COMMIT")
+                return True
+            except sqlite3.Error:
+                if db is not None and db.in_transaction:
+                    db.execute("ROLLBACK")
+        # Base indisponible : la file continue en mémoire
+        task.status = to_status
+        return True
+
+    def update_filename(self, task: Task) -> None:
+        if task.job_id is None:
+            return
+        with self._lock:
+            try:
+                self._db().execute(
+                    "UPDATE jobs SET filename = ?, updated = ? WHERE id = ?",
+                    (task.filename or None, time.time(), task.job_id),
+                )
+            except sqlite3.Error:
+                pass
+
+    def remove(self, task: Task) -> None:
+        if task.job_id is None:
+            return
+        with self._lock:
+            try:
+                self._db().execute("DELETE FROM jobs WHERE id = ?", (task.job_id,))
+            except sqlite3.Error:
+                pass
+        task.job_id = None
+
+    def restore(self, platform: str) -> List[Task]:
+        """Tâches non terminées de ``platform``, dans l'ordre d'ajout.
+
+        Une tâche restée « En cours » a été interrompue par un arrêt brutal : elle repasse
+        en attente et reprendra ses fichiers ``.part`` grâce au même ``outtmpl``.
+        """
+
+        key = (platform or "").lower()
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "UPDATE jobs SET status = ?, updated = ? WHERE platform = ? AND status = ?",
+                    (STATUS_PENDING, time.time(), key, STATUS_RUNNING),
+                )
+                db.execute(
+                    "DELETE FROM jobs WHERE status = ? AND updated < ?",
+                    (STATUS_DONE, time.time() - DONE_RETENTION),
+                )
+                rows = db.execute(
+                    f"SELECT id, {', '.join(_COLUMNS)} FROM jobs"
+                    " WHERE platform = ? AND status != ? ORDER BY id",
+                    (key, STATUS_DONE),
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+        tasks: List[Task] = []
+        for row in rows:
+            data = dict(zip(("job_id", *_COLUMNS), row))
+            chat_id = data.pop("chat_id")
+            if chat_id is not None:
+                try:
+                    chat_id = int(chat_id)
+                except ValueError:
+                    pass
+            data["filename"] = data["filename"] or ""
+            data["job_type"] = data["job_type"] or JOB_VIDEO
+            tasks.append(Task(chat_id=chat_id, **data))
+        return tasks
+
+
+_job_store: Optional[JobStore] = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            _job_store = JobStore(JOB_STORE_PATH)
+        return _job_store
@@ -0,0 +1,217 @@
+"""Catalogue persistant des fichiers finaux : ``video_id`` → chemins audio/vidéo.
+
+Le catalogue est alimenté au moment de l'écriture (déplacement final, extraction audio)
+et réconcilié au démarrage : seuls les dossiers dont la date de modification a changé
+depuis le dernier passage sont relus.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from paths import AUDIOS_DIR, MEDIA_CATALOG_PATH, VIDEOS_DIR, get_audio_dir, get_video_dir
+
+AUDIO_EXTS = {".mp3", ".m4a", ".wav", ".ogg", ".flac"}
+VIDEO_EXTS = {".mp4", ".mkv", ".webm", ".mov"}
+_ID_TOKEN = re.compile(r"\[([^\[\]]+)\]")
+_PLATFORMS = ("youtube", "tiktok")
+
+
+def media_kind(path: pathlib.Path) -> Optional[str]:
+    ext = path.suffix.lower()
+    if ext in AUDIO_EXTS:
+        return "audio"
+    if ext in VIDEO_EXTS and ".f" not in path.stem:
+        return "video"
+    return None
+
+
+def video_id_from_name(name: str) -> Optional[str]:
+    matches = _ID_TOKEN.findall(name)
+    return matches[-1] if matches else None
+
+
+class MediaCatalog:
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                " path TEXT PRIMARY KEY,"
+                " dir TEXT NOT NULL,"
+                " video_id TEXT NOT NULL,"
+                " platform TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS media_id ON media(video_id, kind)")
+            conn.execute("CREATE INDEX IF NOT EXISTS media_dir ON media(dir)")
+            conn.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL NOT NULL)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def record(self, path: str | os.PathLike[str], video_id: Optional[str], platform: str) -> None:
+        p = pathlib.Path(path)
+        kind = media_kind(p)
+        video_id = video_id or video_id_from_name(p.name)
+        if not kind or not video_id:
+            return
+        try:
+            st = p.stat()
+        except OSError:
+            return
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO media(path, dir, video_id, platform, kind, size, mtime)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(p), str(p.parent), video_id, (platform or "").lower(), kind, st.st_size, st.st_mtime),
+                )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def forget(self, path: str | os.PathLike[str]) -> None:
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute("DELETE FROM media WHERE path = ?", (str(path),))
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def paths_for(self, video_id: str, platform: Optional[str] = None) -> List[Dict[str, object]]:
+        if not video_id:
+            return []
+        query = "SELECT path, platform, kind, size, mtime FROM media WHERE video_id = ?"
+        params: list = [video_id]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform.lower())
+        with self._lock:
+            try:
+                rows = self._db().execute(query + " ORDER BY mtime DESC", params).fetchall()
+            except sqlite3.Error:
+                return []
+        return [
+            {"path": row[0], "platform": row[1], "kind": row[2], "size": row[3], "mtime": row[4]} for row in rows
+        ]
+
+    def lookup(self, video_id: str, platform: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Fichier audio et vidéo les plus récents pour ``video_id`` (entrées disparues purgées)."""
+
+        found: Dict[str, Optional[str]] = {"audio": None, "video": None}
+        for row in self.paths_for(video_id, platform):
+            kind = str(row["kind"])
+            if found.get(kind):
+                continue
+            if os.path.exists(str(row["path"])):
+                found[kind] = str(row["path"])
+            else:
+                self.forget(str(row["path"]))
+        return found
+
+    def library_dirs(self) -> List[pathlib.Path]:
+        dirs: List[pathlib.Path] = []
+        for platform in _PLATFORMS:
+            dirs.append(get_video_dir(platform))
+            dirs.append(get_audio_dir(platform))
+        for base in (VIDEOS_DIR, AUDIOS_DIR):
+            dirs.append(base)
+            try:
+                with os.scandir(base) as it:
+                    dirs.extend(pathlib.Path(entry.path) for entry in it if entry.is_dir())
+            except OSError:
+                pass
+        unique: Dict[str, pathlib.Path] = {}
+        for directory in dirs:
+            unique.setdefault(str(directory), directory)
+        return list(unique.values())
+
+    def reconcile(self, directories: Optional[Iterable[pathlib.Path]] = None) -> int:
+        """Relit les dossiers modifiés depuis le dernier passage. Retourne leur nombre."""
+
+        rescanned = 0
+        for directory in directories or self.library_dirs():
+            try:
+                dir_mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            with self._lock:
+                try:
+                    db = self._db()
+                    row = db.execute("SELECT mtime FROM dirs WHERE path = ?", (str(directory),)).fetchone()
+                    if row and float(row[0]) == dir_mtime:
+                        continue
+                    self._rescan_dir(db, directory)
+                    db.execute(
+                        "INSERT OR REPLACE INTO dirs(path, mtime) VALUES (?, ?)", (str(directory), dir_mtime)
+                    )
+                    db.commit()
+                    rescanned += 1
+                except sqlite3.Error:
+                    continue
+        return rescanned
+
+    def _rescan_dir(self, db: sqlite3.Connection, directory: pathlib.Path) -> None:
+        platform = self._platform_for_dir(directory)
+        present: Dict[str, os.DirEntry] = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file() and media_kind(pathlib.Path(entry.name)):
+                        present[entry.path] = entry
+        except OSError:
+            return
+        known = {row[0] for row in db.execute("SELECT path FROM media WHERE dir = ?", (str(directory),))}
+        for stale in known - set(present):
+            db.execute("DELETE FROM media WHERE path = ?", (stale,))
+        for path_str, entry in present.items():
+            p = pathlib.Path(path_str)
+            video_id = video_id_from_name(p.name)
+            if not video_id:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            db.execute(
+                "INSERT OR REPLACE INTO media(path, dir, video_id, platform, kind, size, mtime)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path_str, str(directory), video_id, platform, media_kind(p), st.st_size, st.st_mtime),
+            )
+
+    @staticmethod
+    def _platform_for_dir(directory: pathlib.Path) -> str:
+        for platform in _PLATFORMS:
+            if directory in (get_video_dir(platform), get_audio_dir(platform)):
+                return platform
+        if directory.parent in (VIDEOS_DIR, AUDIOS_DIR):
+            return directory.name.lower()
+        return ""
+
+
+_media_catalog: Optional[MediaCatalog] = None
+_media_catalog_lock = threading.Lock()
+
+
+def get_media_catalog() -> MediaCatalog:
+    global _media_catalog
+    with _media_catalog_lock:
+        if _media_catalog is None:
+            _media_catalog = MediaCatalog(MEDIA_CATALOG_PATH)
+        return _media_catalog
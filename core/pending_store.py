@@ -0,0 +1,192 @@
+"""Stockage borné à expiration des choix Telegram en attente d'un clic.
+
+Un clavier abandonné ne doit ni rester en mémoire indéfiniment ni disparaître au redémarrage
+du bot : ``PendingStore`` garde au plus ``max_entries`` entrées, oublie celles plus vieilles
+que ``ttl`` et, avec un chemin SQLite, recharge les entrées encore valides au lancement.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 200
+
+
+class PendingStore:
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[pathlib.Path] = None,
+    ):
+        self.name = name
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self.path = pathlib.Path(path) if path else None
+        self._lock = threading.Lock()
+        # token → (expiration, valeur, taille JSON en octets), du plus ancien au plus récent
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._expired = 0
+        self._evicted = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._load()
+
+    # --- Persistance -----------------------------------------------------------------------
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " store TEXT NOT NULL,"
+                " token TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " expires REAL NOT NULL,"
+                " PRIMARY KEY (store, token))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _write(self, sql: str, params: tuple) -> None:
+        # Appelé sous self._lock : la connexion est partagée entre le thread GUI et la boucle du bot
+        try:
+            db = self._db()
+            if db is not None:
+                db.execute(sql, params)
+                db.commit()
+        except sqlite3.Error:
+            pass
+
+    def _load(self) -> None:
+        now = time.time()
+        try:
+            db = self._db()
+            if db is None:
+                return
+            db.execute("DELETE FROM pending WHERE store = ? AND expires <= ?", (self.name, now))
+            db.commit()
+            rows = db.execute(
+                "SELECT token, payload, expires FROM pending WHERE store = ? ORDER BY expires DESC LIMIT ?",
+                (self.name, self.max_entries),
+            ).fetchall()
+        except sqlite3.Error:
+            return
+        with self._lock:
+            for token, payload, expires in reversed(rows):
+                try:
+                    value = json.loads(payload)
+                except ValueError:
+                    continue
+                self._entries[token] = (float(expires), value, len(payload.encode("utf-8")))
+                self._bytes += self._entries[token][2]
+
+    # --- Accès -----------------------------------------------------------------------------
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _purge_locked(self, now: float) -> List[str]:
+        expired = [token for token, (expires, _v, _s) in self._entries.items() if expires <= now]
+        for token in expired:
+            self._drop(token)
+        self._expired += len(expired)
+        return expired
+
+    def put(self, token: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._purge_locked(now)
+            self._drop(token)
+            self._entries[token] = (now + self.ttl, value, size)
+            self._bytes += size
+            self._write(
+                "INSERT OR REPLACE INTO pending(store, token, payload, expires) VALUES (?, ?, ?, ?)",
+                (self.name, token, payload, now + self.ttl),
+            )
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evicted += 1
+                self._write("DELETE FROM pending WHERE store = ? AND token = ?", (self.name, oldest))
+
+    def get(self, token: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] > time.time():
+                return entry[1]
+            self._drop(token)
+            self._expired += 1
+            self._write("DELETE FROM pending WHERE store = ? AND token = ?", (self.name, token))
+            return None
+
+    def pop(self, token: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(token)
+            self._drop(token)
+            self._write("DELETE FROM pending WHERE store = ? AND token = ?", (self.name, token))
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def purge(self) -> int:
+        """Retire les entrées expirées ; renvoie leur nombre."""
+
+        now = time.time()
+        with self._lock:
+            expired = self._purge_locked(now)
+            if expired:
+                self._write("DELETE FROM pending WHERE store = ? AND expires <= ?", (self.name, now))
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._write("DELETE FROM pending WHERE store = ?", (self.name,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Occupation courante : entrées, octets (JSON), expirées et évincées depuis le lancement."""
+
+        self.purge()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "expired": self._expired,
+                "evicted": self._evicted,
+            }
+
+    def close(self) -> None:
+        """Ferme la connexion SQLite ; les entrées restent en mémoire et ``_db`` la rouvre au besoin."""
+
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
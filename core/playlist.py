@@ -0,0 +1,185 @@
+"""Ingestion de playlists et chaînes : listing « flat » en une requête, dédoublonné contre l'archive."""
+
+from __future__ import annotations
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from core.archive_index import get_archive_index
+from core.download_core import extract_basic_info, extract_flat_info
+from core.video_ids import extract_video_key
+
+# Expansion des sous-listes (onglets de chaîne) et métadonnées manquantes, en parallèle borné
+EXPANSION_WORKERS = 4
+MAX_NESTING = 2
+
+_YT_COLLECTION_PATH = re.compile(r"^/(?:playlist|@[^/]+|channel/[^/]+|c/[^/]+|user/[^/]+)(?:/|$)")
+_TT_PROFILE_PATH = re.compile(r"^/@[^/]+/?$")
+
+
+@dataclass
+class PlaylistEntry:
+    url: str
+    video_id: str
+    platform: str
+    title: str = ""
+    duration: Optional[float] = None
+
+
+@dataclass
+class CollectionListing:
+    title: str
+    entries: List[PlaylistEntry] = field(default_factory=list)
+    archived: int = 0
+    duplicates: int = 0
+    failed: int = 0
+
+
+def is_collection_url(url: str, *, include_mixed: bool = False) -> bool:
+    """Vrai pour une playlist, une chaîne ou un profil (sans appel réseau).
+
+    Une URL ``watch?v=…&list=…`` reste une vidéo seule sauf si ``include_mixed``.
+    """
+
+    raw = (url or "").strip()
+    if "://" not in raw:
+        raw = "https://" + raw
+    try:
+        parsed = urlparse(raw)
+    except ValueError:
+        return False
+    host = (parsed.hostname or "").lower()
+    path = parsed.path or ""
+    if host == "youtube.com" or host.endswith(".youtube.com"):
+        query = parse_qs(parsed.query)
+        if path.startswith("/watch"):
+            return include_mixed and bool(query.get("list"))
+        return bool(_YT_COLLECTION_PATH.match(path))
+    if host == "tiktok.com" or host.endswith(".tiktok.com"):
+        return bool(_TT_PROFILE_PATH.match(path))
+    return False
+
+
+def _entry_platform(entry: dict) -> str:
+    ie_key = (entry.get("ie_key") or entry.get("extractor_key") or "").strip().lower()
+    if ie_key.startswith("youtube"):
+        return "youtube"
+    if ie_key.startswith("tiktok"):
+        return "tiktok"
+    return ie_key
+
+
+def _entry_url(entry: dict, platform: str, video_id: str) -> str:
+    if platform == "youtube" and video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+    return entry.get("webpage_url") or entry.get("url") or ""
+
+
+def _is_nested(entry: dict) -> bool:
+    if entry.get("_type") == "playlist":
+        return True
+    ie_key = (entry.get("ie_key") or "").lower()
+    return ie_key in ("youtubetab", "youtubeplaylist", "tiktokuser")
+
+
+def expand_collection(
+    url: str,
+    *,
+    limit: Optional[int] = None,
+    max_workers: int = EXPANSION_WORKERS,
+    on_status: Optional[Callable[[str], None]] = None,
+) -> CollectionListing:
+    """Liste les éléments de ``url`` et ne garde que ceux absents de l'archive."""
+
+    info = extract_flat_info(url, limit=limit)
+    listing = CollectionListing(title=info.get("title") or info.get("id") or url)
+    archive = get_archive_index()
+    seen: Set[Tuple[str, str]] = set()
+    lock = threading.Lock()
+    pending_nested: List[Tuple[str, int]] = []
+    unresolved: List[dict] = []
+
+    def _accept(entry: dict) -> None:
+        platform = _entry_platform(entry)
+        video_id = str(entry.get("id") or "")
+        if not video_id:
+            key = extract_video_key(entry.get("url") or "")
+            if key:
+                platform, video_id = key
+        if not video_id or not platform:
+            unresolved.append(entry)
+            return
+        with lock:
+            if (platform, video_id) in seen:
+                listing.duplicates += 1
+                return
+            seen.add((platform, video_id))
+            if archive.contains(platform, video_id):
+                listing.archived += 1
+                return
+            if limit and len(listing.entries) >= limit:
+                return
+            listing.entries.append(
+                PlaylistEntry(
+                    url=_entry_url(entry, platform, video_id),
+                    video_id=video_id,
+                    platform=platform,
+                    title=entry.get("title") or "",
+                    duration=entry.get("duration"),
+                )
+            )
+
+    def _walk(entries: List[dict], depth: int) -> None:
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            if _is_nested(entry):
+                nested_url = entry.get("url") or entry.get("webpage_url")
+                if nested_url and depth < MAX_NESTING:
+                    pending_nested.append((nested_url, depth + 1))
+                continue
+            _accept(entry)
+
+    _walk(list(info.get("entries") or []), 0)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="playlist") as pool:
+        # Onglets d'une chaîne (Vidéos, Shorts, Directs…) : une requête flat chacun
+        while pending_nested:
+            batch, pending_nested[:] = list(pending_nested), []
+            if on_status:
+                on_status(f"Expansion de {len(batch)} sous-liste(s)…")
+            futures = [pool.submit(extract_flat_info, nested, limit=limit) for nested, _ in batch]
+            for (_, depth), future in zip(batch, futures):
+                try:
+                    _walk(list((future.result() or {}).get("entries") or []), depth)
+                except Exception:
+                    listing.failed += 1
+
+        # Entrées sans identifiant exploitable : métadonnées complètes (et mises en cache)
+        if unresolved:
+            if on_status:
+                on_status(f"Résolution de {len(unresolved)} élément(s)…")
+            targets = [entry.get("url") or entry.get("webpage_url") for entry in unresolved]
+            futures = [pool.submit(extract_basic_info, target) for target in targets if target]
+            for future in futures:
+                try:
+                    _accept(future.result() or {})
+                except Exception:
+                    listing.failed += 1
+    return listing
+
+
+def ingest_summary(listing: CollectionListing, added: int) -> str:
+    parts: List[str] = [f"{listing.title} : {added} nouvel(s) élément(s)"]
+    if listing.archived:
+        parts.append(f"{listing.archived} déjà archivé(s)")
+    if listing.duplicates:
+        parts.append(f"{listing.duplicates} doublon(s)")
+    if listing.failed:
+        parts.append(f"{listing.failed} échec(s)")
+    return ", ".join(parts)
+
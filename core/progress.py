@@ -0,0 +1,75 @@
+"""Agrégation de la progression yt-dlp : cadence limitée par tâche et vitesse lissée."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+DEFAULT_FPS = 10.0
+# Constante de temps du lissage exponentiel de la vitesse (secondes)
+SPEED_TAU = 2.0
+
+ProgressSink = Callable[[int, int, float, int, str], None]
+
+
+class ProgressThrottle:
+    """Fusionne les callbacks de progression et les relaie au plus ``fps`` fois par seconde.
+
+    Chaque échantillon met à jour la moyenne mobile exponentielle de la vitesse ; seul le
+    dernier état est conservé entre deux envois. ``flush()`` délivre toujours l'état final.
+    """
+
+    def __init__(self, sink: ProgressSink, *, fps: float = DEFAULT_FPS, tau: float = SPEED_TAU):
+        self._sink = sink
+        self._interval = 1.0 / fps if fps > 0 else 0.0
+        self._tau = max(0.01, float(tau))
+        self._lock = threading.Lock()
+        self._last_emit = 0.0
+        self._last_sample: Optional[float] = None
+        self._speed: Optional[float] = None
+        self._pending: Optional[Tuple[int, int, float, int, str]] = None
+
+    @property
+    def speed(self) -> float:
+        return self._speed or 0.0
+
+    def _smooth(self, raw: float, now: float) -> float:
+        if self._speed is None or self._last_sample is None:
+            self._speed = raw
+        else:
+            dt = max(0.0, now - self._last_sample)
+            alpha = 1.0 - math.exp(-dt / self._tau)
+            self._speed += alpha * (raw - self._speed)
+        self._last_sample = now
+        return self._speed
+
+    def update(self, downloaded: int, total: int, speed: float, eta: int, filename: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            smoothed = self._smooth(float(speed or 0.0), now) if speed else self.speed
+            if total and smoothed > 0:
+                eta = int(max(0, total - downloaded) / smoothed)
+            state = (downloaded, total, smoothed, eta, filename)
+            done = bool(total) and downloaded >= total
+            if not done and now - self._last_emit < self._interval:
+                self._pending = state
+                return
+            self._pending = None
+            self._last_emit = now
+        self._deliver(state)
+
+    def flush(self) -> None:
+        with self._lock:
+            state, self._pending = self._pending, None
+            if state is not None:
+                self._last_emit = time.monotonic()
+        if state is not None:
+            self._deliver(state)
+
+    def _deliver(self, state: Tuple[int, int, float, int, str]) -> None:
+        try:
+            self._sink(*state)
+        except Exception:
+            pass
@@ -0,0 +1,403 @@
+"""Téléchargement HTTP multi-connexions (requêtes Range) pour les formats progressifs.
+
+``concurrent_fragment_downloads`` ne sert qu'au HLS/DASH ; un MP4 progressif (TikTok, repli
+``best``) passe par une seule connexion que le CDN bride souvent. ``RangeYoutubeDL`` remplace
+alors ``HttpFD`` par ``RangeParallelFD`` :
+- le fichier est découpé en plages téléchargées en parallèle, chacune avec ses reprises ;
+- l'avancement est consigné dans ``<fichier>.ranges.json`` pour reprendre après un arrêt ;
+  seuls les octets déjà écrits sur disque (flush + fsync) y sont comptés ;
+- chaque requête porte ``If-Range`` (validateur de la sonde) ; chaque réponse 206 doit annoncer
+  la taille totale et le validateur (ETag ou Last-Modified) de la sonde. Si la ressource a changé
+  sur le serveur, les plages déjà reçues sont jetées et le téléchargement repart de zéro ;
+- avant de renommer le fichier : toutes les plages closes et la taille exacte. Aucun contrôle
+  du contenu lui-même (pas d'empreinte fournie par le serveur).
+Sans support Range côté serveur, ou pour un petit fichier, le comportement d'origine s'applique.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.postprocessor.ffmpeg import FFmpegMergerPP
+from yt_dlp.utils import parse_http_range
+from yt_dlp.utils.networking import HTTPHeaderDict
+
+from config import DEFAULT_CONFIG, load_config
+from core.dual_output import DualOutputMergerPP
+
+MIN_PARALLEL_SIZE = 4 * 1024 * 1024
+MIN_RANGE_SIZE = 1024 * 1024
+BLOCK_SIZE = 64 * 1024
+_SIDECAR_INTERVAL = 1.0
+_PROGRESS_INTERVAL = 0.1
+_MAX_RETRY_SLEEP = 30.0
+# Redémarrages complets tolérés quand la ressource change pendant le téléchargement
+_MAX_RESTARTS = 2
+
+
+class RangeDownloadError(Exception):
+    pass
+
+
+class RangeObjectChanged(RangeDownloadError):
+    """La ressource servie ne correspond plus à la sonde (taille ou validateur différents)."""
+
+
+class _Range:
+    __slots__ = ("start", "end", "done", "durable")
+
+    def __init__(self, start: int, end: int, done: int = 0):
+        self.start = start
+        self.end = end
+        self.done = done
+        # Octets confirmés sur disque (fsync) : seule valeur consignée pour une reprise
+        self.durable = done
+
+    @property
+    def position(self) -> int:
+        return self.start + self.done
+
+    @property
+    def complete(self) -> bool:
+        return self.position > self.end
+
+
+class RangeParallelFD(HttpFD):
+    FD_NAME = "http-ranges"
+
+    def real_download(self, filename, info_dict):
+        if not self._eligible(info_dict):
+            return super().real_download(filename, info_dict)
+        headers = HTTPHeaderDict({"Accept-Encoding": "identity"}, info_dict.get("http_headers"))
+        restarts = 0
+        while True:
+            probe = self._probe(info_dict["url"], headers, info_dict)
+            if probe is None or probe["total"] < MIN_PARALLEL_SIZE:
+                return super().real_download(filename, info_dict)
+            try:
+                return self._download_ranges(filename, info_dict, headers, probe)
+            except RangeObjectChanged as exc:
+                restarts += 1
+                if restarts > _MAX_RESTARTS:
+                    raise
+                self.report_warning(f"{exc} : téléchargement repris depuis le début")
+
+    # --- Préparation -------------------------------------------------------------------
+
+    def _eligible(self, info_dict) -> bool:
+        if self.params.get("test") or info_dict.get("request_data") is not None:
+            return False
+        if (info_dict.get("http_headers") or {}).get("Range"):
+            return False
+        return self._connections() > 1
+
+    def _connections(self) -> int:
+        value = self.params.get("range_connections")
+        if value is None:
+            value = load_config().get("range_connections") or DEFAULT_CONFIG["range_connections"]
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            return 1
+
+    def _request(self, url: str, headers: HTTPHeaderDict, info_dict, start: int, end: int, validator: str = ""):
+        extensions = {}
+        target = self._get_impersonate_target(info_dict)
+        if target is not None:
+            extensions["impersonate"] = target
+        request = Request(url, None, HTTPHeaderDict(headers), extensions=extensions)
+        request.headers["Range"] = f"bytes={start}-{end}"
+        # Ressource modifiée : le serveur répond 200 avec l'objet entier au lieu de la plage.
+        # Un ETag faible est interdit dans If-Range (RFC 9110) : contrôle de la réponse seulement.
+        if validator and not validator.startswith("W/"):
+            request.headers["If-Range"] = validator
+        return self.ydl.urlopen(request)
+
+    @staticmethod
+    def _validator(response) -> str:
+        return response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+
+    def _probe(self, url: str, headers: HTTPHeaderDict, info_dict) -> Optional[Dict[str, object]]:
+        try:
+            response = self._request(url, headers, info_dict, 0, 0)
+        except Exception:
+            return None
+        try:
+            if getattr(response, "status", None) != 206:
+                return None
+            start, _end, total = parse_http_range(response.headers.get("Content-Range"))
+            if start != 0 or not total:
+                return None
+            return {
+                "total": int(total),
+                "validator": self._validator(response),
+            }
+        finally:
+            response.close()
+
+    def _plan(self, total: int, connections: int) -> List[_Range]:
+        count = max(1, min(connections, total // MIN_RANGE_SIZE))
+        size = total // count
+        ranges = []
+        for idx in range(count):
+            start = idx * size
+            end = total - 1 if idx == count - 1 else start + size - 1
+            ranges.append(_Range(start, end))
+        return ranges
+
+    def _load_sidecar(self, path: str, tmpfilename: str, probe: Dict[str, object]) -> Optional[List[_Range]]:
+        if not self.params.get("continuedl", True) or not os.path.isfile(tmpfilename):
+            return None
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if data.get("total") != probe["total"] or data.get("validator") != probe["validator"]:
+            return None
+        try:
+            return [_Range(int(s), int(e), int(d)) for s, e, d in data.get("ranges") or []]
+        except (TypeError, ValueError):
+            return None
+
+    def _save_sidecar(self, path: str, probe: Dict[str, object], ranges: List[_Range]) -> None:
+        payload = {
+            "total": probe["total"],
+            "validator": probe["validator"],
+            "ranges": [[r.start, r.end, r.durable] for r in ranges],
+        }
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    # --- Téléchargement ----------------------------------------------------------------
+
+    def _download_ranges(self, filename, info_dict, headers, probe) -> bool:
+        total = int(probe["total"])
+        # Nom distinct du .part d'HttpFD : un repli mono-flux ne prend jamais ce fichier
+        # troué pour un préfixe contigu déjà téléchargé.
+        tmpfilename = filename + ".ranges.part"
+        sidecar = filename + ".ranges.json"
+        ranges = self._load_sidecar(sidecar, tmpfilename, probe)
+        if ranges is None:
+            ranges = self._plan(total, self._connections())
+            with open(tmpfilename, "wb"):
+                pass
+        else:
+            resumed = sum(r.done for r in ranges)
+            if resumed:
+                self.report_resuming_byte(resumed)
+        self._save_sidecar(sidecar, probe, ranges)
+
+        lock = threading.Lock()
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        session = {"bytes": 0, "start": time.time()}
+        retries = self.params.get("retries", 10)
+        retries = float("inf") if retries == "infinite" else int(retries or 0)
+        chunk = int(
+            self.params.get("http_chunk_size")
+            or (info_dict.get("downloader_options") or {}).get("http_chunk_size")
+            or 0
+        )
+        url = info_dict["url"]
+        validator = str(probe["validator"] or "")
+
+        def _pace() -> None:
+            # Débit global de la ressource : ratelimit est relu à chaque bloc (réglage à chaud)
+            rate = self.params.get("ratelimit")
+            if not rate:
+                return
+            with lock:
+                elapsed = time.time() - session["start"]
+                expected = session["bytes"] / float(rate)
+            if expected > elapsed:
+                time.sleep(min(expected - elapsed, 1.0))
+
+        def _sync(out, part: _Range) -> None:
+            # Un crash ne doit jamais laisser dans le sidecar des octets restés en mémoire tampon
+            out.flush()
+            os.fsync(out.fileno())
+            with lock:
+                part.durable = part.done
+
+        def _worker(part: _Range) -> None:
+            with open(tmpfilename, "r+b") as out:
+                try:
+                    _fetch(out, part)
+                finally:
+                    _sync(out, part)
+
+        def _fetch(out, part: _Range) -> None:
+            attempt = 0
+            last_sync = time.monotonic()
+            while not part.complete and not stop.is_set():
+                end = part.end if not chunk else min(part.end, part.position + chunk - 1)
+                try:
+                    response = self._request(url, headers, info_dict, part.position, end, validator)
+                    try:
+                        got_start, _got_end, got_total = parse_http_range(response.headers.get("Content-Range"))
+                        status = getattr(response, "status", None)
+                        if status == 200 and validator:
+                            raise RangeObjectChanged("La ressource a changé sur le serveur (If-Range)")
+                        if status != 206 or got_start != part.position:
+                            raise RangeDownloadError("Le serveur a ignoré la requête Range")
+                        got_validator = self._validator(response)
+                        if got_total != total or (got_validator and validator and got_validator != validator):
+                            raise RangeObjectChanged("La ressource a changé sur le serveur (taille ou ETag)")
+                        out.seek(part.position)
+                        while not stop.is_set() and part.position <= end:
+                            block = response.read(min(BLOCK_SIZE, end - part.position + 1))
+                            if not block:
+                                break
+                            out.write(block)
+                            with lock:
+                                part.done += len(block)
+                                session["bytes"] += len(block)
+                            if time.monotonic() - last_sync >= _SIDECAR_INTERVAL:
+                                _sync(out, part)
+                                last_sync = time.monotonic()
+                            _pace()
+                    finally:
+                        response.close()
+                    if part.position <= end and not stop.is_set():
+                        raise RangeDownloadError("Connexion interrompue avant la fin de la plage")
+                    attempt = 0
+                except Exception as exc:
+                    if isinstance(exc, RangeObjectChanged):
+                        raise
+                    if isinstance(exc, HTTPError) and exc.status < 500 and exc.status != 429:
+                        raise
+                    attempt += 1
+                    if attempt > retries:
+                        raise
+                    self.report_retry(exc, attempt, retries)
+                    time.sleep(min(_MAX_RETRY_SLEEP, 2 ** (attempt - 1)) + random.uniform(0, 0.5))
+
+        def _run(part: _Range) -> None:
+            try:
+                _worker(part)
+            except BaseException as exc:
+                with lock:
+                    errors.append(exc)
+                stop.set()
+
+        threads = [
+            threading.Thread(target=_run, args=(part,), name=f"range-{idx}", daemon=True)
+            for idx, part in enumerate(ranges)
+            if not part.complete
+        ]
+        for thread in threads:
+            thread.start()
+
+        last_saved = 0.0
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(_PROGRESS_INTERVAL)
+                with lock:
+                    downloaded = sum(r.done for r in ranges)
+                    elapsed = time.time() - session["start"]
+                    speed = session["bytes"] / elapsed if elapsed > 0 else None
+                self._hook_progress(
+                    {
+                        "status": "downloading",
+                        "downloaded_bytes": downloaded,
+                        "total_bytes": total,
+                        "filename": filename,
+                        "tmpfilename": tmpfilename,
+                        "elapsed": elapsed,
+                        "speed": speed,
+                        "eta": int((total - downloaded) / speed) if speed else None,
+                    },
+                    info_dict,
+                )
+                now = time.monotonic()
+                if now - last_saved >= _SIDECAR_INTERVAL:
+                    last_saved = now
+                    with lock:
+                        self._save_sidecar(sidecar, probe, ranges)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+            with lock:
+                self._save_sidecar(sidecar, probe, ranges)
+
+        if errors:
+            if isinstance(errors[0], RangeObjectChanged):
+                # Plages issues de versions différentes : rien n'est récupérable
+                for path in (sidecar, tmpfilename):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            raise errors[0]
+
+        # Chaque réponse a été rapprochée de la sonde (taille, validateur) ; reste la complétude.
+        # Le contenu lui-même n'est pas vérifié : le serveur ne fournit aucune empreinte.
+        size = os.path.getsize(tmpfilename)
+        if not all(r.complete for r in ranges) or size != total:
+            raise RangeDownloadError(f"Fichier incomplet : {size} octets reçus sur {total}")
+        self.try_rename(tmpfilename, filename)
+        try:
+            os.remove(sidecar)
+        except OSError:
+            pass
+        self._hook_progress(
+            {
+                "status": "finished",
+                "downloaded_bytes": total,
+                "total_bytes": total,
+                "filename": filename,
+                "elapsed": time.time() - session["start"],
+            },
+            info_dict,
+        )
+        return True
+
+
+class RangeYoutubeDL(YoutubeDL):
+    """``YoutubeDL`` qui confie les formats HTTP progressifs à ``RangeParallelFD``.
+
+    Avec ``dual_audio_dir`` dans les paramètres, la fusion vidéo + audio produit aussi la piste
+    audio dans ce dossier, dans le même passage ffmpeg (``DualOutputMergerPP``).
+    """
+
+    def post_process(self, filename, info, files_to_move=None):
+        audio_dir = self.params.get("dual_audio_dir")
+        pps = info.get("__postprocessors")
+        if audio_dir and pps:
+            info["__postprocessors"] = [
+                DualOutputMergerPP(self, audio_dir) if type(pp) is FFmpegMergerPP else pp for pp in pps
+            ]
+        return super().post_process(filename, info, files_to_move)
+
+    def dl(self, name, info, subtitle=False, test=False):
+        if test or subtitle or name == "-" or not info.get("url"):
+            return super().dl(name, info, subtitle=subtitle, test=test)
+        if get_suitable_downloader(info, self.params, to_stdout=False) is not HttpFD:
+            return super().dl(name, info, subtitle=subtitle, test=test)
+        fd = RangeParallelFD(self, self.params)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        self.write_debug(f'Invoking {fd.FD_NAME} downloader on "{info["url"]}"')
+        new_info = self._copy_infodict(info)
+        if new_info.get("http_headers") is None:
+            new_info["http_headers"] = self._calc_headers(new_info)
+        return fd.download(name, new_info, subtitle)
@@ -0,0 +1,281 @@
+"""Limiteur de requêtes partagé par plateforme : seau à jetons et disjoncteur HTTP 429.
+
+Toutes les extractions yt-dlp (inspection, téléchargement, Telegram, CLI) passent par
+``call_limited`` : les requêtes sont étalées, et dès qu'une rafale de 429 commence tous
+les appelants de la plateforme sont mis en pause jusqu'à la fin du refroidissement.
+
+Seule la phase de requête est limitée : pour un téléchargement, un ``ProbeTicket`` placé dans
+les ``progress_hooks`` libère la sonde dès les premiers octets reçus, sans attendre la fin.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# (requêtes par seconde, rafale)
+PLATFORM_RATES: Dict[str, Tuple[float, int]] = {
+    "youtube": (0.5, 4),
+    "tiktok": (0.3, 3),
+}
+DEFAULT_RATE: Tuple[float, int] = (1.0, 5)
+
+TRIP_THRESHOLD = 2
+STRIKE_WINDOW = 60.0
+BASE_COOLDOWN = 30.0
+MAX_COOLDOWN = 15 * 60.0
+_WAIT_SLICE = 0.25
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LimiterInterrupted(Exception):
+    pass
+
+
+def is_rate_limited_error(exc: BaseException) -> bool:
+    msg = (str(exc) or "").lower()
+    return "429" in msg or "too many requests" in msg
+
+
+class PlatformLimiter:
+    """Seau à jetons + disjoncteur (fermé → ouvert → semi-ouvert) pour une plateforme."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1, int(burst))
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._trips = 0
+        self._strikes: list = []
+        self._probe_inflight = False
+        self._throttled_total = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(float(self.burst), self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _try_acquire(self) -> float:
+        """Prend un jeton ou retourne le délai d'attente conseillé (secondes)."""
+
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                if now < self._open_until:
+                    return self._open_until - now
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                # Une seule requête sonde à la fois tant que la plateforme n'a pas répondu
+                if self._probe_inflight:
+                    return 1.0
+                self._probe_inflight = True
+                return 0.0
+            self._refill(now)
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(
+        self,
+        *,
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_wait: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        notified = False
+        while True:
+            delay = self._try_acquire()
+            if delay <= 0:
+                return
+            if on_wait and not notified and delay >= 1.0:
+                notified = True
+                on_wait(delay)
+            _interruptible_sleep(min(delay, _WAIT_SLICE), should_stop)
+
+    def record_ok(self) -> None:
+        with self._lock:
+            self._probe_inflight = False
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._trips = 0
+                self._strikes.clear()
+
+    def record_failed(self) -> None:
+        """Échec sans 429 : la sonde est rendue, mais la plateforme n'a pas prouvé sa reprise."""
+
+        with self._lock:
+            self._probe_inflight = False
+
+    def record_throttled(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._throttled_total += 1
+            self._probe_inflight = False
+            self._tokens = 0.0
+            self._stamp = now
+            self._strikes = [t for t in self._strikes if now - t <= STRIKE_WINDOW]
+            self._strikes.append(now)
+            if self._state == HALF_OPEN or len(self._strikes) >= TRIP_THRESHOLD:
+                cooldown = min(MAX_COOLDOWN, BASE_COOLDOWN * (2 ** self._trips))
+                self._trips += 1
+                self._state = OPEN
+                self._open_until = now + cooldown
+                self._strikes.clear()
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            state = self._state
+            remaining = max(0.0, self._open_until - now) if state == OPEN else 0.0
+            if state == OPEN and remaining <= 0:
+                state = HALF_OPEN
+            return {
+                "state": state,
+                "tokens": round(self._tokens, 2),
+                "burst": self.burst,
+                "rate": self.rate,
+                "cooldown_remaining": remaining,
+                "trips": self._trips,
+                "throttled_total": self._throttled_total,
+            }
+
+
+def _interruptible_sleep(delay: float, should_stop: Optional[Callable[[], bool]]) -> None:
+    deadline = time.monotonic() + max(0.0, delay)
+    while True:
+        if should_stop and should_stop():
+            raise LimiterInterrupted("Interrompu par l’utilisateur")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, _WAIT_SLICE))
+
+
+class RateLimiterRegistry:
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, int]]] = None):
+        self._rates = dict(PLATFORM_RATES if rates is None else rates)
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, PlatformLimiter] = {}
+
+    def for_platform(self, key: str) -> PlatformLimiter:
+        key = (key or "").strip().lower()
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = PlatformLimiter(*self._rates.get(key, DEFAULT_RATE))
+                self._limiters[key] = limiter
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            items = list(self._limiters.items())
+        return {key: limiter.snapshot() for key, limiter in items}
+
+    def describe(self, key: str) -> str:
+        snap = self.for_platform(key).snapshot()
+        if snap["state"] == OPEN:
+            return f"Requêtes : pause 429, reprise dans {int(snap['cooldown_remaining']) + 1} s"
+        if snap["state"] == HALF_OPEN:
+            return "Requêtes : test de reprise…"
+        return f"Requêtes : normal ({int(snap['tokens'])}/{snap['burst']})"
+
+
+class ProbeTicket:
+    """Hook de progression yt-dlp : la plateforme a répondu dès le premier octet reçu.
+
+    ``call_limited`` l'arme avant chaque tentative ; le premier état ``downloading`` (ou
+    ``finished``) appelle ``record_ok`` et rend la sonde d'un disjoncteur semi-ouvert, même si
+    le téléchargement dure encore plusieurs minutes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiter: Optional[PlatformLimiter] = None
+
+    def arm(self, limiter: PlatformLimiter) -> None:
+        with self._lock:
+            self._limiter = limiter
+
+    def disarm(self) -> Optional[PlatformLimiter]:
+        """Retire le limiteur encore en attente de réponse (``None`` si déjà soldé)."""
+
+        with self._lock:
+            limiter, self._limiter = self._limiter, None
+        return limiter
+
+    def settle(self) -> None:
+        limiter = self.disarm()
+        if limiter is not None:
+            limiter.record_ok()
+
+    def __call__(self, data: Dict[str, object]) -> None:
+        if data.get("status") in ("downloading", "finished"):
+            self.settle()
+
+
+def call_limited(
+    key: str,
+    fn: Callable[[], T],
+    *,
+    attempts: int = 3,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_wait: Optional[Callable[[str], None]] = None,
+    ticket: Optional[ProbeTicket] = None,
+) -> T:
+    """Exécute ``fn`` sous le limiteur de ``key`` ; les 429 sont retentés puis propagés.
+
+    ``ticket`` (déjà présent dans les ``progress_hooks`` de ``fn``) solde la requête au premier
+    octet téléchargé ; sans lui, elle l'est au retour de ``fn``.
+    """
+
+    limiter = get_rate_limiter().for_platform(key)
+    ticket = ticket or ProbeTicket()
+
+    def _notify(delay: float) -> None:
+        if on_wait:
+            on_wait(f"Limiteur {key} : attente {int(delay) + 1} s avant la prochaine requête…")
+
+    last_exc: Optional[BaseException] = None
+    for attempt in range(max(1, attempts)):
+        limiter.acquire(should_stop=should_stop, on_wait=_notify)
+        ticket.arm(limiter)
+        try:
+            result = fn()
+        except Exception as exc:
+            pending = ticket.disarm()
+            if not is_rate_limited_error(exc):
+                if pending is not None:
+                    limiter.record_failed()
+                raise
+            limiter.record_throttled()
+            last_exc = exc
+            if on_wait:
+                on_wait("yt-dlp : HTTP 429, nouvelle tentative…")
+            _interruptible_sleep(1.5 ** attempt + random.uniform(0, 0.5), should_stop)
+            continue
+        ticket.settle()
+        return result
+    assert last_exc is not None
+    raise last_exc
+
+
+_rate_limiter: Optional[RateLimiterRegistry] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiterRegistry:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiterRegistry()
+        return _rate_limiter
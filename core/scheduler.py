@@ -0,0 +1,108 @@
+"""Répartition des créneaux de téléchargement parallèles entre plateformes."""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from config import DEFAULT_CONFIG, load_config
+
+
+class SlotScheduler:
+    """Compteur de créneaux partagé : un plafond global et un plafond par plateforme.
+
+    Les onglets YouTube et TikTok piochent dans le même réservoir ; quand un créneau
+    se libère, les écouteurs enregistrés sont prévenus pour relancer leur file.
+    """
+
+    def __init__(self, total: int, per_platform: Optional[Dict[str, int]] = None):
+        self._lock = threading.Lock()
+        self._total = max(1, int(total))
+        self._caps: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        self._listeners: List[Callable[[], None]] = []
+        self.configure(total, per_platform or {})
+
+    def configure(self, total: int, per_platform: Dict[str, int]) -> None:
+        with self._lock:
+            self._total = max(1, int(total))
+            self._caps = {
+                (key or "").strip().lower(): max(1, int(value)) for key, value in per_platform.items()
+            }
+        self._notify()
+
+    def configure_from(self, cfg: dict) -> None:
+        self.configure(
+            cfg.get("max_parallel_downloads") or DEFAULT_CONFIG["max_parallel_downloads"],
+            {
+                "youtube": cfg.get("max_parallel_youtube") or DEFAULT_CONFIG["max_parallel_youtube"],
+                "tiktok": cfg.get("max_parallel_tiktok") or DEFAULT_CONFIG["max_parallel_tiktok"],
+            },
+        )
+
+    def try_acquire(self, platform: str) -> bool:
+        key = (platform or "").strip().lower()
+        with self._lock:
+            if sum(self._active.values()) >= self._total:
+                return False
+            cap = self._caps.get(key, self._total)
+            if self._active.get(key, 0) >= cap:
+                return False
+            self._active[key] = self._active.get(key, 0) + 1
+            return True
+
+    def release(self, platform: str) -> None:
+        key = (platform or "").strip().lower()
+        with self._lock:
+            current = self._active.get(key, 0)
+            if current <= 1:
+                self._active.pop(key, None)
+            else:
+                self._active[key] = current - 1
+        self._notify()
+
+    def active(self, platform: Optional[str] = None) -> int:
+        with self._lock:
+            if platform is None:
+                return sum(self._active.values())
+            return self._active.get((platform or "").strip().lower(), 0)
+
+    def capacity(self, platform: Optional[str] = None) -> int:
+        with self._lock:
+            if platform is None:
+                return self._total
+            return min(self._total, self._caps.get((platform or "").strip().lower(), self._total))
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            try:
+                self._listeners.remove(callback)
+            except ValueError:
+                pass
+
+    def _notify(self) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+_download_slots: Optional[SlotScheduler] = None
+_download_slots_lock = threading.Lock()
+
+
+def get_download_slots() -> SlotScheduler:
+    global _download_slots
+    with _download_slots_lock:
+        if _download_slots is None:
+            scheduler = SlotScheduler(DEFAULT_CONFIG["max_parallel_downloads"])
+            scheduler.configure_from(load_config())
+            _download_slots = scheduler
+        return _download_slots
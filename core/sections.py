@@ -0,0 +1,178 @@
+"""Téléchargement partiel : plages horaires et chapitres (``download_ranges`` de yt-dlp).
+
+Une tâche porte une spécification texte, par exemple ``"1:30-3:30, #2, Intro"`` :
+- ``début-fin`` : plage horaire (``90``, ``1:30``, ``1:02:03`` ou ``1h2m3s`` ; fin vide = jusqu'au bout) ;
+- ``#N`` : N-ième chapitre ;
+- tout autre texte : chapitres dont le titre le contient (sans tenir compte de la casse).
+Un horodatage seul (``1:30``) est refusé : il faut une plage, au besoin ouverte (``1:30-``).
+
+yt-dlp confie alors chaque section à ffmpeg, qui ne lit que les octets nécessaires ;
+``force_keyframes_at_cuts`` réencode aux bornes pour une coupe exacte.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_ITEM_SPLIT = re.compile(r"[,;]")
+_RANGE = re.compile(r"^(?P<start>[^-]*?)\s*-\s*(?P<end>[^-]*)$")
+_UNITS = re.compile(r"^(?:(?P<h>\d+)h)?(?:(?P<m>\d+)m(?:in)?)?(?:(?P<s>\d+(?:\.\d+)?)s?)?$", re.IGNORECASE)
+_OPEN_END = {"", "fin", "end", "inf"}
+_SLUG_MAX = 40
+
+
+class SectionError(ValueError):
+    """Spécification de sections illisible, ou aucun chapitre correspondant."""
+
+
+def parse_timestamp(text: str) -> float:
+    value = text.strip().lower().replace(",", ".")
+    try:
+        if ":" in value:
+            parts = value.split(":")
+            if len(parts) <= 3:
+                total = 0.0
+                for part in parts:
+                    total = total * 60 + float(part)
+                return total
+        else:
+            match = _UNITS.match(value)
+            if value and match and any(match.groups()):
+                hours, minutes, seconds = (match.group(k) for k in ("h", "m", "s"))
+                return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+    except ValueError:
+        pass
+    raise SectionError(f"Horodatage illisible : « {text} »")
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds:g}".replace(".", "_")
+
+
+@dataclass(frozen=True)
+class SectionSpec:
+    ranges: Tuple[Tuple[float, Optional[float]], ...] = ()
+    chapter_indexes: Tuple[int, ...] = ()
+    chapter_titles: Tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.ranges or self.chapter_indexes or self.chapter_titles)
+
+    def slug(self) -> str:
+        """Marqueur court et stable, utilisable dans un nom de fichier."""
+
+        parts = [f"{_format_seconds(s)}-{'fin' if e is None else _format_seconds(e)}" for s, e in self.ranges]
+        parts += [f"ch{idx}" for idx in self.chapter_indexes]
+        parts += [re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "ch" for title in self.chapter_titles]
+        return "_".join(parts)[:_SLUG_MAX].rstrip("_-")
+
+    def __call__(self, info: dict, ydl) -> Iterator[Dict[str, object]]:
+        """Callback ``download_ranges`` : sections à télécharger pour ``info``."""
+
+        sections: List[Dict[str, object]] = []
+        for start, end in self.ranges:
+            sections.append({"start_time": start, "end_time": float("inf") if end is None else end})
+        chapters = info.get("chapters") or []
+        for idx in self.chapter_indexes:
+            if 1 <= idx <= len(chapters):
+                sections.append(_chapter_section(chapters[idx - 1], idx))
+            else:
+                ydl.report_warning(f"Chapitre #{idx} absent ({len(chapters)} chapitre(s))")
+        for title in self.chapter_titles:
+            found = [
+                (idx, ch)
+                for idx, ch in enumerate(chapters, start=1)
+                if title.lower() in (ch.get("title") or "").lower()
+            ]
+            if not found:
+                ydl.report_warning(f"Aucun chapitre ne contient « {title} »")
+            sections.extend(_chapter_section(ch, idx) for idx, ch in found)
+        if not sections:
+            # Liste vide : yt-dlp ne téléchargerait rien sans le signaler
+            raise SectionError("Aucune section à télécharger (chapitres introuvables)")
+        return iter(sections)
+
+
+def _chapter_section(chapter: dict, index: int) -> Dict[str, object]:
+    return {
+        "start_time": chapter.get("start_time") or 0,
+        "end_time": chapter.get("end_time") or float("inf"),
+        "title": chapter.get("title"),
+        "index": index,
+    }
+
+
+def _is_timestamp(text: str) -> bool:
+    try:
+        parse_timestamp(text)
+    except SectionError:
+        return False
+    return True
+
+
+def parse_sections(text: Optional[str]) -> SectionSpec:
+    """Analyse la spécification saisie ; lève ``SectionError`` si elle est incohérente."""
+
+    ranges: List[Tuple[float, Optional[float]]] = []
+    indexes: List[int] = []
+    titles: List[str] = []
+    for raw in _ITEM_SPLIT.split(text or ""):
+        item = raw.strip()
+        if not item:
+            continue
+        if item.startswith("#") and item[1:].strip().isdigit():
+            indexes.append(int(item[1:]))
+            continue
+        match = _RANGE.match(item)
+        if match:
+            try:
+                start = parse_timestamp(match.group("start") or "0")
+                end_text = match.group("end").strip().lower()
+                end = None if end_text in _OPEN_END else parse_timestamp(end_text)
+            except SectionError:
+                pass  # « Intro - suite » : un titre de chapitre, pas une plage
+            else:
+                if end is not None and end <= start:
+                    raise SectionError(f"Plage vide ou inversée : « {item} »")
+                ranges.append((start, end))
+                continue
+        elif _is_timestamp(item):
+            # « 1:30 » seul : ni plage ni titre plausible, l'échec n'apparaîtrait qu'au téléchargement
+            raise SectionError(f"Horodatage seul : « {item} ». Pour aller jusqu'à la fin, écris « {item}- »")
+        titles.append(item)
+    return SectionSpec(tuple(ranges), tuple(indexes), tuple(titles))
+
+
+def section_slug(text: Optional[str]) -> str:
+    try:
+        return parse_sections(text).slug()
+    except SectionError:
+        return ""
+
+
+def tag_outtmpl(outtmpl: str, slug: str) -> str:
+    """Ajoute le marqueur de section à l'identifiant (``[id]`` → ``[id@slug]``).
+
+    Un extrait ne doit ni écraser la vidéo complète ni être pris pour elle dans le catalogue.
+    """
+
+    return outtmpl.replace("[%(id)s]", f"[%(id)s@{slug}]") if slug else outtmpl
+
+
+def apply_sections(opts: Dict[str, object], spec_text: Optional[str]) -> Dict[str, object]:
+    """Restreint ``opts`` aux sections demandées (inchangé si la spécification est vide).
+
+    L'extrait reste hors archive : la vidéo complète doit pouvoir être téléchargée ensuite.
+    """
+
+    spec = parse_sections(spec_text)
+    if not spec:
+        return opts
+    opts["download_ranges"] = spec
+    opts["force_keyframes_at_cuts"] = True
+    if isinstance(opts.get("outtmpl"), str):
+        opts["outtmpl"] = tag_outtmpl(opts["outtmpl"], spec.slug())
+    opts.pop("download_archive", None)
+    return opts
@@ -0,0 +1,63 @@
+"""Extraction hors ligne de l'identifiant ``(plateforme, id)`` d'une URL vidéo."""
+
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_YT_ID = r"[A-Za-z0-9_-]{11}"
+_YT_ID_RE = re.compile(rf"^{_YT_ID}$")
+_YT_HOSTS = ("youtube.com", "youtube-nocookie.com")
+_YT_PATH_RE = re.compile(rf"^/(?:shorts|embed|live|v|e)/({_YT_ID})(?:[/?#]|$)")
+
+_TT_PATH_RE = re.compile(r"/(?:video|photo|v|embed(?:/v2)?)/(\d{8,25})(?:\.html)?(?:[/?#]|$)")
+
+
+def _host_matches(host: str, domains: Tuple[str, ...]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def extract_video_key(url: str) -> Optional[Tuple[str, str]]:
+    """Retourne ``("youtube"|"tiktok", id)`` sans appel réseau, ou ``None``.
+
+    Les liens courts TikTok (``vm.``/``vt.tiktok.com``) ne contiennent pas l'identifiant :
+    ils nécessitent une résolution réseau et renvoient donc ``None``.
+    """
+
+    raw = (url or "").strip()
+    if not raw:
+        return None
+    if "://" not in raw:
+        raw = "https://" + raw
+    try:
+        parsed = urlparse(raw)
+    except ValueError:
+        return None
+    host = (parsed.hostname or "").lower()
+    path = parsed.path or ""
+
+    if host == "youtu.be" or host.endswith(".youtu.be"):
+        candidate = path.lstrip("/").split("/", 1)[0]
+        return ("youtube", candidate) if _YT_ID_RE.match(candidate) else None
+
+    if _host_matches(host, _YT_HOSTS):
+        if path.startswith("/watch"):
+            for candidate in parse_qs(parsed.query).get("v", []):
+                if _YT_ID_RE.match(candidate):
+                    return "youtube", candidate
+            return None
+        m = _YT_PATH_RE.match(path)
+        if m:
+            return "youtube", m.group(1)
+        return None
+
+    if _host_matches(host, ("tiktok.com",)):
+        if host.startswith(("vm.", "vt.")):
+            return None
+        m = _TT_PATH_RE.search(path)
+        if m:
+            return "tiktok", m.group(1)
+        return None
+
+    return None
@@ -7,12 +7,14 @@ import signal
 import subprocess
 import sys
 import tempfile
+import threading
 from typing import Any, Callable, List, Optional
 
 from PySide6.QtCore import Qt, QThread, QTimer, Signal, QUrl
 from PySide6.QtGui import QAction, QColor, QDesktopServices, QIcon, QPalette
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QFileDialog,
     QGroupBox,
@@ -31,9 +33,15 @@ from PySide6.QtWidgets import (
 )
 
 from config import DEFAULT_CONFIG, load_config, save_config
-from core.download_core import CommandWorker, Task
+from core.bandwidth import get_bandwidth_governor
+from core.captions import is_transcript_file
+from core.fragment_tuner import get_fragment_controller
+from core.media_catalog import get_media_catalog
+from core.scheduler import get_download_slots
 from flask_notify import start_notification_server
-from workers.telegram_worker import TelegramWorker
+from workers.download_worker import CommandWorker
+from workers.postprocess_worker import get_postprocess_pool
+from workers.telegram_worker import TelegramWorker, resolve_telegram_mode
 from ui.ui_frame_extractor_tab import FrameExtractorTab
 from ui.ui_local_audio_tab import LocalAudioTab
 from ui.ui_ocr_tab import OcrTab
@@ -689,8 +697,9 @@ class SettingsTab(QWidget):
         self.lbl_mode = QLabel("Mode")
         row_mode.addWidget(self.lbl_mode)
         self.cmb_mode = QComboBox()
-        self.cmb_mode.addItems(["Polling"])
-        self.cmb_mode.setCurrentText("Polling")
+        self.cmb_mode.addItem("Polling", "polling")
+        self.cmb_mode.addItem("Webhook", "webhook")
+        self.cmb_mode.setToolTip("Webhook : Telegram pousse les messages vers ce poste (URL publique HTTPS requise)")
         row_mode.addWidget(self.cmb_mode)
         self.lbl_port = QLabel("Port")
         row_mode.addWidget(self.lbl_port)
@@ -701,10 +710,14 @@ class SettingsTab(QWidget):
         row_mode.addStretch(1)
         tg_layout.addLayout(row_mode)
 
-        self.lbl_mode.setVisible(False)
-        self.cmb_mode.setVisible(False)
-        self.lbl_port.setVisible(False)
-        self.spin_port.setVisible(False)
+        row_webhook = QHBoxLayout()
+        row_webhook.setSpacing(8)
+        self.lbl_tg_webhook = QLabel("URL publique")
+        row_webhook.addWidget(self.lbl_tg_webhook)
+        self.ed_tg_webhook = QLineEdit()
+        self.ed_tg_webhook.setPlaceholderText("https://bot.example.com (redirigée vers le port ci-dessus)")
+        row_webhook.addWidget(self.ed_tg_webhook, 1)
+        tg_layout.addLayout(row_webhook)
 
         row_browser = QHBoxLayout()
         row_browser.setSpacing(8)
@@ -773,6 +786,76 @@ class SettingsTab(QWidget):
 
         root.addWidget(grp_tg)
 
+        grp_dl = QGroupBox("Téléchargements")
+        dl_layout = QHBoxLayout(grp_dl)
+        dl_layout.setContentsMargins(12, 12, 12, 12)
+        dl_layout.setSpacing(8)
+        dl_layout.addWidget(QLabel("Simultanés (total)"))
+        self.spin_parallel = QSpinBox()
+        self.spin_parallel.setRange(1, 16)
+        dl_layout.addWidget(self.spin_parallel)
+        dl_layout.addWidget(QLabel("YouTube"))
+        self.spin_parallel_yt = QSpinBox()
+        self.spin_parallel_yt.setRange(1, 16)
+        dl_layout.addWidget(self.spin_parallel_yt)
+        dl_layout.addWidget(QLabel("TikTok"))
+        self.spin_parallel_tt = QSpinBox()
+        self.spin_parallel_tt.setRange(1, 16)
+        dl_layout.addWidget(self.spin_parallel_tt)
+        dl_layout.addWidget(QLabel("Sockets fragments (total)"))
+        self.spin_fragment_sockets = QSpinBox()
+        self.spin_fragment_sockets.setRange(1, 64)
+        self.spin_fragment_sockets.setToolTip("Connexions HLS/DASH simultanées, tous téléchargements confondus")
+        dl_layout.addWidget(self.spin_fragment_sockets)
+        dl_layout.addWidget(QLabel("Post-traitements"))
+        self.spin_postprocess = QSpinBox()
+        self.spin_postprocess.setRange(1, 8)
+        self.spin_postprocess.setToolTip("Rangements et extractions audio menés en parallèle des téléchargements")
+        dl_layout.addWidget(self.spin_postprocess)
+        dl_layout.addStretch(1)
+        root.addWidget(grp_dl)
+
+        grp_bw = QGroupBox("Bande passante (Ko/s, 0 = illimité)")
+        bw_layout = QHBoxLayout(grp_bw)
+        bw_layout.setContentsMargins(12, 12, 12, 12)
+        bw_layout.setSpacing(8)
+        bw_layout.addWidget(QLabel("Total"))
+        self.spin_bw_total = QSpinBox()
+        self.spin_bw_yt = QSpinBox()
+        self.spin_bw_tt = QSpinBox()
+        for spin in (self.spin_bw_total, self.spin_bw_yt, self.spin_bw_tt):
+            spin.setRange(0, 1_000_000)
+            spin.setSingleStep(256)
+            spin.setSpecialValueText("Illimité")
+        bw_layout.addWidget(self.spin_bw_total)
+        bw_layout.addWidget(QLabel("YouTube"))
+        bw_layout.addWidget(self.spin_bw_yt)
+        bw_layout.addWidget(QLabel("TikTok"))
+        bw_layout.addWidget(self.spin_bw_tt)
+        bw_layout.addWidget(QLabel("Planning"))
+        self.ed_bw_schedule = QLineEdit()
+        self.ed_bw_schedule.setPlaceholderText("08:00-18:00=2000; 23:00-07:00=0")
+        self.ed_bw_schedule.setToolTip("Plages horaires qui remplacent le total (Ko/s, 0 = illimité)")
+        bw_layout.addWidget(self.ed_bw_schedule, 1)
+        root.addWidget(grp_bw)
+
+        grp_tr = QGroupBox("Transcription")
+        tr_layout = QHBoxLayout(grp_tr)
+        tr_layout.setContentsMargins(12, 12, 12, 12)
+        tr_layout.setSpacing(8)
+        self.chk_captions = QCheckBox("Sous-titres publiés d’abord")
+        self.chk_captions.setToolTip(
+            "Les jobs de transcription reprennent les sous-titres (manuels, sinon automatiques) "
+            "quand la vidéo en a ; l’audio n’est téléchargé qu’à défaut"
+        )
+        tr_layout.addWidget(self.chk_captions)
+        tr_layout.addWidget(QLabel("Langues"))
+        self.ed_caption_langs = QLineEdit()
+        self.ed_caption_langs.setPlaceholderText("fr,en")
+        self.ed_caption_langs.setToolTip("Langues préférées pour les sous-titres manuels, par ordre de priorité")
+        tr_layout.addWidget(self.ed_caption_langs, 1)
+        root.addWidget(grp_tr)
+
         line = QHBoxLayout()
         line.setSpacing(8)
         self.btn_update = QPushButton("Mettre à jour l’app (redémarrage auto)")
@@ -813,8 +896,22 @@ class SettingsTab(QWidget):
 
         self.cmb_browser_cookies.currentIndexChanged.connect(self.on_browser_choice_changed)
         self.ed_token.textChanged.connect(lambda text: self._save_cfg("telegram_token", text))
+        self.cmb_mode.currentIndexChanged.connect(self.on_telegram_mode_changed)
+        self.spin_port.valueChanged.connect(lambda value: self._save_cfg("telegram_port", value))
+        self.ed_tg_webhook.textChanged.connect(lambda text: self._save_cfg("telegram_webhook_url", text))
         self.ed_cookies.textChanged.connect(lambda text: self._save_cfg("cookies_path", text))
         self.ed_user_agent.textChanged.connect(lambda text: self._save_cfg("user_agent", text))
+        self.spin_parallel.valueChanged.connect(lambda value: self._save_cfg("max_parallel_downloads", value))
+        self.spin_parallel_yt.valueChanged.connect(lambda value: self._save_cfg("max_parallel_youtube", value))
+        self.spin_parallel_tt.valueChanged.connect(lambda value: self._save_cfg("max_parallel_tiktok", value))
+        self.spin_fragment_sockets.valueChanged.connect(lambda value: self._save_cfg("max_fragment_sockets", value))
+        self.spin_postprocess.valueChanged.connect(lambda value: self._save_cfg("max_postprocess_workers", value))
+        self.spin_bw_total.valueChanged.connect(lambda value: self._save_cfg("bandwidth_total_kib", value))
+        self.spin_bw_yt.valueChanged.connect(lambda value: self._save_cfg("bandwidth_youtube_kib", value))
+        self.spin_bw_tt.valueChanged.connect(lambda value: self._save_cfg("bandwidth_tiktok_kib", value))
+        self.ed_bw_schedule.textChanged.connect(lambda text: self._save_cfg("bandwidth_schedule", text))
+        self.chk_captions.toggled.connect(lambda checked: self._save_cfg("caption_fast_path", checked))
+        self.ed_caption_langs.textChanged.connect(lambda text: self._save_cfg("caption_languages", text))
 
     def append_log(self, text: str) -> None:
         self.logs.append(text)
@@ -823,6 +920,9 @@ class SettingsTab(QWidget):
         self._loading_cfg = True
         try:
             self.ed_token.setText(cfg.get("telegram_token", ""))
+            self.cmb_mode.setCurrentIndex(max(0, self.cmb_mode.findData(resolve_telegram_mode(cfg))))
+            self.spin_port.setValue(int(cfg.get("telegram_port") or DEFAULT_CONFIG["telegram_port"]))
+            self.ed_tg_webhook.setText(cfg.get("telegram_webhook_url", ""))
             mode = (cfg.get("browser_cookies") or "auto").strip().lower()
             idx = 0
             for i, (_label, value) in enumerate(self._browser_combo_values):
@@ -832,21 +932,57 @@ class SettingsTab(QWidget):
             self.cmb_browser_cookies.setCurrentIndex(idx)
             self.ed_cookies.setText(cfg.get("cookies_path", ""))
             self.ed_user_agent.setText(cfg.get("user_agent", DEFAULT_CONFIG["user_agent"]))
+            self.spin_parallel.setValue(int(cfg.get("max_parallel_downloads") or DEFAULT_CONFIG["max_parallel_downloads"]))
+            self.spin_parallel_yt.setValue(int(cfg.get("max_parallel_youtube") or DEFAULT_CONFIG["max_parallel_youtube"]))
+            self.spin_parallel_tt.setValue(int(cfg.get("max_parallel_tiktok") or DEFAULT_CONFIG["max_parallel_tiktok"]))
+            self.spin_fragment_sockets.setValue(
+                int(cfg.get("max_fragment_sockets") or DEFAULT_CONFIG["max_fragment_sockets"])
+            )
+            self.spin_postprocess.setValue(
+                int(cfg.get("max_postprocess_workers") or DEFAULT_CONFIG["max_postprocess_workers"])
+            )
+            self.spin_bw_total.setValue(int(cfg.get("bandwidth_total_kib") or 0))
+            self.spin_bw_yt.setValue(int(cfg.get("bandwidth_youtube_kib") or 0))
+            self.spin_bw_tt.setValue(int(cfg.get("bandwidth_tiktok_kib") or 0))
+            self.ed_bw_schedule.setText(cfg.get("bandwidth_schedule", ""))
+            self.chk_captions.setChecked(bool(cfg.get("caption_fast_path")))
+            self.ed_caption_langs.setText(cfg.get("caption_languages", DEFAULT_CONFIG["caption_languages"]))
         finally:
             self._loading_cfg = False
+        self._update_webhook_inputs_state()
         self.refresh_merge_state()
 
     def _save_cfg(self, key: str, value: Any) -> None:
         if self._loading_cfg or not self.app_ref:
             return
         cfg = self.app_ref.app_config
-        if key == "telegram_port":
+        if key == "telegram_port" or key.startswith("max_") or key.endswith("_kib"):
             cfg[key] = int(value)
         elif key == "browser_cookies":
             cfg[key] = value or "auto"
+        elif key == "caption_fast_path":
+            cfg[key] = bool(value)
         else:
             cfg[key] = value or ""
         save_config(cfg)
+        if key.startswith("max_parallel_"):
+            get_download_slots().configure_from(cfg)
+        elif key.startswith("max_fragment_"):
+            get_fragment_controller().configure_from(cfg)
+        elif key == "max_postprocess_workers":
+            get_postprocess_pool().configure_from(cfg)
+        elif key.startswith("bandwidth_"):
+            # Appliqué aux téléchargements en cours au prochain rafraîchissement de leur part
+            get_bandwidth_governor().configure_from(cfg)
+
+    def on_telegram_mode_changed(self) -> None:
+        self._update_webhook_inputs_state()
+        self._save_cfg("telegram_mode", self.cmb_mode.currentData(Qt.UserRole) or "polling")
+
+    def _update_webhook_inputs_state(self) -> None:
+        webhook = self.cmb_mode.currentData(Qt.UserRole) == "webhook"
+        for widget in (self.lbl_port, self.spin_port, self.lbl_tg_webhook, self.ed_tg_webhook):
+            widget.setEnabled(webhook)
 
     def on_browser_choice_changed(self) -> None:
         mode = self.cmb_browser_cookies.currentData(Qt.UserRole) or "auto"
@@ -1088,12 +1224,16 @@ class Main(QWidget):
         self.youtube_tab.sig_audio_completed.connect(self.on_audio_ready_from_youtube)
         self.tiktok_tab.sig_request_transcription.connect(self.on_transcription_request)
         self.tiktok_tab.sig_audio_completed.connect(self.on_audio_ready_from_youtube)
+        self.youtube_tab.sig_transcription_ready.connect(self.on_transcription_ready_for_telegram)
+        self.tiktok_tab.sig_transcription_ready.connect(self.on_transcription_ready_for_telegram)
         self.transcription_tab.sig_url_changed.connect(self.on_transcription_url_changed)
 
         self.settings_tab.btn_tg_start.clicked.connect(self.start_telegram)
         self.settings_tab.btn_tg_stop.clicked.connect(self.stop_telegram)
 
         start_notification_server(self)
+        # Réconciliation incrémentale du catalogue média (dossiers modifiés uniquement)
+        threading.Thread(target=get_media_catalog().reconcile, name="media-catalog", daemon=True).start()
 
     def on_cloudflare_public_url(self, base: str) -> None:
         path = self.app_config.get("webhook_path") or "/webhook/Audio"
@@ -1130,7 +1270,7 @@ class Main(QWidget):
         save_config(self.app_config)
 
     def _effective_telegram_mode(self) -> str:
-        return "polling"
+        return resolve_telegram_mode(self.app_config)
 
     def start_telegram(self) -> None:
         token = (self.app_config.get("telegram_token") or "").strip()
@@ -1175,20 +1315,19 @@ class Main(QWidget):
         if self.settings_tab:
             self.settings_tab.append_telegram_info(text)
 
-    def on_tg_download_requested(self, url: str, fmt: str, chat_id: int | str, title: str) -> None:
+    def on_tg_download_requested(
+        self, url: str, fmt: str, chat_id: int | str, title: str, job_type: str, sections: str
+    ) -> None:
         try:
             chat_ref: int | str = int(chat_id)
         except (TypeError, ValueError):
             chat_ref = chat_id
-        item = self.youtube_tab.append_task(url)
-        task: Task = item.data(Qt.UserRole)
-        task.selected_fmt = fmt
-        task.source = "telegram"
-        task.chat_id = chat_ref
+        self.youtube_tab.append_task(
+            url, selected_fmt=fmt, source="telegram", chat_id=chat_ref, job_type=job_type, sections=sections or None
+        )
         self.youtube_tab.statusBar(f"Téléchargement demandé par Telegram — {title}")
+        # Le suivi (file, progression, fin) passe par le message de progression du chat
         self.youtube_tab.start_queue()
-        if self.telegram_worker:
-            self.telegram_worker.send_message(chat_ref, "Téléchargement lancé…")
 
     def on_audio_ready_from_youtube(self, chat_id: int | str, audio_path: str) -> None:
         if not self.telegram_worker:
@@ -1197,10 +1336,22 @@ class Main(QWidget):
             chat_ref: int | str = int(chat_id)
         except (TypeError, ValueError):
             chat_ref = chat_id
-        name = os.path.basename(audio_path) or audio_path
-        self.telegram_worker.send_message(chat_ref, f"Téléchargement terminé ✅\n{name}")
         self.telegram_worker.ask_transcription(chat_ref, audio_path)
 
+    def on_transcription_ready_for_telegram(self, chat_id: int | str, audio_path: str) -> None:
+        if not self.telegram_worker:
+            return
+        try:
+            chat_ref: int | str = int(chat_id)
+        except (TypeError, ValueError):
+            chat_ref = chat_id
+        if is_transcript_file(audio_path):
+            self.telegram_worker.send_transcript(chat_ref, audio_path)
+            return
+        name = os.path.basename(audio_path) or audio_path
+        self.telegram_worker.send_message(chat_ref, f"Audio prêt ✅\n{name}\nEnvoi en transcription…")
+        self.telegram_worker.transcribe_now(chat_ref, audio_path)
+
     def closeEvent(self, event) -> None:
         try:
             self.stop_telegram()
@@ -14,6 +14,13 @@ import sys
 from pathlib import Path
 from typing import Iterable, Sequence
 
+from core.audio_engine import (
+    MP3_COPY_CODECS,
+    TRANSCRIPTION_COPY_CODECS,
+    AudioEngineError,
+    AudioResult,
+    extract_audio,
+)
 from core.download_core import sanitize_filename
 from paths import get_audio_dir
 
@@ -35,8 +42,8 @@ DEFAULT_VIDEO_EXTS = (
 )
 
 
-class FFMpegError(RuntimeError):
-    """Erreur personnalisée renvoyée lorsque ffmpeg échoue."""
+# Alias historique : les appelants interceptent toujours ``FFMpegError``
+FFMpegError = AudioEngineError
 
 
 def ensure_output_dir(output_dir: Path | None = None) -> Path:
@@ -64,24 +71,31 @@ def is_supported_video(path: Path, allowed_exts: Iterable[str] | None = None) ->
     return path.suffix.lower() in exts
 
 
+def _output_stem(input_path: Path) -> str:
+    safe_name = sanitize_filename(input_path.stem) or "audio"
+    return safe_name.replace(":", " -").replace("|", "-")
+
+
 def build_output_path(input_path: Path, output_dir: Path | None = None) -> Path:
     """Construit le chemin de sortie MP3 pour ``input_path``."""
 
     directory = ensure_output_dir(output_dir)
-    safe_name = sanitize_filename(input_path.stem) or "audio"
-    safe_name = safe_name.replace(":", " -").replace("|", "-")
-    return directory / f"{safe_name}.mp3"
+    return directory / f"{_output_stem(input_path)}.mp3"
 
 
-def convert_to_mp3(
+def extract_audio_file(
     input_file: Path,
     *,
     bitrate: str = DEFAULT_BITRATE,
     ffmpeg_bin: str = "ffmpeg",
     output_dir: Path | None = None,
     overwrite: bool = True,
-) -> Path:
-    """Extrait l'audio d'une vidéo locale au format MP3.
+    keep_codec: bool = True,
+) -> AudioResult:
+    """Extrait l'audio d'une vidéo locale, sans réencodage quand le codec s'y prête.
+
+    Avec ``keep_codec``, une piste AAC/Opus/Vorbis/FLAC est copiée telle quelle (M4A/OGG/FLAC) ;
+    sinon seule une piste déjà en MP3 est copiée et tout le reste est réencodé en MP3.
 
     :raises FileNotFoundError: si ``input_file`` est absent.
     :raises FFMpegError: si ffmpeg renvoie un code de retour non nul.
@@ -90,27 +104,40 @@ def convert_to_mp3(
     if not input_file.exists():
         raise FileNotFoundError(f"Fichier introuvable : {input_file}")
 
-    ensure_output_dir(output_dir)
-    output_file = build_output_path(input_file, output_dir)
+    return extract_audio(
+        input_file,
+        ensure_output_dir(output_dir),
+        _output_stem(input_file),
+        copy_codecs=TRANSCRIPTION_COPY_CODECS if keep_codec else MP3_COPY_CODECS,
+        bitrate=bitrate,
+        ffmpeg_bin=ffmpeg_bin,
+        overwrite=overwrite,
+    )
+
 
-    cmd = [
-        ffmpeg_bin,
-        "-y" if overwrite else "-n",
-        "-i",
-        str(input_file),
-        "-vn",
-        "-acodec",
-        "libmp3lame",
-        "-b:a",
-        bitrate,
-        str(output_file),
-    ]
+def convert_to_mp3(
+    input_file: Path,
+    *,
+    bitrate: str = DEFAULT_BITRATE,
+    ffmpeg_bin: str = "ffmpeg",
+    output_dir: Path | None = None,
+    overwrite: bool = True,
+) -> Path:
+    """Extrait l'audio d'une vidéo locale au format MP3 (copie directe si la piste l'est déjà).
 
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.returncode != 0:
-        raise FFMpegError(f"Échec ffmpeg.\n\n--- STDERR ---\n{proc.stderr}")
+    :raises FileNotFoundError: si ``input_file`` est absent.
+    :raises FFMpegError: si ffmpeg renvoie un code de retour non nul.
+    """
 
-    return output_file
+    result = extract_audio_file(
+        input_file,
+        bitrate=bitrate,
+        ffmpeg_bin=ffmpeg_bin,
+        output_dir=output_dir,
+        overwrite=overwrite,
+        keep_codec=False,
+    )
+    return result.path
 
 
 def _load_tk() -> tuple[object, object, object]:  # pragma: no cover - interface graphique optionnelle
@@ -220,6 +247,11 @@ def main_cli(argv: Sequence[str] | None = None) -> int:
     parser.add_argument("video", nargs="?", help="Chemin vers la vidéo à convertir")
     parser.add_argument("--bitrate", default=DEFAULT_BITRATE, help="Débit audio cible (ex: 128k, 192k)")
     parser.add_argument("--no-overwrite", action="store_true", help="Ne pas écraser les fichiers existants")
+    parser.add_argument(
+        "--keep-codec",
+        action="store_true",
+        help="Copier la piste sans réencodage si son codec est accepté (AAC, Opus, FLAC…)",
+    )
     parser.add_argument(
         "--output-dir",
         type=Path,
@@ -244,12 +276,13 @@ def main_cli(argv: Sequence[str] | None = None) -> int:
         return 1
 
     try:
-        out = convert_to_mp3(
+        result = extract_audio_file(
             Path(args.video),
             bitrate=args.bitrate,
             ffmpeg_bin=args.ffmpeg,
             output_dir=args.output_dir,
             overwrite=not args.no_overwrite,
+            keep_codec=args.keep_codec,
         )
     except FileNotFoundError as exc:
         print(f"Erreur : {exc}", file=sys.stderr)
@@ -258,7 +291,7 @@ def main_cli(argv: Sequence[str] | None = None) -> int:
         print(f"Erreur : {exc}", file=sys.stderr)
         return 1
 
-    print(f"OK : {out}")
+    print(f"OK : {result.path} ({result.describe()}, {result.elapsed:.1f} s)")
     return 0
 
 
@@ -8,9 +8,10 @@ import re
 from datetime import datetime
 from typing import Dict, Optional
 
-from yt_dlp import YoutubeDL
-
-from core.download_core import Task, move_final_outputs, normalize_url
+from core.download_core import JOB_TRANSCRIPTION, TRANSCRIPTION_FORMAT, Task, move_final_outputs, normalize_url
+from core.range_download import RangeYoutubeDL
+from core.rate_limit import ProbeTicket, call_limited
+from core.sections import apply_sections
 from paths import DOWNLOAD_ARCHIVE_TT, get_audio_dir, get_video_dir
 
 TIKTOK_REGEX = re.compile(
@@ -45,10 +46,16 @@ def _prepare_common_opts(outtmpl: str, *, fmt: str) -> Dict[str, object]:
 def build_download_options(task: Task, *, format_override: Optional[str] = None) -> Dict[str, object]:
     """Construit les options yt-dlp pour une tâche TikTok."""
 
-    fmt = format_override or task.selected_fmt or _DEFAULT_VIDEO_FORMAT
     outtmpl = _timestamped_outtmpl(get_video_dir("tiktok"), "tiktok")
     get_audio_dir("tiktok")
-    return _prepare_common_opts(outtmpl, fmt=fmt)
+    if task.job_type == JOB_TRANSCRIPTION:
+        # Audio seul si TikTok en propose, sinon le plus petit flux d'où l'extraire ; hors archive
+        opts = _prepare_common_opts(outtmpl, fmt=format_override or TRANSCRIPTION_FORMAT)
+        opts.pop("download_archive", None)
+        opts.pop("merge_output_format", None)
+        return apply_sections(opts, task.sections)
+    fmt = format_override or task.selected_fmt or _DEFAULT_VIDEO_FORMAT
+    return apply_sections(_prepare_common_opts(outtmpl, fmt=fmt), task.sections)
 
 
 def _finalize_download(task: Task, info: dict, expect_audio: bool) -> pathlib.Path:
@@ -72,12 +79,13 @@ def _direct_download(url: str, opts: Dict[str, object], *, expect_audio: bool =
             if isinstance(filename, str):
                 task.filename = filename
 
+    ticket = ProbeTicket()
     hooks = list(local_opts.get("progress_hooks") or [])
-    hooks.append(_hook)
+    hooks.extend([_hook, ticket])
     local_opts["progress_hooks"] = hooks
 
-    with YoutubeDL(local_opts) as ydl:
-        info = ydl.extract_info(normalize_url(url), download=True)
+    with RangeYoutubeDL(local_opts) as ydl:
+        info = call_limited("tiktok", lambda: ydl.extract_info(normalize_url(url), download=True), ticket=ticket)
         if info and info.get("entries"):
             info = info["entries"][0]
         if not task.filename:
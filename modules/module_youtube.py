@@ -9,12 +9,18 @@ from typing import Dict, Optional
 from yt_dlp import YoutubeDL
 
 from core.download_core import (
+    JOB_TRANSCRIPTION,
+    TRANSCRIPTION_FORMAT,
     Task,
+    download_from_info,
     extract_basic_info,
     move_final_outputs,
     normalize_url,
     sanitize_filename,
 )
+from core.range_download import RangeYoutubeDL
+from core.rate_limit import ProbeTicket, call_limited
+from core.sections import apply_sections
 from paths import DOWNLOAD_ARCHIVE, get_audio_dir, get_video_dir
 
 YOUTUBE_REGEX = re.compile(
@@ -69,8 +75,13 @@ def build_download_options(
 ) -> Dict[str, object]:
     """Construit les options yt-dlp en séparant proprement les cas vidéo vs audio."""
 
+    transcription = task.job_type == JOB_TRANSCRIPTION
     default_fmt = _DEFAULT_AUDIO_FORMAT if audio_only else _DEFAULT_VIDEO_FORMAT
-    fmt = format_override or task.selected_fmt or default_fmt
+    if transcription:
+        # Le format vidéo éventuellement choisi à l'inspection ne s'applique pas
+        fmt = format_override or TRANSCRIPTION_FORMAT
+    else:
+        fmt = format_override or task.selected_fmt or default_fmt
     outtmpl = _base_outtmpl("youtube")
 
     # S'assure que les dossiers existent (notamment pour la branche audio)
@@ -90,7 +101,10 @@ def build_download_options(
         "overwrites": False,
     }
 
-    if audio_only:
+    if transcription:
+        # Piste conservée telle quelle (remuxée après coup) ; hors archive, réservée aux vidéos
+        opts.pop("download_archive", None)
+    elif audio_only:
         # Extraction audio uniquement (pas de merge_output_format ici)
         opts["postprocessors"] = [
             {"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"},
@@ -99,7 +113,7 @@ def build_download_options(
     # Vidéo : laisser yt-dlp choisir le meilleur conteneur final. Si l'appelant veut forcer
     # un conteneur spécifique, il peut ajouter merge_output_format à opts avant l'exécution.
 
-    return opts
+    return apply_sections(opts, task.sections)
 
 
 def _run_direct_download(url: str, opts: Dict[str, object], *, expect_audio: bool = False) -> pathlib.Path:
@@ -108,8 +122,9 @@ def _run_direct_download(url: str, opts: Dict[str, object], *, expect_audio: boo
     captured: Dict[str, Optional[str]] = {"filename": None}
 
     default_outtmpl = str(local_opts.get("outtmpl") or "")
+    # Extraction unique : le même dict sert au titre (outtmpl) et au téléchargement
     try:
-        probe = extract_basic_info(url)
+        probe = extract_basic_info(url, use_cache=False)
     except Exception:
         probe = {}
 
@@ -128,19 +143,25 @@ def _run_direct_download(url: str, opts: Dict[str, object], *, expect_audio: boo
             if isinstance(filename, str):
                 captured["filename"] = filename
 
+    ticket = ProbeTicket()
     hooks = list(local_opts.get("progress_hooks") or [])
-    hooks.append(_hook)
+    hooks.extend([_hook, ticket])
     local_opts["progress_hooks"] = hooks
 
-    with YoutubeDL(local_opts) as ydl:
+    def _download(ydl: YoutubeDL) -> dict:
+        if isinstance(probe, dict) and probe.get("id"):
+            return call_limited("youtube", lambda: download_from_info(ydl, probe), ticket=ticket)
+        return call_limited("youtube", lambda: ydl.extract_info(normalize_url(url), download=True), ticket=ticket)
+
+    with RangeYoutubeDL(local_opts) as ydl:
         try:
-            info = ydl.extract_info(normalize_url(url), download=True)
+            info = _download(ydl)
         except Exception:
             # Fallback si on forçait MP4 : retente sans merge_output_format (laisser mkv si nécessaire)
             if local_opts.get("merge_output_format") == "mp4":
                 local_opts.pop("merge_output_format", None)
-                with YoutubeDL(local_opts) as ydl2:
-                    info = ydl2.extract_info(normalize_url(url), download=True)
+                with RangeYoutubeDL(local_opts) as ydl2:
+                    info = _download(ydl2)
             else:
                 raise
 
@@ -8,6 +8,10 @@ AUDIOS_DIR = OUT_DIR / "Audios"
 TRANSCRIPTION_DIR = OUT_DIR / "Transcription"
 DOWNLOAD_ARCHIVE = OUT_DIR / "archive.txt"
 DOWNLOAD_ARCHIVE_TT = OUT_DIR / "archive_tiktok.txt"
+INFO_CACHE_PATH = OUT_DIR / "info_cache.sqlite3"
+MEDIA_CATALOG_PATH = OUT_DIR / "media_catalog.sqlite3"
+JOB_STORE_PATH = OUT_DIR / "jobs.sqlite3"
+TELEGRAM_PENDING_PATH = OUT_DIR / "telegram_pending.sqlite3"
 
 _PLATFORM_FOLDERS = {
     "youtube": ("Videos", "Youtube"),
@@ -0,0 +1,313 @@
+"""Banc d'essai local du bot Telegram : polling contre webhook, sans réseau.
+
+Un faux serveur Bot API (getMe, getUpdates, setWebhook, sendMessage…) tourne sur 127.0.0.1 ;
+le ``TelegramWorker`` est lancé contre lui via ``telegram_api_base``. Le banc envoie des
+commandes ``/status`` (aucune extraction yt-dlp) et mesure le délai entre l'injection de la
+mise à jour et la réponse ``sendMessage`` du bot, puis le débit sur une rafale.
+
+Usage : python scripts/tg_harness.py [--mode polling|webhook|both] [--count 50] [--burst 200]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import queue
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+TOKEN = "123456:HARNESS"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Harness", "username": "harness_bot"}
+_START_TIMEOUT = 15.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeBotApi:
+    """Sous-ensemble de la Bot API suffisant pour démarrer le bot et recevoir ses réponses."""
+
+    def __init__(self):
+        self.updates: "queue.Queue[dict]" = queue.Queue()
+        self.webhook: dict = {}
+        self.webhook_set = threading.Event()
+        self.polling = threading.Event()
+        self._replies: dict = {}
+        self._replies_cv = threading.Condition()
+        self._message_id = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-bot-api", daemon=True)
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def wait_reply(self, chat_id: int, timeout: float) -> float:
+        """Horodatage de la réponse du bot dans ``chat_id``."""
+
+        deadline = time.monotonic() + timeout
+        with self._replies_cv:
+            while chat_id not in self._replies:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Pas de réponse pour le chat {chat_id}")
+                self._replies_cv.wait(remaining)
+            return self._replies.pop(chat_id)
+
+    # --- Méthodes Bot API ------------------------------------------------------------------
+
+    def _call(self, method: str, params: dict):
+        if method == "getMe":
+            return BOT_USER
+        if method == "setWebhook":
+            self.webhook = params
+            self.webhook_set.set()
+            return True
+        if method == "deleteWebhook":
+            self.webhook = {}
+            return True
+        if method == "getUpdates":
+            self.polling.set()
+            return self._get_updates(params)
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id") or 0)
+            self._message_id += 1
+            with self._replies_cv:
+                self._replies[chat_id] = time.monotonic()
+                self._replies_cv.notify_all()
+            return {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text") or "",
+            }
+        return True
+
+    def _get_updates(self, params: dict) -> list:
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        batch = []
+        try:
+            first = self.updates.get(timeout=min(timeout, 1.0)) if timeout else self.updates.get_nowait()
+        except queue.Empty:
+            return []
+        for update in [first] + self._drain():
+            if update["update_id"] >= offset:
+                batch.append(update)
+        return batch
+
+    def _drain(self) -> list:
+        items = []
+        while True:
+            try:
+                items.append(self.updates.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # En-têtes et corps partent en deux écritures : sans cela, Nagle + ACK différé ajoutent ~40 ms
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length).decode("utf-8") if length else ""
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    params = json.loads(raw or "{}")
+                else:
+                    params = {k: v[-1] for k, v in urllib.parse.parse_qs(raw).items()}
+                method = self.path.rsplit("/", 1)[-1]
+                body = json.dumps({"ok": True, "result": api._call(method, params)}).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # getUpdates interrompu à l'arrêt du bot
+
+            do_GET = do_POST
+
+            def log_message(self, *_args):
+                pass
+
+        return Handler
+
+
+def _status_update(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+            "text": "/status",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 7}],
+        },
+    }
+
+
+def _post(url: str, payload: dict, secret: str) -> int:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+class Bench:
+    def __init__(self, mode: str):
+        from PySide6.QtCore import Qt
+
+        from workers.telegram_worker import TelegramWorker
+
+        self.mode = mode
+        self.api = FakeBotApi()
+        self.port = _free_port()
+        self.config = {
+            "telegram_token": TOKEN,
+            "telegram_mode": mode,
+            "telegram_port": self.port,
+            "telegram_webhook_url": f"http://127.0.0.1:{self.port}",
+            "telegram_api_base": self.api.base,
+            "telegram_pending_persist": False,
+        }
+        self.worker = TelegramWorker(self.config)
+        # Pas de boucle Qt ici : connexion directe, le message s'affiche depuis le thread du bot
+        self.worker.sig_info.connect(lambda text: print(f"  [bot] {text}"), Qt.DirectConnection)
+        self._thread = threading.Thread(target=self.worker.run, name=f"bot-{mode}", daemon=True)
+        self._next_id = 0
+
+    def __enter__(self):
+        self.api.start()
+        self._thread.start()
+        ready = self.api.webhook_set if self.mode == "webhook" else self.api.polling
+        if not ready.wait(_START_TIMEOUT):
+            raise RuntimeError(f"Le bot n'a pas démarré en mode {self.mode}")
+        return self
+
+    def __exit__(self, *_exc):
+        self.worker.stop()
+        self._thread.join(10)
+        self.api.stop()
+
+    def inject(self, chat_id: int) -> None:
+        self._next_id += 1
+        update = _status_update(self._next_id, chat_id)
+        if self.mode == "polling":
+            self.api.updates.put(update)
+            return
+        status = _post(self.api.webhook["url"], update, self.api.webhook.get("secret_token", ""))
+        if status != 200:
+            raise RuntimeError(f"Webhook : HTTP {status}")
+
+    def check_webhook_security(self) -> None:
+        url = self.api.webhook["url"]
+        bad = _post(url, _status_update(0, 1), "mauvais-secret")
+        health_url = url.rsplit("/", 1)[0] + "/health"
+        with urllib.request.urlopen(health_url, timeout=5) as response:
+            health = json.loads(response.read().decode("utf-8"))
+        print(f"  secret invalide → HTTP {bad} ; /health → {health}")
+        if bad != 403 or not health.get("ok"):
+            raise RuntimeError("Contrôles webhook en échec")
+
+    def latency(self, count: int) -> list:
+        samples = []
+        for idx in range(count):
+            chat_id = 10_000 + idx
+            started = time.monotonic()
+            self.inject(chat_id)
+            samples.append(self.api.wait_reply(chat_id, 10) - started)
+        return samples
+
+    def throughput(self, count: int) -> float:
+        chats = [20_000 + idx for idx in range(count)]
+        started = time.monotonic()
+        for chat_id in chats:
+            self.inject(chat_id)
+        last = max(self.api.wait_reply(chat_id, 30) for chat_id in chats)
+        return count / (last - started)
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_mode(mode: str, count: int, burst: int) -> dict:
+    print(f"== {mode}")
+    with Bench(mode) as bench:
+        if mode == "webhook":
+            bench.check_webhook_security()
+        samples = bench.latency(count)
+        rate = bench.throughput(burst)
+    result = {
+        "mode": mode,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p95_ms": _percentile(samples, 95) * 1000,
+        "max_ms": max(samples) * 1000,
+        "updates_per_s": rate,
+    }
+    print(
+        f"  latence p50 {result['p50_ms']:.1f} ms • p95 {result['p95_ms']:.1f} ms • max {result['max_ms']:.1f} ms"
+        f" • débit {rate:.0f} màj/s"
+    )
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Banc polling / webhook du bot Telegram (Bot API simulée)")
+    parser.add_argument("--mode", choices=("polling", "webhook", "both"), default="both")
+    parser.add_argument("--count", type=int, default=50, help="Messages séquentiels pour la latence")
+    parser.add_argument("--burst", type=int, default=200, help="Messages en rafale pour le débit")
+    args = parser.parse_args(argv)
+
+    # Aucun fichier écrit à côté de l'application réelle
+    os.environ.setdefault("FLOWGRAB_OUT_DIR", os.path.join(tempfile.gettempdir(), "flowgrab_harness"))
+    modes = ("polling", "webhook") if args.mode == "both" else (args.mode,)
+    results = [run_mode(mode, args.count, args.burst) for mode in modes]
+    if len(results) == 2:
+        polling, webhook = results
+        print(
+            f"== webhook / polling : latence p50 ×{webhook['p50_ms'] / polling['p50_ms']:.2f}, "
+            f"débit ×{webhook['updates_per_s'] / polling['updates_per_s']:.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
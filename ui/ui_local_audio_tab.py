@@ -24,15 +24,15 @@ from modules.module_local_audio import (
     DEFAULT_BITRATE,
     DEFAULT_VIDEO_EXTS,
     OUTPUT_DIR,
-    convert_to_mp3,
     ensure_output_dir,
+    extract_audio_file,
     ffmpeg_exists,
     is_supported_video,
 )
 
 
 class AudioConvertWorker(QThread):
-    sig_done = Signal(str)
+    sig_done = Signal(str, str)
     sig_error = Signal(str)
 
     def __init__(
@@ -42,6 +42,7 @@ class AudioConvertWorker(QThread):
         output_dir: pathlib.Path,
         ffmpeg_bin: str = "ffmpeg",
         overwrite: bool = True,
+        keep_codec: bool = True,
         parent: Optional[QWidget] = None,
     ) -> None:
         super().__init__(parent)
@@ -50,20 +51,22 @@ class AudioConvertWorker(QThread):
         self.output_dir = output_dir
         self.ffmpeg_bin = ffmpeg_bin
         self.overwrite = overwrite
+        self.keep_codec = keep_codec
 
     def run(self) -> None:
         try:
-            output = convert_to_mp3(
+            result = extract_audio_file(
                 self.input_path,
                 bitrate=self.bitrate,
                 ffmpeg_bin=self.ffmpeg_bin,
                 output_dir=self.output_dir,
                 overwrite=self.overwrite,
+                keep_codec=self.keep_codec,
             )
         except Exception as exc:  # pragma: no cover - worker errors bubbled to UI
             self.sig_error.emit(str(exc))
             return
-        self.sig_done.emit(str(output))
+        self.sig_done.emit(str(result.path), f"{result.describe()}, {result.elapsed:.1f} s")
 
 
 class LocalAudioTab(QWidget):
@@ -128,6 +131,14 @@ class LocalAudioTab(QWidget):
         self.chk_overwrite = QCheckBox("Écraser si le MP3 existe déjà")
         self.chk_overwrite.setChecked(True)
         options_layout.addWidget(self.chk_overwrite)
+
+        self.chk_keep_codec = QCheckBox("Garder le codec d’origine si possible")
+        self.chk_keep_codec.setToolTip(
+            "Copie la piste AAC/Opus/FLAC sans réencodage (M4A/OGG/FLAC, quasi instantané) ; "
+            "sinon réencodage en MP3"
+        )
+        self.chk_keep_codec.setChecked(True)
+        options_layout.addWidget(self.chk_keep_codec)
         options_layout.addStretch(1)
 
         root.addWidget(options_box)
@@ -267,6 +278,7 @@ class LocalAudioTab(QWidget):
             output_dir=self._output_dir,
             ffmpeg_bin=self._ffmpeg_bin,
             overwrite=overwrite,
+            keep_codec=self.chk_keep_codec.isChecked(),
         )
         self._worker.sig_done.connect(self.on_worker_done)
         self._worker.sig_error.connect(self.on_worker_error)
@@ -281,8 +293,8 @@ class LocalAudioTab(QWidget):
         self.btn_pick.setEnabled(not busy)
         self.edit_video.setEnabled(not busy)
 
-    def on_worker_done(self, output_file: str) -> None:
-        self.lab_status.setText(f"✅ Audio exporté : {output_file}")
+    def on_worker_done(self, output_file: str, method: str) -> None:
+        self.lab_status.setText(f"✅ Audio exporté : {output_file} ({method})")
         QMessageBox.information(
             self,
             "Conversion terminée",
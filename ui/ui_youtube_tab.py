@@ -2,9 +2,9 @@ import os
 import pathlib
 import re
 import shutil
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from PySide6.QtCore import QThread, QTimer, QUrl, Qt, Signal, Slot
+from PySide6.QtCore import QTimer, QUrl, Qt, Signal, Slot
 from PySide6.QtGui import QColor, QDesktopServices, QIcon
 from PySide6.QtWidgets import (
     QApplication,
@@ -26,19 +26,25 @@ from PySide6.QtWidgets import (
 
 from config import OUT_DIR
 from core.download_core import (
+    JOB_TRANSCRIPTION,
+    JOB_VIDEO,
     Task,
-    DownloadWorker,
-    cleanup_orphans_in_outputs,
-    ensure_audio,
+    cached_basic_info,
     estimate_size,
-    extract_basic_info,
     human_eta,
     human_rate,
     human_size,
     list_video_formats,
-    move_final_outputs,
     pick_best_audio,
 )
+from core.archive_index import get_archive_index
+from core.captions import is_transcript_file
+from core.job_store import get_job_store
+from core.playlist import CollectionListing, ingest_summary, is_collection_url
+from core.rate_limit import get_rate_limiter
+from core.scheduler import get_download_slots
+from core.sections import SectionError, parse_sections
+from core.video_ids import extract_video_key
 from modules.module_tiktok import (
     TIKTOK_REGEX,
     build_download_options as build_tiktok_options,
@@ -48,22 +54,8 @@ from modules.module_youtube import (
     build_download_options as build_youtube_options,
 )
 from paths import get_video_dir
-
-
-class InspectWorker(QThread):
-    sig_done = Signal(str, dict)
-    sig_error = Signal(str, str)
-
-    def __init__(self, url: str, parent=None):
-        super().__init__(parent)
-        self.url = url
-
-    def run(self) -> None:
-        try:
-            info = extract_basic_info(self.url)
-            self.sig_done.emit(self.url, info or {})
-        except Exception as exc:
-            self.sig_error.emit(self.url, str(exc))
+from workers.download_worker import CollectionWorker, DownloadWorker, InspectWorker
+from workers.postprocess_worker import get_postprocess_pool
 
 
 def themed_icon(*names: str) -> QIcon:
@@ -89,6 +81,8 @@ def _is_list_item_valid(item: Optional[QListWidgetItem]) -> bool:
 class YoutubeTab(QWidget):
     sig_request_transcription = Signal(list)
     sig_audio_completed = Signal(object, str)
+    # Job de transcription terminé pour Telegram : envoi direct au webhook, sans question
+    sig_transcription_ready = Signal(object, str)
 
     def __init__(self, app_ref, parent=None, platform: str = "youtube"):
         super().__init__(parent)
@@ -96,15 +90,32 @@ class YoutubeTab(QWidget):
         self.app_ref = app_ref
         self.platform = (platform or "youtube").lower()
         self.queue: List[Task] = []
-        self.current_worker: Optional[DownloadWorker] = None
+        self.active_workers: Dict[int, DownloadWorker] = {}
+        self._queue_running = False
+        self._slots = get_download_slots()
+        self._slots.add_listener(self._on_slot_released)
+        self._jobs = get_job_store()
+        # Tâches téléchargées en cours de post-traitement (rangement, audio) → élément de liste
+        self._postprocessing: Dict[int, Optional[QListWidgetItem]] = {}
+        self._postprocess = get_postprocess_pool()
+        self._postprocess.sig_status.connect(self.on_postprocess_status)
+        self._postprocess.sig_done.connect(self.on_postprocess_done)
+        self._postprocess.sig_error.connect(self.on_postprocess_error)
         self.last_inspect_info: Dict[str, Any] = {}
         self.inspect_worker: Optional[InspectWorker] = None
+        self.collection_workers: List[CollectionWorker] = []
         self.inspect_seq = 0
         self.inspect_debounce = QTimer(self)
         self.inspect_debounce.setSingleShot(True)
         self.inspect_debounce.setInterval(250)
         self.inspect_debounce.timeout.connect(self._inspect_current_after_debounce)
         self.build_ui()
+        self.limiter_timer = QTimer(self)
+        self.limiter_timer.setInterval(1000)
+        self.limiter_timer.timeout.connect(self._refresh_limiter)
+        self.limiter_timer.start()
+        self._refresh_limiter()
+        self._restore_jobs()
 
     def _cursor_wait(self, on: bool) -> None:
         if on and QApplication.overrideCursor() is None:
@@ -148,6 +159,12 @@ class YoutubeTab(QWidget):
         if not icon_paste.isNull():
             btn_paste.setIcon(icon_paste)
         btn_paste.clicked.connect(self.paste_clipboard)
+        btn_transcribe = QPushButton("Audio → transcription")
+        btn_transcribe.setToolTip("Télécharge seulement la plus petite piste audio exploitable puis l’envoie en transcription")
+        icon_transcribe = themed_icon("audio-x-generic", "media-record")
+        if not icon_transcribe.isNull():
+            btn_transcribe.setIcon(icon_transcribe)
+        btn_transcribe.clicked.connect(self.add_transcription_url)
         btn_file = QPushButton("Depuis .txt")
         icon_file = themed_icon("document-open", "text-x-generic")
         if not icon_file.isNull():
@@ -158,8 +175,17 @@ class YoutubeTab(QWidget):
         if not icon_clear.isNull():
             btn_clear_urls.setIcon(icon_clear)
         btn_clear_urls.clicked.connect(self.clear_url_list)
+        self.edit_sections = QLineEdit()
+        self.edit_sections.setPlaceholderText("Extrait (optionnel) : 1:30-3:30, #2, Intro")
+        self.edit_sections.setToolTip(
+            "Ne télécharge que ces plages horaires et/ou chapitres (#numéro ou texte du titre), "
+            "coupés à l’image près"
+        )
+        self.edit_sections.returnPressed.connect(self.add_url)
         add_line.addWidget(self.edit_url, 1)
+        add_line.addWidget(self.edit_sections)
         add_line.addWidget(btn_add)
+        add_line.addWidget(btn_transcribe)
         add_line.addWidget(btn_paste)
         add_line.addWidget(btn_file)
         add_line.addWidget(btn_clear_urls)
@@ -227,10 +253,12 @@ class YoutubeTab(QWidget):
         self.lab_speed = QLabel("Vitesse : —")
         self.lab_size = QLabel("Taille : —")
         self.lab_eta = QLabel("ETA : —")
+        self.lab_limiter = QLabel("Requêtes : —")
         stat_line.addWidget(self.lab_name, 3)
         stat_line.addWidget(self.lab_speed, 1)
         stat_line.addWidget(self.lab_size, 1)
         stat_line.addWidget(self.lab_eta, 1)
+        stat_line.addWidget(self.lab_limiter, 1)
         root.addLayout(stat_line)
 
         self.bar = QProgressBar()
@@ -251,17 +279,70 @@ class YoutubeTab(QWidget):
         self._open_dir(target)
 
     def clear_url_list(self) -> None:
+        running = {id(worker.task) for worker in self.active_workers.values()} | set(self._postprocessing)
+        for task in self.queue:
+            if id(task) not in running:
+                self._jobs.remove(task)
+                if task.status == "En attente":
+                    self._telegram_progress(task, "🗑️ retiré de la file", final=True)
         self.queue.clear()
         self.list.clear()
 
-    def append_task(self, url: str) -> QListWidgetItem:
-        task = Task(url=url, platform=self.platform)
+    def append_task(
+        self,
+        url: str,
+        *,
+        selected_fmt: Optional[str] = None,
+        source: str = "ui",
+        chat_id: Optional[int] = None,
+        job_type: str = JOB_VIDEO,
+        sections: Optional[str] = None,
+    ) -> QListWidgetItem:
+        task = Task(
+            url=url,
+            platform=self.platform,
+            selected_fmt=selected_fmt,
+            source=source,
+            chat_id=chat_id,
+            job_type=job_type,
+            sections=sections or None,
+        )
+        self._jobs.add(task)
+        self._telegram_progress(task, "⏳ en file d’attente")
+        return self._add_task_item(task)
+
+    def _telegram_progress(self, task: Task, state: str, *, final: bool = False) -> None:
+        """Ligne de la tâche dans le message de progression Telegram du chat (modifié sur place)."""
+
+        if task.source != "telegram" or not task.chat_id:
+            return
+        worker = getattr(self.window(), "telegram_worker", None)
+        if worker:
+            name = pathlib.Path(task.filename).name if task.filename else task.url
+            worker.report_progress(task.chat_id, id(task), f"{name}\n   {state}", final=final)
+
+    def _add_task_item(self, task: Task) -> QListWidgetItem:
         self.queue.append(task)
-        item = QListWidgetItem(f"[En attente] {url}")
+        item = QListWidgetItem(f"[{task.status}] {task.url}")
         item.setData(Qt.UserRole, task)
+        hints = []
+        if task.job_type == JOB_TRANSCRIPTION:
+            hints.append("Audio seul pour transcription")
+        if task.sections:
+            hints.append(f"Extrait : {task.sections}")
+        item.setToolTip("\n".join(hints))
         self.list.addItem(item)
         return item
 
+    def _restore_jobs(self) -> None:
+        """Recharge la file persistée (tâches non terminées du précédent lancement)."""
+
+        restored = self._jobs.restore(self.platform)
+        for task in restored:
+            self._add_task_item(task)
+        if restored:
+            self.statusBar(f"{len(restored)} tâche(s) restaurée(s) dans la file {self.platform}")
+
     def find_item_for_task(self, task: Task) -> Optional[QListWidgetItem]:
         for idx in range(self.list.count()):
             candidate = self.list.item(idx)
@@ -274,20 +355,106 @@ class YoutubeTab(QWidget):
             return item
         return self.find_item_for_task(task)
 
+    @staticmethod
+    def _identity(url: str, sections: Optional[str] = None) -> tuple:
+        # Deux extraits différents d'une même vidéo sont deux tâches distinctes
+        return (extract_video_key(url) or url, sections or "")
+
+    def _queued_identities(self) -> set:
+        identities = set()
+        for i in range(self.list.count()):
+            exist_task: Task = self.list.item(i).data(Qt.UserRole)
+            if exist_task:
+                identities.add(self._identity(exist_task.url, exist_task.sections))
+        return identities
+
+    def _rejection_reason(
+        self,
+        url: str,
+        queued: Optional[set] = None,
+        *,
+        job_type: str = JOB_VIDEO,
+        sections: Optional[str] = None,
+    ) -> Optional[str]:
+        """Refus immédiat (hors ligne) des doublons de la file et des éléments archivés.
+
+        Une vidéo archivée reste acceptée en transcription (son audio sera repris localement)
+        ou pour un extrait.
+        """
+
+        key = extract_video_key(url)
+        identities = self._queued_identities() if queued is None else queued
+        if self._identity(url, sections) in identities:
+            return "Cette URL est déjà dans la liste."
+        if job_type == JOB_VIDEO and not sections and key and get_archive_index().contains(*key):
+            return "Cette vidéo a déjà été téléchargée (archive)."
+        return None
+
+    def _input_sections(self) -> Tuple[bool, Optional[str]]:
+        """Extrait saisi à côté de l'URL : (valide, spécification ou ``None``)."""
+
+        text = self.edit_sections.text().strip()
+        if not text:
+            return True, None
+        try:
+            parse_sections(text)
+        except SectionError as exc:
+            QMessageBox.warning(self, "Extrait invalide", str(exc))
+            return False, None
+        return True, text
+
     def add_url(self) -> None:
         url = self.edit_url.text().strip()
         if not url:
             return
-        for i in range(self.list.count()):
-            exist_task: Task = self.list.item(i).data(Qt.UserRole)
-            if exist_task and exist_task.url == url:
-                QMessageBox.information(self, "Déjà présent", "Cette URL est déjà dans la liste.")
-                self.edit_url.clear()
-                return
-        item = self.append_task(url)
+        if is_collection_url(url):
+            self.ingest_collection(url)
+            self.edit_url.clear()
+            self.edit_sections.clear()
+            return
+        valid, sections = self._input_sections()
+        if not valid:
+            return
+        reason = self._rejection_reason(url, sections=sections)
+        if reason:
+            QMessageBox.information(self, "Déjà présent", reason)
+            self.edit_url.clear()
+            self.edit_sections.clear()
+            return
+        item = self.append_task(url, sections=sections)
         self.list.setCurrentItem(item)
         self.inspect_task_async(item)
         self.edit_url.clear()
+        self.edit_sections.clear()
+
+    def _single_video_url(self, text: str) -> Optional[str]:
+        return text
+
+    def add_transcription_url(self) -> None:
+        url = self.edit_url.text().strip()
+        if not url:
+            return
+        if is_collection_url(url):
+            QMessageBox.information(self, "Transcription", "Ajoute une vidéo seule pour la transcription.")
+            return
+        url = self._single_video_url(url)
+        if not url:
+            QMessageBox.information(self, "URL invalide", "Cette URL n’est pas reconnue pour cet onglet.")
+            return
+        valid, sections = self._input_sections()
+        if not valid:
+            return
+        reason = self._rejection_reason(url, job_type=JOB_TRANSCRIPTION, sections=sections)
+        if reason:
+            QMessageBox.information(self, "Déjà présent", reason)
+            self.edit_url.clear()
+            self.edit_sections.clear()
+            return
+        item = self.append_task(url, job_type=JOB_TRANSCRIPTION, sections=sections)
+        self.list.setCurrentItem(item)
+        self.edit_url.clear()
+        self.edit_sections.clear()
+        self.statusBar("Ajouté en audio seul pour transcription")
 
     def paste_clipboard(self) -> None:
         cb = QApplication.clipboard()
@@ -300,25 +467,28 @@ class YoutubeTab(QWidget):
         if match:
             self.edit_url.setText(match.group(1))
             self.add_url()
+        elif is_collection_url(text):
+            self.edit_url.setText(text)
+            self.add_url()
 
     def add_from_file(self) -> None:
         path, _ = QFileDialog.getOpenFileName(self, "Fichier .txt", "", "Text (*.txt)")
         if not path:
             return
         new_items: List[QListWidgetItem] = []
+        skipped = 0
+        queued = self._queued_identities()
         for line in pathlib.Path(path).read_text(encoding="utf-8").splitlines():
             url = line.strip()
             if not url:
                 continue
-            exists = False
-            for i in range(self.list.count()):
-                exist_task: Task = self.list.item(i).data(Qt.UserRole)
-                if exist_task and exist_task.url == url:
-                    exists = True
-                    break
-            if exists:
+            if self._rejection_reason(url, queued):
+                skipped += 1
                 continue
             new_items.append(self.append_task(url))
+            queued.add(self._identity(url))
+        if skipped:
+            self.statusBar(f"{len(new_items)} URL(s) ajoutée(s), {skipped} doublon(s) ou déjà archivée(s) ignorée(s)")
         if new_items:
             item = new_items[0]
             self.list.setCurrentItem(item)
@@ -355,11 +525,52 @@ class YoutubeTab(QWidget):
                 self.add_url()
         event.acceptProposedAction()
 
+    def ingest_collection(self, url: str) -> None:
+        """Liste une playlist/chaîne en arrière-plan puis ajoute les éléments nouveaux."""
+
+        self.statusBar("Lecture de la playlist/chaîne…")
+        worker = CollectionWorker(url, self)
+        worker.sig_status.connect(self.statusBar)
+        worker.sig_done.connect(self.on_collection_listed)
+        worker.sig_error.connect(self.on_collection_error)
+        worker.finished.connect(lambda w=worker: self._forget_collection_worker(w))
+        self.collection_workers.append(worker)
+        worker.start()
+
+    def _forget_collection_worker(self, worker: CollectionWorker) -> None:
+        if worker in self.collection_workers:
+            self.collection_workers.remove(worker)
+
+    def on_collection_listed(self, _url: str, listing: CollectionListing) -> None:
+        queued = self._queued_identities()
+        added = 0
+        first: Optional[QListWidgetItem] = None
+        for entry in listing.entries:
+            if entry.platform != self.platform or self._rejection_reason(entry.url, queued):
+                listing.duplicates += 1
+                continue
+            item = self.append_task(entry.url)
+            if entry.title:
+                item.setToolTip(entry.title)
+            queued.add(self._identity(entry.url))
+            first = first or item
+            added += 1
+        self.statusBar(ingest_summary(listing, added))
+        if first is not None and self.list.currentItem() is None:
+            self.list.setCurrentItem(first)
+
+    def on_collection_error(self, url: str, msg: str) -> None:
+        QMessageBox.warning(self, "Playlist", f"Impossible de lister {url} :\n{msg}")
+
     def delete_selected(self) -> None:
         for it in self.list.selectedItems():
             task: Task = it.data(Qt.UserRole)
             if task in self.queue:
                 self.queue.remove(task)
+            if task and id(task) not in self.active_workers and id(task) not in self._postprocessing:
+                self._jobs.remove(task)
+                if task.status == "En attente":
+                    self._telegram_progress(task, "🗑️ retiré de la file", final=True)
             self.list.takeItem(self.list.row(it))
 
     def on_current_item_changed(self, current: QListWidgetItem, _previous: QListWidgetItem) -> None:
@@ -477,6 +688,11 @@ class YoutubeTab(QWidget):
         aid = aid_item.text().strip() if aid_item else ""
         chosen = f"{vid}+{aid}" if aid else vid
         task.selected_fmt = chosen
+        if task.job_type == JOB_TRANSCRIPTION:
+            # Choisir un format vidéo repasse la tâche en téléchargement vidéo classique
+            task.job_type = JOB_VIDEO
+            item.setToolTip("")
+        self._jobs.save(task)
 
         for r in range(self.tbl.rowCount()):
             dot_item = self.tbl.item(r, 0)
@@ -504,10 +720,6 @@ class YoutubeTab(QWidget):
         if self.list.count() == 0 and self.edit_url.text().strip():
             self.add_url()
 
-        if self.current_worker and self.current_worker.isRunning():
-            QMessageBox.information(self, "Déjà en cours", "Un téléchargement est déjà en cours.")
-            return
-
         if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
             QMessageBox.warning(
                 self,
@@ -516,36 +728,128 @@ class YoutubeTab(QWidget):
             )
             return
 
-        next_task = None
+        # Un redémarrage manuel de la file remet les tâches en erreur en attente
         for i in range(self.list.count()):
             it = self.list.item(i)
             task: Task = it.data(Qt.UserRole)
-            if task.status in ("En attente", "Erreur"):
-                next_task = (i, it, task)
-                break
-        if not next_task:
-            QMessageBox.information(self, "Info", "Aucune tâche en attente.")
+            if task and task.status == "Erreur":
+                self._jobs.transition(task, "En attente")
+                it.setText(f"[En attente] {task.url}")
+
+        if not self._has_pending_tasks():
+            if not self.active_workers:
+                QMessageBox.information(self, "Info", "Aucune tâche en attente.")
             return
 
-        _, item, task = next_task
-        task.status = "En cours"
+        self._queue_running = True
+        if not self._pump_queue() and not self.active_workers:
+            self.statusBar("File en attente d’un créneau de téléchargement libre…")
+
+    def _has_pending_tasks(self) -> bool:
+        for i in range(self.list.count()):
+            task: Task = self.list.item(i).data(Qt.UserRole)
+            if task and task.status == "En attente":
+                return True
+        return False
+
+    def _on_slot_released(self) -> None:
+        QTimer.singleShot(0, self._pump_queue)
+
+    def _pump_queue(self) -> int:
+        if not self._queue_running:
+            return 0
+        started = 0
+        for i in range(self.list.count()):
+            it = self.list.item(i)
+            task: Task = it.data(Qt.UserRole)
+            if not task or task.status != "En attente":
+                continue
+            if not self._slots.try_acquire(self.platform):
+                break
+            self._launch_task(it, task)
+            started += 1
+        if not started and not self.active_workers and not self._has_pending_tasks():
+            self._queue_running = False
+        return started
+
+    def _launch_task(self, item: QListWidgetItem, task: Task) -> None:
         safe_item = self._ensure_task_item(item, task)
+        if not self._jobs.transition(task, "En cours", from_statuses=("En attente",)):
+            # Ligne supprimée ou déjà prise en charge ailleurs : on ne relance pas
+            task.status = "Erreur"
+            self._slots.release(self.platform)
+            if _is_list_item_valid(safe_item):
+                safe_item.setText(f"[Erreur] {task.url}")
+            return
         if _is_list_item_valid(safe_item):
             safe_item.setText(f"[En cours] {task.url}")
 
-        opts = self.build_opts(task)
-        self.current_worker = DownloadWorker(task, opts, self)
-        self.current_worker.sig_progress.connect(
+        try:
+            opts = self.build_opts(task)
+        except Exception as exc:
+            self.on_done(safe_item, task, False, str(exc), {})
+            return
+        # Même gabarit qu'au premier lancement : yt-dlp reprend les .part (continuedl)
+        if task.outtmpl:
+            opts["outtmpl"] = task.outtmpl
+        elif isinstance(opts.get("outtmpl"), str):
+            task.outtmpl = opts["outtmpl"]
+            self._jobs.save(task)
+        opts["continuedl"] = True
+
+        # Réutilise le dict de l'inspection (cache disque) : une seule extraction par tâche
+        worker = DownloadWorker(task, opts, self, info=cached_basic_info(task.url))
+        worker.sig_progress.connect(
             lambda d, tot, sp, eta, fn: self.on_progress(safe_item, task, d, tot, sp, eta, fn)
         )
-        self.current_worker.sig_status.connect(self.statusBar)
-        self.current_worker.sig_done.connect(lambda ok, msg, info: self.on_done(safe_item, task, ok, msg, info))
-        self.btn_start.setEnabled(False)
-        self.current_worker.start()
+        worker.sig_status.connect(self.statusBar)
+        worker.sig_done.connect(lambda ok, msg, info: self.on_done(safe_item, task, ok, msg, info))
+        self.active_workers[id(task)] = worker
+        worker.start()
+        self._refresh_overview()
 
     def stop_current(self) -> None:
-        if self.current_worker and self.current_worker.isRunning():
-            self.current_worker.stop()
+        selected = {id(it.data(Qt.UserRole)) for it in self.list.selectedItems() if it.data(Qt.UserRole)}
+        targets = [key for key in self.active_workers if key in selected] or list(self.active_workers)
+        for key in targets:
+            worker = self.active_workers.get(key)
+            if worker and worker.isRunning():
+                worker.stop()
+
+    def _refresh_overview(self) -> None:
+        tasks = [worker.task for worker in self.active_workers.values()]
+        if not tasks:
+            self.bar.setValue(0)
+            self.lab_name.setText("Fichier : —")
+            self.lab_speed.setText("Vitesse : —")
+            self.lab_size.setText("Taille : —")
+            self.lab_eta.setText("ETA : —")
+            return
+
+        downloaded = sum(t.downloaded for t in tasks)
+        total = sum(t.total for t in tasks)
+        speed = sum(t.speed for t in tasks)
+        eta = max((t.eta or 0) for t in tasks)
+        pct = int(downloaded * 100 / total) if total else 0
+        self.bar.setValue(min(pct, 100))
+        if len(tasks) == 1:
+            name = pathlib.Path(tasks[0].filename).name if tasks[0].filename else "—"
+            self.lab_name.setText(f"Fichier : {name}")
+        else:
+            capacity = self._slots.capacity(self.platform)
+            self.lab_name.setText(f"Téléchargements actifs : {len(tasks)}/{capacity}")
+        self.lab_speed.setText(f"Vitesse : {human_rate(speed)}")
+        self.lab_size.setText(f"Taille : {human_size(downloaded)} / {human_size(total)}")
+        self.lab_eta.setText(f"ETA : {human_eta(eta)}")
+
+    def _refresh_limiter(self) -> None:
+        limiter = get_rate_limiter()
+        snap = limiter.for_platform(self.platform).snapshot()
+        self.lab_limiter.setText(limiter.describe(self.platform))
+        self.lab_limiter.setToolTip(
+            f"429 reçus : {snap['throttled_total']} • déclenchements : {snap['trips']} "
+            f"• débit : {snap['rate']:.2f} req/s (rafale {snap['burst']})"
+        )
 
     @Slot()
     def on_progress(
@@ -559,91 +863,104 @@ class YoutubeTab(QWidget):
         filename: str,
     ) -> None:
         task.downloaded, task.total, task.speed, task.eta = downloaded, total, speed, eta
-        if filename:
+        if filename and filename != task.filename:
             task.filename = filename
+            self._jobs.update_filename(task)
         pct = int(downloaded * 100 / total) if total else 0
-        self.bar.setValue(pct)
-        name = pathlib.Path(task.filename).name if task.filename else "—"
-        self.lab_name.setText(f"Fichier : {name}")
-        self.lab_speed.setText(f"Vitesse : {human_rate(speed)}")
-        self.lab_size.setText(f"Taille : {human_size(downloaded)} / {human_size(total)}")
-        self.lab_eta.setText(f"ETA : {human_eta(eta)}")
         safe_item = self._ensure_task_item(item, task)
         if _is_list_item_valid(safe_item):
-            safe_item.setText(f"[{pct:>3}%] {task.url}")
+            safe_item.setText(f"[{pct:>3}%] {task.url} — {human_rate(speed)} — ETA {human_eta(eta)}")
+            if task.filename:
+                safe_item.setToolTip(pathlib.Path(task.filename).name)
+        self._refresh_overview()
+        # Appel à chaque bloc : le bot ne garde que le dernier état et l'envoie à son rythme
+        self._telegram_progress(
+            task,
+            f"⬇️ {pct}% • {human_size(downloaded)} / {human_size(total)} • {human_rate(speed)} • ETA {human_eta(eta)}",
+        )
 
     @Slot()
     def on_done(self, item: QListWidgetItem, task: Task, ok: bool, msg: str, info: dict) -> None:
+        self.active_workers.pop(id(task), None)
+        # Libère le créneau tout de suite : les onglets en attente (celui-ci compris)
+        # relancent leur file sans attendre la fin des dialogues ci-dessous.
+        self._slots.release(self.platform)
+        self._refresh_overview()
+
         safe_item = self._ensure_task_item(item, task)
         if ok:
-            task.status = "Terminé"
+            # Rangement, nettoyage et extraction audio partent dans le pool de post-traitement :
+            # le téléchargement suivant démarre sans attendre ffmpeg.
             if _is_list_item_valid(safe_item):
-                safe_item.setText(f"[Terminé] {task.url}")
-            self.statusBar(f"Terminé : {msg}")
-            task.video_id = (info or {}).get("id")
-            moved = move_final_outputs(task)
-            self.cleanup_residuals(task)
-            cleanup_orphans_in_outputs(task)
-            audio_path = moved.get("audio") or task.final_audio_path
-            if not audio_path:
-                audio_path = ensure_audio(task)
-                if audio_path:
-                    self.statusBar("Audio généré depuis la vidéo pour transcription")
-            if task.source == "telegram" and task.chat_id and audio_path:
-                self.sig_audio_completed.emit(task.chat_id, audio_path)
-            elif audio_path:
-                reply = QMessageBox.question(
-                    self,
-                    "Transcription",
-                    "Voulez-vous transcrire l’audio téléchargé ?",
-                    QMessageBox.Yes | QMessageBox.No,
-                )
-                if reply == QMessageBox.Yes:
-                    self.sig_request_transcription.emit([audio_path])
+                safe_item.setText(f"[Finalisation] {task.url}")
+            self.statusBar(f"Téléchargé : {msg} — post-traitement…")
+            self._telegram_progress(task, "⚙️ finalisation…")
+            self._postprocessing[id(task)] = safe_item
+            self._postprocess.submit(task, info)
         else:
-            task.status = "Erreur"
+            self._jobs.transition(task, "Erreur", error=msg)
             if _is_list_item_valid(safe_item):
                 safe_item.setText(f"[Erreur] {task.url}")
-            if task.source == "telegram" and task.chat_id:
-                main = self.window()
-                worker = getattr(main, "telegram_worker", None)
-                if worker:
-                    worker.send_message(task.chat_id, f"Échec du téléchargement : {msg}")
-            else:
-                QMessageBox.warning(self, "Erreur", f"Échec du téléchargement :\n{msg}")
-        self.bar.setValue(0)
-        self.current_worker = None
-        self.btn_start.setEnabled(True)
-        QTimer.singleShot(200, self.start_queue)
+            self._notify_failure(task, "Échec du téléchargement", msg)
 
-    def statusBar(self, text: str) -> None:
-        window = self.window()
-        if window:
-            window.setWindowTitle(f"FlowGrab — {text}")
+    def _notify_failure(self, task: Task, title: str, msg: str) -> None:
+        if task.source == "telegram" and task.chat_id:
+            self._telegram_progress(task, f"❌ {title} : {msg}", final=True)
+        else:
+            QMessageBox.warning(self, "Erreur", f"{title} :\n{msg}")
 
-    def cleanup_residuals(self, task: Task) -> None:
-        if not task.video_id or not task.filename:
+    @Slot(object, str)
+    def on_postprocess_status(self, task: Task, text: str) -> None:
+        if id(task) in self._postprocessing:
+            self.statusBar(text)
+
+    @Slot(object, object)
+    def on_postprocess_done(self, task: Task, audio_path: Optional[str]) -> None:
+        if id(task) not in self._postprocessing:
             return
+        safe_item = self._ensure_task_item(self._postprocessing.pop(id(task)), task)
+        self._jobs.transition(task, "Terminé")
+        if _is_list_item_valid(safe_item):
+            safe_item.setText(f"[Terminé] {task.url}")
+        if audio_path or task.job_type != JOB_TRANSCRIPTION:
+            self._telegram_progress(task, "✅ terminé", final=True)
+        self.statusBar(f"Terminé : {task.final_video_path or audio_path or task.filename or task.url}")
+        if task.job_type == JOB_TRANSCRIPTION:
+            if not audio_path:
+                self._notify_failure(task, "Échec de la transcription", "aucun audio exploitable")
+            elif task.source == "telegram" and task.chat_id:
+                self.sig_transcription_ready.emit(task.chat_id, audio_path)
+            elif is_transcript_file(audio_path):
+                # Sous-titres publiés : la transcription est déjà là, rien à envoyer au webhook
+                QMessageBox.information(self, "Transcription", f"Transcription tirée des sous-titres :\n{audio_path}")
+            else:
+                self.sig_request_transcription.emit([audio_path])
+        elif task.source == "telegram" and task.chat_id and audio_path:
+            self.sig_audio_completed.emit(task.chat_id, audio_path)
+        elif audio_path:
+            reply = QMessageBox.question(
+                self,
+                "Transcription",
+                "Voulez-vous transcrire l’audio téléchargé ?",
+                QMessageBox.Yes | QMessageBox.No,
+            )
+            if reply == QMessageBox.Yes:
+                self.sig_request_transcription.emit([audio_path])
 
-        subdir = pathlib.Path(task.filename).parent
-        if not subdir.exists():
+    @Slot(object, str)
+    def on_postprocess_error(self, task: Task, msg: str) -> None:
+        if id(task) not in self._postprocessing:
             return
+        safe_item = self._ensure_task_item(self._postprocessing.pop(id(task)), task)
+        self._jobs.transition(task, "Erreur", error=msg)
+        if _is_list_item_valid(safe_item):
+            safe_item.setText(f"[Erreur] {task.url}")
+        self._notify_failure(task, "Échec du post-traitement", msg)
 
-        token = f"[{task.video_id}]"
-        for p in list(subdir.iterdir()):
-            try:
-                if not p.is_file() or token not in p.name:
-                    continue
-                ext = p.suffix.lower()
-                if ext == ".mp4":
-                    if ".f" in p.stem:
-                        p.unlink()
-                    continue
-                if ext == ".mp3":
-                    continue
-                p.unlink()
-            except Exception:
-                pass
+    def statusBar(self, text: str) -> None:
+        window = self.window()
+        if window:
+            window.setWindowTitle(f"FlowGrab — {text}")
 
 
 class TikTokTab(YoutubeTab):
@@ -654,25 +971,38 @@ class TikTokTab(YoutubeTab):
         super().build_ui()
         self.edit_url.setPlaceholderText("Colle une URL TikTok et presse Entrée pour l’ajouter")
 
+    def _single_video_url(self, text: str) -> Optional[str]:
+        match = TIKTOK_REGEX.search(text)
+        return match.group(1) if match else None
+
     def add_url(self) -> None:
         url = self.edit_url.text().strip()
         if not url:
             return
+        if is_collection_url(url):
+            self.ingest_collection(url)
+            self.edit_url.clear()
+            self.edit_sections.clear()
+            return
         match = TIKTOK_REGEX.search(url)
         if not match:
             QMessageBox.information(self, "URL invalide", "Cette URL ne semble pas être une URL TikTok.")
             return
         url = match.group(1)
-        for i in range(self.list.count()):
-            exist_task: Task = self.list.item(i).data(Qt.UserRole)
-            if exist_task and exist_task.url == url:
-                QMessageBox.information(self, "Déjà présent", "Cette URL est déjà dans la liste.")
-                self.edit_url.clear()
-                return
-        item = self.append_task(url)
+        valid, sections = self._input_sections()
+        if not valid:
+            return
+        reason = self._rejection_reason(url, sections=sections)
+        if reason:
+            QMessageBox.information(self, "Déjà présent", reason)
+            self.edit_url.clear()
+            self.edit_sections.clear()
+            return
+        item = self.append_task(url, sections=sections)
         self.list.setCurrentItem(item)
         self.inspect_task_async(item)
         self.edit_url.clear()
+        self.edit_sections.clear()
 
     def paste_clipboard(self) -> None:
         cb = QApplication.clipboard()
@@ -0,0 +1,100 @@
+"""Adaptateurs QThread autour du moteur de téléchargement sans Qt."""
+
+import pathlib
+import subprocess
+from typing import List, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from core.download_core import Task, extract_basic_info
+from core.engine import DownloadEngine
+from core.playlist import CollectionListing, expand_collection
+
+
+class DownloadWorker(QThread):
+    sig_progress = Signal(object, object, float, int, str)
+    sig_status = Signal(str)
+    sig_done = Signal(bool, str, dict)
+
+    def __init__(self, task: Task, ydl_opts: dict, parent=None, info: Optional[dict] = None):
+        super().__init__(parent)
+        self.task = task
+        self.engine = DownloadEngine(
+            task,
+            ydl_opts,
+            info=info,
+            on_progress=self.sig_progress.emit,
+            on_status=self.sig_status.emit,
+        )
+
+    def stop(self) -> None:
+        self.engine.stop()
+
+    def run(self) -> None:
+        result = self.engine.run()
+        self.sig_done.emit(result.ok, result.message, result.info)
+
+
+class InspectWorker(QThread):
+    sig_done = Signal(str, dict)
+    sig_error = Signal(str, str)
+
+    def __init__(self, url: str, parent=None):
+        super().__init__(parent)
+        self.url = url
+
+    def run(self) -> None:
+        try:
+            info = extract_basic_info(self.url)
+            self.sig_done.emit(self.url, info or {})
+        except Exception as exc:
+            self.sig_error.emit(self.url, str(exc))
+
+
+class CollectionWorker(QThread):
+    sig_status = Signal(str)
+    sig_done = Signal(str, object)
+    sig_error = Signal(str, str)
+
+    def __init__(self, url: str, parent=None, limit: Optional[int] = None):
+        super().__init__(parent)
+        self.url = url
+        self.limit = limit
+
+    def run(self) -> None:
+        try:
+            listing: CollectionListing = expand_collection(self.url, limit=self.limit, on_status=self.sig_status.emit)
+            self.sig_done.emit(self.url, listing)
+        except Exception as exc:
+            self.sig_error.emit(self.url, str(exc))
+
+
+class CommandWorker(QThread):
+    sig_line = Signal(str)
+    sig_done = Signal(int)
+
+    def __init__(self, cmd: List[str], cwd: pathlib.Path | None = None, env: dict | None = None, parent=None):
+        super().__init__(parent)
+        self.cmd = cmd
+        self.cwd = str(cwd) if cwd else None
+        self.env = env
+
+    def run(self) -> None:
+        try:
+            proc = subprocess.Popen(
+                self.cmd,
+                cwd=self.cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                env=self.env,
+                shell=False,
+            )
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                self.sig_line.emit(line.rstrip())
+            proc.wait()
+            self.sig_done.emit(proc.returncode or 0)
+        except Exception as e:
+            self.sig_line.emit(f"[ERREUR] {e}")
+            self.sig_done.emit(1)
@@ -0,0 +1,95 @@
+"""Post-traitement hors du thread GUI : rangement, nettoyage et extraction audio dans un pool borné."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from config import DEFAULT_CONFIG, load_config
+from core.download_core import Task
+from core.engine import finalize_download
+
+
+class PostProcessPool(QObject):
+    """Exécute ``finalize_download`` en arrière-plan ; les signaux arrivent dans le thread GUI.
+
+    Le pool est partagé par les onglets : chacun ne traite que les tâches qu'il a soumises.
+    """
+
+    sig_started = Signal(object)
+    sig_status = Signal(object, str)
+    sig_done = Signal(object, object)
+    sig_error = Signal(object, str)
+
+    def __init__(self, workers: int, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._workers = max(1, int(workers))
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="postprocess")
+        self._pending: Dict[int, Future] = {}
+
+    def configure(self, workers: int) -> None:
+        workers = max(1, int(workers))
+        with self._lock:
+            if workers == self._workers:
+                return
+            # Les traitements déjà soumis finissent sur l'ancien pool
+            old, self._executor = self._executor, ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="postprocess"
+            )
+            self._workers = workers
+        old.shutdown(wait=False)
+
+    def configure_from(self, cfg: dict) -> None:
+        self.configure(cfg.get("max_postprocess_workers") or DEFAULT_CONFIG["max_postprocess_workers"])
+
+    def submit(self, task: Task, info: Optional[dict]) -> None:
+        with self._lock:
+            future = self._executor.submit(self._run, task, dict(info or {}))
+            self._pending[id(task)] = future
+        future.add_done_callback(lambda _f, key=id(task): self._forget(key))
+
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _run(self, task: Task, info: dict) -> None:
+        self.sig_started.emit(task)
+        try:
+            audio_path = finalize_download(task, info, lambda text: self.sig_status.emit(task, text))
+        except Exception as exc:
+            self.sig_error.emit(task, str(exc))
+            return
+        self.sig_done.emit(task, audio_path)
+
+    def is_pending(self, task: Task) -> bool:
+        with self._lock:
+            return id(task) in self._pending
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor = self._executor
+        executor.shutdown(wait=wait)
+
+
+_pool: Optional[PostProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_postprocess_pool() -> PostProcessPool:
+    """Pool unique de l'application (à créer depuis le thread GUI)."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = PostProcessPool(DEFAULT_CONFIG["max_postprocess_workers"])
+            pool.configure_from(load_config())
+            _pool = pool
+        return _pool
@@ -0,0 +1,157 @@
+"""Message de progression par chat, modifié sur place au rythme permis par la Bot API.
+
+Chaque chat Telegram a au plus un message de suivi, une ligne par téléchargement. Le thread de
+l'interface appelle ``ProgressBoard.report`` à chaque progression : l'appel ne fait que retenir
+la dernière ligne de la tâche. Une seule coroutine d'envoi tourne par chat ; elle laisse au
+moins ``interval`` secondes entre deux modifications, saute les états intermédiaires et envoie
+toujours le dernier. Quand toutes les lignes sont finales et envoyées, le message est clos :
+le téléchargement suivant en ouvre un nouveau.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+from telegram.error import BadRequest, RetryAfter
+
+# Limite Telegram : 4096 caractères par message
+MAX_TEXT = 4000
+# Échecs d'envoi consécutifs avant d'abandonner l'état courant
+_MAX_FAILURES = 3
+
+
+def _retry_delay(exc: RetryAfter) -> float:
+    delay = exc.retry_after
+    return float(delay.total_seconds() if hasattr(delay, "total_seconds") else delay)
+
+
+class _ChatProgress:
+    __slots__ = ("lines", "final", "message_id", "sent_text", "next_edit", "dirty", "scheduled")
+
+    def __init__(self):
+        self.lines: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.final: set = set()
+        self.message_id: Optional[int] = None
+        self.sent_text = ""
+        self.next_edit = 0.0
+        self.dirty = False
+        self.scheduled = False
+
+    def render(self) -> str:
+        text = "\n".join(self.lines.values())
+        return text if len(text) <= MAX_TEXT else "…" + text[-(MAX_TEXT - 1) :]
+
+
+class ProgressBoard:
+    def __init__(
+        self,
+        bot,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        interval: float = 3.0,
+        on_error: Optional[Callable[[str], None]] = None,
+    ):
+        self.bot = bot
+        self.loop = loop
+        self.interval = max(1.0, float(interval))
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._chats: Dict[Hashable, _ChatProgress] = {}
+
+    def report(self, chat_id: Hashable, key: Hashable, line: str, *, final: bool = False) -> None:
+        """Dernier état de la tâche ``key`` ; appelable depuis n'importe quel thread."""
+
+        with self._lock:
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _ChatProgress()
+            chat.lines[key] = line
+            if final:
+                chat.final.add(key)
+            else:
+                chat.final.discard(key)
+            chat.dirty = True
+            if chat.scheduled:
+                return
+            chat.scheduled = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._flush_guarded(chat_id, chat), self.loop)
+        except RuntimeError:
+            # Boucle du bot fermée : rien à afficher
+            with self._lock:
+                self._chats.pop(chat_id, None)
+
+    def active_chats(self) -> int:
+        with self._lock:
+            return len(self._chats)
+
+    async def _flush_guarded(self, chat_id: Hashable, chat: _ChatProgress) -> None:
+        try:
+            await self._flush(chat_id, chat)
+        except BaseException:
+            # Arrêt du bot : un report ultérieur doit pouvoir replanifier un envoi
+            with self._lock:
+                chat.scheduled = False
+            raise
+
+    async def _flush(self, chat_id: Hashable, chat: _ChatProgress) -> None:
+        failures = 0
+        while True:
+            wait = chat.next_edit - self.loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            with self._lock:
+                text = chat.render()
+                chat.dirty = False
+            if text and text != chat.sent_text:
+                try:
+                    await self._publish(chat_id, chat, text)
+                except RetryAfter as exc:
+                    # Limite atteinte : on patiente le délai imposé puis on renvoie l'état le plus récent
+                    chat.next_edit = self.loop.time() + _retry_delay(exc)
+                    with self._lock:
+                        chat.dirty = True
+                    continue
+                except BadRequest as exc:
+                    if "not modified" in str(exc).lower():
+                        chat.sent_text = text
+                    elif chat.message_id is not None:
+                        # Message supprimé par l'utilisateur : l'état repart dans un nouveau message
+                        chat.message_id = None
+                        with self._lock:
+                            chat.dirty = True
+                    else:
+                        self._report_error(f"Progression Telegram : {exc}")
+                except Exception as exc:
+                    # Réseau, délai dépassé, réponse illisible : on retente plus tard avec l'état le plus récent
+                    failures += 1
+                    if failures < _MAX_FAILURES:
+                        chat.next_edit = self.loop.time() + self.interval
+                        with self._lock:
+                            chat.dirty = True
+                        continue
+                    self._report_error(f"Progression Telegram : {exc}")
+                failures = 0
+                chat.next_edit = self.loop.time() + self.interval
+            with self._lock:
+                if chat.dirty:
+                    continue
+                chat.scheduled = False
+                if chat.lines and set(chat.lines) <= chat.final and self._chats.get(chat_id) is chat:
+                    del self._chats[chat_id]
+                return
+
+    async def _publish(self, chat_id: Hashable, chat: _ChatProgress, text: str) -> None:
+        if chat.message_id is None:
+            message = await self.bot.send_message(chat_id=chat_id, text=text)
+            chat.message_id = message.message_id
+        else:
+            await self.bot.edit_message_text(text=text, chat_id=chat_id, message_id=chat.message_id)
+        chat.sent_text = text
+
+    def _report_error(self, text: str) -> None:
+        if self.on_error is not None:
+            self.on_error(text)
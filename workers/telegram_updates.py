@@ -0,0 +1,150 @@
+"""Traitement concurrent des mises à jour Telegram, ordonné par chat et borné.
+
+Par défaut, python-telegram-bot traite les mises à jour une par une : une inspection de lien de
+plusieurs secondes bloque les clics de tous les autres chats. ``ChatOrderedUpdateProcessor`` :
+- exécute au plus ``max_running`` gestionnaires à la fois ;
+- conserve l'ordre d'arrivée dans un même chat (verrou FIFO par chat, attendu sans occuper
+  de place d'exécution) ;
+- traite les clics sur les boutons dans une file à part, hors quota : un clic n'attend jamais
+  l'inspection d'un lien, ni celle d'un autre utilisateur ;
+- applique une contre-pression : au-delà de ``max_pending`` mises à jour admises et non
+  terminées, ``BackpressureQueue.put`` attend. En polling, la récupération des mises à jour
+  marque une pause ; en webhook, la réponse à Telegram est retardée et il ralentit l'envoi.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Dict, Hashable, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+_LANE_MESSAGES = "msg"
+_LANE_CALLBACKS = "cb"
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_running: int, max_pending: int):
+        max_running = max(1, int(max_running))
+        max_pending = max(max_running, int(max_pending))
+        # Le sémaphore de PTB borne les mises à jour admises ; l'exécution a son propre quota
+        super().__init__(max(2, max_pending))
+        self.max_running = max_running
+        self.max_pending = max_pending
+        self._running: Optional[asyncio.Semaphore] = None
+        self._room: Optional[asyncio.Condition] = None
+        self._pending = 0
+        self._active = 0
+        # (voie, chat) → (verrou, nombre de mises à jour en attente ou en cours sur ce verrou)
+        self._chats: Dict[Tuple[str, Hashable], Tuple[asyncio.Lock, int]] = {}
+
+    async def initialize(self) -> None:
+        self._running = asyncio.Semaphore(self.max_running)
+        self._room = asyncio.Condition()
+        self._pending = 0
+        self._active = 0
+        self._chats.clear()
+
+    async def shutdown(self) -> None:
+        self._chats.clear()
+
+    # --- Contre-pression ---------------------------------------------------------------------
+
+    async def admit(self) -> None:
+        """Réserve une place pour une mise à jour ; attend tant que ``max_pending`` est atteint."""
+
+        if self._room is None:
+            return
+        async with self._room:
+            await self._room.wait_for(lambda: self._pending < self.max_pending)
+            self._pending += 1
+
+    async def _release(self) -> None:
+        if self._room is None:
+            return
+        async with self._room:
+            self._pending = max(0, self._pending - 1)
+            self._room.notify()
+
+    # --- Ordonnancement ----------------------------------------------------------------------
+
+    @staticmethod
+    def _key(update: object) -> Optional[Tuple[str, Hashable]]:
+        if not isinstance(update, Update):
+            return None
+        lane = _LANE_CALLBACKS if update.callback_query is not None else _LANE_MESSAGES
+        if update.effective_chat is not None:
+            return lane, update.effective_chat.id
+        if update.effective_user is not None:
+            return lane, f"user:{update.effective_user.id}"
+        return None
+
+    def _acquire_chat(self, key: Tuple[str, Hashable]) -> asyncio.Lock:
+        lock, users = self._chats.get(key) or (asyncio.Lock(), 0)
+        self._chats[key] = (lock, users + 1)
+        return lock
+
+    def _release_chat(self, key: Tuple[str, Hashable]) -> None:
+        lock, users = self._chats[key]
+        if users <= 1:
+            del self._chats[key]
+        else:
+            self._chats[key] = (lock, users - 1)
+
+    async def _run(self, coroutine: Awaitable[Any], *, limited: bool) -> None:
+        if limited and self._running is not None:
+            async with self._running:
+                self._active += 1
+                try:
+                    await coroutine
+                finally:
+                    self._active -= 1
+        else:
+            self._active += 1
+            try:
+                await coroutine
+            finally:
+                self._active -= 1
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+        limited = key is None or key[0] != _LANE_CALLBACKS
+        try:
+            if key is None:
+                await self._run(coroutine, limited=limited)
+                return
+            lock = self._acquire_chat(key)
+            try:
+                async with lock:
+                    await self._run(coroutine, limited=limited)
+            finally:
+                self._release_chat(key)
+        finally:
+            if isinstance(update, Update):
+                await self._release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._active,
+            "max_running": self.max_running,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "chats": len({chat for _lane, chat in self._chats}),
+        }
+
+
+class BackpressureQueue(asyncio.Queue):
+    """File ``update_queue`` de l'application : chaque ``Update`` attend une place avant d'entrer.
+
+    Les objets internes de PTB (signal d'arrêt, erreurs) passent sans attendre.
+    """
+
+    def __init__(self, processor: ChatOrderedUpdateProcessor):
+        super().__init__()
+        self._processor = processor
+
+    async def put(self, item: Any) -> None:
+        if isinstance(item, Update):
+            await self._processor.admit()
+        await super().put(item)
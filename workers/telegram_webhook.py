@@ -0,0 +1,164 @@
+"""Serveur HTTP asyncio minimal pour le mode webhook du bot Telegram.
+
+``Application.start_webhook`` de python-telegram-bot exige tornado ; ce serveur tourne
+directement dans la boucle du bot et se limite à ce dont Telegram a besoin :
+- ``POST <chemin>`` : une mise à jour JSON, acceptée seulement avec l'en-tête
+  ``X-Telegram-Bot-Api-Secret-Token`` attendu (403 sinon) ;
+- ``GET /health`` : état du bot en JSON, pour le tunnel ou une sonde de supervision.
+Les connexions sont gardées ouvertes (keep-alive) : Telegram réutilise les siennes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+HEALTH_PATH = "/health"
+MAX_HEADER_BYTES = 16 * 1024
+# Une mise à jour Telegram dépasse rarement quelques Ko ; au-delà, c'est autre chose
+MAX_BODY_BYTES = 1024 * 1024
+_IDLE_TIMEOUT = 75.0
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class TelegramWebhookServer:
+    def __init__(
+        self,
+        url_path: str,
+        secret_token: str,
+        on_update: Callable[[dict], Awaitable[None]],
+        *,
+        health: Optional[Callable[[], Dict[str, object]]] = None,
+    ):
+        self.url_path = "/" + url_path.strip("/")
+        self.secret_token = secret_token
+        self.on_update = on_update
+        self.health = health
+        self.received = 0
+        self.rejected = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str, port: int) -> None:
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+
+    async def stop(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    # --- HTTP ----------------------------------------------------------------------------
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _IDLE_TIMEOUT)
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as exc:
+            raise _BadRequest(400, "En-têtes trop longs") from exc
+        if len(head) > MAX_HEADER_BYTES:
+            raise _BadRequest(400, "En-têtes trop longs")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _version = lines[0].split(" ", 2)
+        except ValueError as exc:
+            raise _BadRequest(400, "Ligne de requête invalide") from exc
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError as exc:
+            raise _BadRequest(400, "Content-Length invalide") from exc
+        if length > MAX_BODY_BYTES:
+            raise _BadRequest(413, "Corps trop volumineux")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _respond(self, request: Tuple[str, str, Dict[str, str], bytes]) -> Tuple[int, Dict[str, object]]:
+        method, path, headers, body = request
+        if path == HEALTH_PATH:
+            if method != "GET":
+                return 405, {"ok": False}
+            payload: Dict[str, object] = {"ok": True, "received": self.received, "rejected": self.rejected}
+            if self.health is not None:
+                payload.update(self.health())
+            return 200, payload
+        if path != self.url_path:
+            return 404, {"ok": False}
+        if method != "POST":
+            return 405, {"ok": False}
+        if not hmac.compare_digest(headers.get(SECRET_HEADER, ""), self.secret_token):
+            self.rejected += 1
+            return 403, {"ok": False}
+        try:
+            data = json.loads(body.decode("utf-8"))
+        except ValueError:
+            return 400, {"ok": False}
+        if not isinstance(data, dict):
+            return 400, {"ok": False}
+        self.received += 1
+        await self.on_update(data)
+        return 200, {"ok": True}
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request[2].get("connection", "").lower() != "close"
+                    status, payload = await self._respond(request)
+                except _BadRequest as exc:
+                    status, payload, keep_alive = exc.status, {"ok": False, "error": str(exc)}, False
+                except asyncio.TimeoutError:
+                    break
+                except Exception as exc:
+                    status, payload, keep_alive = 500, {"ok": False, "error": str(exc)}, False
+                data = json.dumps(payload).encode("utf-8")
+                head = (
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                )
+                writer.write(head.encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
@@ -3,18 +3,40 @@ import mimetypes
 import os
 import secrets
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from PySide6.QtCore import QThread, Signal
-from yt_dlp import YoutubeDL
 
+from config import DEFAULT_CONFIG
 from core.download_core import (
+    JOB_TRANSCRIPTION,
+    JOB_VIDEO,
+    TRANSCRIPTION_FORMAT,
     estimate_size,
+    extract_basic_info,
     human_size,
+    info_cache_key,
     list_video_formats,
-    normalize_yt,
     pick_best_audio,
+    pick_transcription_audio,
 )
+from core.pending_store import PendingStore
+from core.sections import SectionError, parse_sections
+from paths import TELEGRAM_PENDING_PATH
+from workers.telegram_webhook import HEALTH_PATH, TelegramWebhookServer
+
+if TYPE_CHECKING:
+    # Importé à la demande au lancement du bot (dépend de python-telegram-bot)
+    from workers.telegram_progress import ProgressBoard
+    from workers.telegram_updates import ChatOrderedUpdateProcessor
+
+WEBHOOK_URL_PATH = "/telegram"
+
+
+def resolve_telegram_mode(cfg: dict) -> str:
+    mode = (cfg.get("telegram_mode") or "").strip().lower()
+    return "webhook" if mode == "webhook" else "polling"
 
 
 def _ptb_major_minor() -> Tuple[int, int]:
@@ -28,7 +50,8 @@ def _ptb_major_minor() -> Tuple[int, int]:
 
 
 class TelegramWorker(QThread):
-    sig_download_requested = Signal(str, str, object, str)
+    # url, format, chat_id, titre, type de job (vidéo ou transcription), extrait (vide = tout)
+    sig_download_requested = Signal(str, str, object, str, str, str)
     sig_info = Signal(str)
 
     def __init__(self, app_config: dict, parent=None):
@@ -37,12 +60,30 @@ class TelegramWorker(QThread):
         self._loop: asyncio.AbstractEventLoop | None = None
         self._stop_evt: asyncio.Event | None = None
         self.app: "Application | None" = None
-        self._pending_choices: Dict[str, Dict[str, Any]] = {}
         self.effective_mode = self._resolve_mode()
-        self._pending_transcriptions: Dict[str, str] = {}
+        # Claviers en attente : bornés, expirés après un délai et conservés d'un lancement à l'autre
+        self._pending_choices = self._pending_store("choices")
+        self._pending_transcriptions = self._pending_store("transcriptions")
+        # Inspections des liens reçus : pool dédié et borné, une seule extraction en vol par URL
+        self._inspect_executor: Optional[ThreadPoolExecutor] = None
+        self._inspections: Dict[str, asyncio.Future] = {}
+        self._webhook_server: Optional[TelegramWebhookServer] = None
+        self._update_processor: Optional["ChatOrderedUpdateProcessor"] = None
+        self._progress: Optional["ProgressBoard"] = None
 
     def _resolve_mode(self) -> str:
-        return "polling"
+        return resolve_telegram_mode(self.app_config)
+
+    def _pending_store(self, name: str) -> PendingStore:
+        cfg = self.app_config
+        hours = cfg.get("telegram_pending_ttl_hours") or DEFAULT_CONFIG["telegram_pending_ttl_hours"]
+        persist = cfg.get("telegram_pending_persist", DEFAULT_CONFIG["telegram_pending_persist"])
+        return PendingStore(
+            name,
+            ttl=float(hours) * 3600,
+            max_entries=cfg.get("telegram_pending_max") or DEFAULT_CONFIG["telegram_pending_max"],
+            path=TELEGRAM_PENDING_PATH if persist else None,
+        )
 
     def send_message(self, chat_id: int | str, text: str, reply_markup: Any = None) -> None:
         if not self._loop or not self.app:
@@ -59,13 +100,36 @@ class TelegramWorker(QThread):
             except Exception as exc:
                 self.sig_info.emit(f"Envoi message Telegram impossible : {exc}")
 
-        self._loop.call_soon_threadsafe(lambda: asyncio.create_task(_send()))
+        self._submit(_send())
+
+    def _submit(self, coroutine) -> None:
+        """Planifie ``coroutine`` dans la boucle du bot depuis n'importe quel thread."""
+
+        loop = self._loop
+        try:
+            if loop is None:
+                raise RuntimeError("Bot arrêté")
+            asyncio.run_coroutine_threadsafe(coroutine, loop)
+        except RuntimeError:
+            coroutine.close()
+
+    def report_progress(self, chat_id: int | str, key: Any, line: str, *, final: bool = False) -> None:
+        """Met à jour la ligne ``key`` du message de progression du chat (modifié sur place)."""
+
+        board = self._progress
+        if board is None:
+            return
+        try:
+            chat_ref: int | str = int(chat_id)
+        except (TypeError, ValueError):
+            chat_ref = chat_id
+        board.report(chat_ref, key, line, final=final)
 
     def ask_transcription(self, chat_id: int | str, audio_path: str) -> None:
         from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
         token = secrets.token_urlsafe(8)
-        self._pending_transcriptions[token] = audio_path
+        self._pending_transcriptions.put(token, audio_path)
         name = os.path.basename(audio_path) or audio_path
         buttons = [
             [InlineKeyboardButton("📝 Oui, transcrire", callback_data=f"tr:yes:{token}")],
@@ -73,19 +137,51 @@ class TelegramWorker(QThread):
         ]
         self.send_message(chat_id, f"Transcrire l’audio téléchargé ?\n{name}", InlineKeyboardMarkup(buttons))
 
+    def transcribe_now(self, chat_id: int | str, audio_path: str) -> None:
+        """Job de transcription terminé : l'audio part directement au webhook."""
+
+        if not self._loop or not self.app:
+            return
+        self._submit(self._send_transcription(chat_id, audio_path))
+
+    def send_transcript(self, chat_id: int | str, transcript_path: str) -> None:
+        """Transcription tirée des sous-titres : le fichier texte part tel quel dans le chat."""
+
+        if not self._loop or not self.app:
+            return
+
+        async def _send():
+            try:
+                with open(transcript_path, "rb") as handle:
+                    await self.app.bot.send_document(
+                        chat_id=chat_id,
+                        document=handle,
+                        filename=os.path.basename(transcript_path),
+                        caption="Transcription tirée des sous-titres ✅",
+                    )
+            except Exception as exc:
+                self.sig_info.emit(f"Envoi transcription Telegram impossible : {exc}")
+                self.send_message(chat_id, f"Transcription prête mais envoi impossible : {exc}")
+
+        self._submit(_send())
+
     def _inspect_url(self, url: str) -> dict:
-        u = normalize_yt(url)
-        ydl_opts = {
-            "quiet": True,
-            "no_warnings": True,
-            "retries": 2,
-            "socket_timeout": 15,
-        }
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(u, download=False)
-        if info and info.get("entries"):
-            info = info["entries"][0]
-        return info or {}
+        # Même chemin que les onglets : cache disque, stratégie de cookies, User-Agent et limiteur
+        return extract_basic_info(url) or {}
+
+    async def _inspect(self, url: str) -> dict:
+        """Inspection dans le pool dédié ; un lien déjà en cours d'inspection est attendu, pas relancé."""
+
+        key = info_cache_key(url)
+        pending = self._inspections.get(key)
+        if pending is None:
+            if self._inspect_executor is None:
+                raise RuntimeError("Bot arrêté")
+            pending = asyncio.get_running_loop().run_in_executor(self._inspect_executor, self._inspect_url, url)
+            self._inspections[key] = pending
+            pending.add_done_callback(lambda _f, k=key: self._inspections.pop(k, None))
+        # shield : un message abandonné n'annule pas l'inspection attendue par les autres
+        return await asyncio.shield(pending)
 
     def _build_options(self, info: dict) -> Tuple[str, List[Dict[str, Any]]]:
         formats = info.get("formats") or []
@@ -94,6 +190,14 @@ class TelegramWorker(QThread):
         audio = pick_best_audio(formats, mp4_friendly=True)
         title = info.get("title") or info.get("fulltitle") or info.get("original_url") or "Lien YouTube"
         options: List[Dict[str, Any]] = []
+        transcription_audio = pick_transcription_audio(formats)
+        if transcription_audio or formats:
+            tsize = estimate_size(transcription_audio, duration) if transcription_audio else None
+            options.append({
+                "fmt": TRANSCRIPTION_FORMAT,
+                "label": f"📝 Audio pour transcription • ≈ {human_size(tsize) if tsize else '—'}",
+                "job_type": JOB_TRANSCRIPTION,
+            })
         for vf in videos[:8]:
             vid_id = vf.get("format_id") or ""
             fmt = vid_id
@@ -123,6 +227,7 @@ class TelegramWorker(QThread):
             options.append({
                 "fmt": fmt,
                 "label": detail,
+                "job_type": JOB_VIDEO,
             })
         return title, options
 
@@ -131,6 +236,42 @@ class TelegramWorker(QThread):
         if msg:
             await msg.reply_text("Envoie-moi un lien YouTube pour lancer un téléchargement.")
 
+    def _health(self) -> Dict[str, object]:
+        return {
+            "mode": self.effective_mode,
+            "pending_choices": len(self._pending_choices),
+            "pending_transcriptions": len(self._pending_transcriptions),
+            "inspections": len(self._inspections),
+            "updates": self._update_processor.stats() if self._update_processor else {},
+        }
+
+    def status_text(self) -> str:
+        lines = [f"Mode : {self.effective_mode}"]
+        for label, store in (("Choix de format", self._pending_choices), ("Transcriptions", self._pending_transcriptions)):
+            stats = store.stats()
+            lines.append(
+                f"{label} en attente : {stats['entries']}/{stats['max_entries']} "
+                f"({human_size(stats['bytes'])}) • expirés {stats['expired']} • évincés {stats['evicted']}"
+            )
+        lines.append(f"Inspections en cours : {len(self._inspections)}")
+        if self._progress is not None:
+            lines.append(f"Messages de progression actifs : {self._progress.active_chats()}")
+        if self._update_processor is not None:
+            stats = self._update_processor.stats()
+            lines.append(
+                f"Mises à jour : {stats['running']}/{stats['max_running']} en cours, "
+                f"{stats['pending']}/{stats['max_pending']} admises, {stats['chats']} chat(s)"
+            )
+        server = self._webhook_server
+        if server is not None:
+            lines.append(f"Webhook : {server.received} mise(s) à jour reçue(s), {server.rejected} rejetée(s)")
+        return "\n".join(lines)
+
+    async def _cmd_status(self, update, context):
+        msg = update.effective_message
+        if msg:
+            await msg.reply_text(self.status_text())
+
     async def _handle_text(self, update, context):
         message = update.effective_message
         if not message:
@@ -138,9 +279,19 @@ class TelegramWorker(QThread):
         text = (message.text or "").strip()
         if not text:
             return
+        # « <lien> 1:30-3:30, #2 » : ce qui suit le lien restreint le téléchargement à un extrait
+        parts = text.split(maxsplit=1)
+        url = parts[0]
+        sections = parts[1].strip() if len(parts) > 1 else ""
+        if sections:
+            try:
+                parse_sections(sections)
+            except SectionError as exc:
+                await message.reply_text(f"Extrait invalide : {exc}\nExemple : <lien> 1:30-3:30, #2, Intro")
+                return
         info = None
         try:
-            info = await asyncio.get_running_loop().run_in_executor(None, self._inspect_url, text)
+            info = await self._inspect(url)
         except Exception as exc:
             await message.reply_text(f"Impossible d’inspecter le lien : {exc}")
             return
@@ -158,16 +309,23 @@ class TelegramWorker(QThread):
             [InlineKeyboardButton(opt["label"], callback_data=f"dl:{token}:{idx}")]
             for idx, opt in enumerate(options)
         ]
-        self._pending_choices[token] = {
-            "url": text,
-            "options": options,
-            "title": title,
-            "chat_id": message.chat_id,
-        }
-        await message.reply_text(
-            f"Formats disponibles pour :\n{title}",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+        self._pending_choices.put(
+            token,
+            {
+                "url": url,
+                "options": options,
+                "title": title,
+                "chat_id": message.chat_id,
+                "sections": sections,
+            },
         )
+        header = f"Formats disponibles pour :\n{title}"
+        if sections:
+            header += f"\nExtrait : {sections}"
+        elif info.get("chapters"):
+            count = len(info["chapters"])
+            header += f"\n{count} chapitre(s) : ajoute « #N » ou une plage après le lien pour un extrait"
+        await message.reply_text(header, reply_markup=InlineKeyboardMarkup(keyboard))
 
     async def _handle_callback(self, update, context):
         query = update.callback_query
@@ -205,18 +363,23 @@ class TelegramWorker(QThread):
                 pass
             title = entry.get("title") or "Vidéo"
             fmt = option.get("fmt") or ""
-            self.sig_download_requested.emit(entry.get("url", ""), fmt, chat_id, title)
+            job_type = option.get("job_type") or JOB_VIDEO
+            self.sig_download_requested.emit(
+                entry.get("url", ""), fmt, chat_id, title, job_type, entry.get("sections") or ""
+            )
             self.send_message(chat_id, f"Format sélectionné : {option.get('label','')}\nTéléchargement demandé…")
-            self._pending_choices.pop(token, None)
+            self._pending_choices.pop(token)
         elif data.startswith("tr:yes"):
             parts = data.split(":", 2)
             tok = parts[2] if len(parts) == 3 else ""
-            audio_path = self._pending_transcriptions.pop(tok, "")
+            audio_path = self._pending_transcriptions.pop(tok) or ""
             if not audio_path:
                 await query.answer("Lien expiré. Renvoie la vidéo pour réessayer.", show_alert=True)
                 return
             await self._handle_transcription_yes(query, chat_id, audio_path)
         elif data.startswith("tr:no"):
+            parts = data.split(":", 2)
+            self._pending_transcriptions.pop(parts[2] if len(parts) == 3 else "")
             await query.answer("OK", show_alert=False)
             try:
                 await query.edit_message_reply_markup(None)
@@ -231,18 +394,23 @@ class TelegramWorker(QThread):
         if chat_id is None:
             await query.answer("Chat introuvable.")
             return
+        if not (self.app_config.get("webhook_full") or "").strip():
+            await query.answer("Webhook non configuré.", show_alert=True)
+        else:
+            await query.answer("Envoi en cours…", show_alert=False)
+        try:
+            await query.edit_message_reply_markup(None)
+        except Exception:
+            pass
+        await self._send_transcription(chat_id, audio_path)
+
+    async def _send_transcription(self, chat_id: int | str, audio_path: str) -> None:
         webhook_full = (self.app_config.get("webhook_full") or "").strip()
         if not webhook_full:
-            await query.answer("Webhook non configuré.", show_alert=True)
             self.send_message(chat_id, "Configure le webhook dans l’app avant de lancer une transcription.")
             return
-        await query.answer("Envoi en cours…", show_alert=False)
         loop = asyncio.get_running_loop()
         status, body = await loop.run_in_executor(None, self._post_audio_to_webhook, webhook_full, audio_path)
-        try:
-            await query.edit_message_reply_markup(None)
-        except Exception:
-            pass
         if status == 0:
             self.send_message(chat_id, f"Transcription impossible : {body}")
             return
@@ -290,12 +458,14 @@ class TelegramWorker(QThread):
         except Exception as exc:
             self.sig_info.emit(f"Erreur bot Telegram : {exc}")
             return
+        workers = self.app_config.get("telegram_inspect_workers") or DEFAULT_CONFIG["telegram_inspect_workers"]
+        self._inspect_executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="tg-inspect")
 
         try:
             asyncio.set_event_loop(self._loop)
             self._stop_evt = asyncio.Event()
             mode = self._resolve_mode()
-            base = (self.app_config.get("webhook_base") or "").strip()
+            base = (self.app_config.get("telegram_webhook_url") or "").strip()
             if mode == "webhook" and not base:
                 self.sig_info.emit("URL webhook absente, bascule en mode polling.")
                 mode = "polling"
@@ -306,7 +476,7 @@ class TelegramWorker(QThread):
             if mode == "polling":
                 self._loop.run_until_complete(self._serve_polling())
             else:
-                port = int(self.app_config.get("telegram_port") or 8081)
+                port = int(self.app_config.get("telegram_port") or DEFAULT_CONFIG["telegram_port"])
                 self._loop.run_until_complete(self._serve_webhook(base, port))
         except Exception as exc:
             self.sig_info.emit(f"Erreur bot Telegram : {exc}")
@@ -321,7 +491,15 @@ class TelegramWorker(QThread):
             self._loop = None
             self._stop_evt = None
             self.app = None
-            self._pending_choices.clear()
+            self._update_processor = None
+            self._progress = None
+            self._inspections.clear()
+            if self._inspect_executor is not None:
+                self._inspect_executor.shutdown(wait=False, cancel_futures=True)
+                self._inspect_executor = None
+            # Connexions SQLite libérées ; rouvertes à la première écriture du prochain lancement
+            self._pending_choices.close()
+            self._pending_transcriptions.close()
             self.sig_info.emit("Bot Telegram arrêté.")
 
     async def _build_app(self):
@@ -331,9 +509,35 @@ class TelegramWorker(QThread):
             raise RuntimeError(f"Import python-telegram-bot impossible : {exc}") from exc
 
         token = (self.app_config.get("telegram_token") or "").strip()
-        app = Application.builder().token(token).build()
+        from workers.telegram_updates import BackpressureQueue, ChatOrderedUpdateProcessor
+
+        cfg = self.app_config
+        processor = ChatOrderedUpdateProcessor(
+            cfg.get("telegram_concurrent_updates") or DEFAULT_CONFIG["telegram_concurrent_updates"],
+            cfg.get("telegram_max_pending_updates") or DEFAULT_CONFIG["telegram_max_pending_updates"],
+        )
+        self._update_processor = processor
+        builder = (
+            Application.builder()
+            .token(token)
+            .concurrent_updates(processor)
+            .update_queue(BackpressureQueue(processor))
+        )
+        api_base = (self.app_config.get("telegram_api_base") or "").strip().rstrip("/")
+        if api_base:
+            builder = builder.base_url(f"{api_base}/bot").base_file_url(f"{api_base}/file/bot")
+        app = builder.build()
         self.app = app
+        from workers.telegram_progress import ProgressBoard
+
+        self._progress = ProgressBoard(
+            app.bot,
+            asyncio.get_running_loop(),
+            interval=cfg.get("telegram_progress_interval") or DEFAULT_CONFIG["telegram_progress_interval"],
+            on_error=self.sig_info.emit,
+        )
         app.add_handler(CommandHandler("start", self._cmd_start))
+        app.add_handler(CommandHandler("status", self._cmd_status))
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_text))
         app.add_handler(CallbackQueryHandler(self._handle_callback))
         return app
@@ -404,30 +608,34 @@ class TelegramWorker(QThread):
         self.sig_info.emit("Bot Telegram en initialisation (webhook)…")
         try:
             app = await self._build_app()
-        except RuntimeError as exc:
+            from telegram import Update
+        except (RuntimeError, ImportError) as exc:
             self.sig_info.emit(str(exc))
             return
 
         await app.initialize()
         await app.start()
-        token = (self.app_config.get("telegram_token") or "").strip()
-        path = f"tg/{token}"
-        base = base.rstrip("/")
-        webhook_url = f"{base}/{path}" if base else f"/{path}"
+        # Secret renouvelé à chaque lancement : Telegram le renvoie dans chaque requête
+        secret = secrets.token_urlsafe(32)
+        webhook_url = base.rstrip("/") + WEBHOOK_URL_PATH
 
-        try:
-            from telegram import Update
+        async def _enqueue(data: dict) -> None:
+            update = Update.de_json(data, app.bot)
+            if update is not None:
+                await app.update_queue.put(update)
 
-            await app.bot.set_webhook(url=webhook_url, allowed_updates=Update.ALL_TYPES)
-            await app.start_webhook(
-                listen="0.0.0.0",
-                port=port,
-                url_path=path,
-                webhook_url=webhook_url,
+        server = TelegramWebhookServer(WEBHOOK_URL_PATH, secret, _enqueue, health=self._health)
+        try:
+            await server.start("0.0.0.0", port)
+            await app.bot.set_webhook(
+                url=webhook_url,
+                secret_token=secret,
+                allowed_updates=Update.ALL_TYPES,
                 drop_pending_updates=True,
             )
         except Exception as exc:
             self.sig_info.emit(f"Impossible de démarrer le webhook : {exc}")
+            await server.stop()
             try:
                 await app.stop()
             except Exception:
@@ -438,16 +646,20 @@ class TelegramWorker(QThread):
                 pass
             return
 
-        self.sig_info.emit(f"Webhook : {webhook_url} (port {port})")
+        self._webhook_server = server
+        self.sig_info.emit(f"Webhook : {webhook_url} (port {port}, santé : {HEALTH_PATH})")
         self.sig_info.emit("Bot Telegram démarré en mode webhook.")
         try:
             if self._stop_evt:
                 await self._stop_evt.wait()
         finally:
+            self._webhook_server = None
+            # Sans cela, Telegram continue d'appeler une URL qui ne répond plus
             try:
-                await app.stop_webhook()
+                await app.bot.delete_webhook()
             except Exception:
                 pass
+            await server.stop()
             try:
                 await app.stop()
             except Exception: